@@ -1,10 +1,29 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog, Menu
 import math
-import json
 import os
+import sys
+import threading
+import multiprocessing
 from datetime import datetime
 
+import traverse_solver
+import traverse_project
+import traverse_import
+import traverse_export
+import traverse_report
+import traverse_file
+import missing_measurements
+from traverse_model import TraverseModel
+from edit_history import EditHistory, LegEdit, SideCountEdit, ReplaceEdit
+from spatial_index import StationGrid
+from traverse_plot import TraversePlot
+from results_table import ResultsTable
+from calculation_worker import CalculationWorker
+from project_browser import ProjectBrowser, RecentFiles
+import project_catalog
+import monte_carlo
+
 # Auto-update module
 try:
     import updater
@@ -12,18 +31,28 @@ try:
 except ImportError:
     UPDATER_AVAILABLE = False
 
+# Most catalog matches listed in the Project Catalog dialog
+CATALOG_DISPLAY_LIMIT = 1000
+
 
 class PolygonTraverseCalculator:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Traverse Calculator")
-        self.root.geometry("1300x900")
+    """One open project, shown as a tab of the main window"""
+    
+    def __init__(self, window, parent, untitled_name="Untitled"):
+        self.window = window
+        self.root = window.root
+        self.frame = ttk.Frame(parent, padding="5")
+        self.untitled_name = untitled_name
         
         # Variables
         self.num_sides = tk.IntVar(value=4)
         self.angle_entries = []
         self.bearing_entries = []
         self.distance_entries = []
+        self.side_labels = []
+        # Leg data; the entries display it and write committed edits back to it
+        self.model = TraverseModel()
+        self.history = EditHistory(self)
         
         # Project info variables
         self.project_name = tk.StringVar()
@@ -34,165 +63,30 @@ class PolygonTraverseCalculator:
         # Settings variables
         self.traverse_type = tk.StringVar(value="closed")
         self.units = tk.StringVar(value="metric")
+        # Decimal places of seconds in reported bearings
+        self.bearing_precision = tk.IntVar(value=0)
         
         # File tracking
         self.current_file = None
         self.is_modified = False
         
+        # Multi-traverse project (None for a plain single-traverse file)
+        self.project = None
+        self.current_traverse = tk.StringVar()
+        self._shown_traverse = None
+        
         # Store last calculation results for export
         self.last_results = ""
+        self.last_adjustment = None
         
-        # Create icon
-        self.create_icon()
+        # Calculations run in the background, independently of other tabs
+        self.worker = CalculationWorker(self.root)
         
         # Setup UI
-        self.setup_menu()
         self.setup_ui()
-        self.setup_statusbar()
-        
-        # Update clock
-        self.update_clock()
-        
-        # Check for updates on startup (after 3 seconds to let UI load)
-        if UPDATER_AVAILABLE:
-            updater.check_for_updates_on_startup(self.root, delay_ms=3000)
-        
-    def create_icon(self):
-        """Create a colorful polygon icon"""
-        # Create a small toplevel window temporarily to generate icon
-        icon_size = 32
-        icon_canvas = tk.Canvas(self.root, width=icon_size, height=icon_size, 
-                                bg='white', highlightthickness=0)
-        
-        # Draw a colorful pentagon
-        center_x, center_y = icon_size // 2, icon_size // 2
-        radius = 12
-        points = []
-        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
-        
-        for i in range(5):
-            angle = math.radians(90 + i * 72)
-            x = center_x + radius * math.cos(angle)
-            y = center_y - radius * math.sin(angle)
-            points.extend([x, y])
-        
-        icon_canvas.create_polygon(points, fill='#4ECDC4', outline='#2C3E50', width=2)
-        
-        # We can't easily set a custom icon in tkinter without external files
-        # The icon will be displayed in the header instead
-        icon_canvas.destroy()
-        
-    def setup_menu(self):
-        """Setup the menu bar"""
-        menubar = Menu(self.root)
-        self.root.config(menu=menubar)
-        
-        # File menu
-        file_menu = Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="File", menu=file_menu)
-        file_menu.add_command(label="Save", command=self.save_file, accelerator="Ctrl+S")
-        file_menu.add_command(label="Save As...", command=self.save_file_as)
-        file_menu.add_command(label="Import Input File...", command=self.import_file)
-        file_menu.add_separator()
-        file_menu.add_command(label="Print", command=self.print_output)
-        file_menu.add_command(label="Export to PDF...", command=self.export_pdf)
-        file_menu.add_separator()
-        file_menu.add_command(label="Close", command=self.close_project)
-        file_menu.add_command(label="Exit", command=self.exit_app)
-        
-        # Bind keyboard shortcuts
-        self.root.bind('<Control-s>', lambda e: self.save_file())
-        
-        # Options/Settings menu
-        options_menu = Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Options", menu=options_menu)
-        
-        # Traverse Type submenu
-        traverse_menu = Menu(options_menu, tearoff=0)
-        options_menu.add_cascade(label="Traverse Type", menu=traverse_menu)
-        traverse_menu.add_radiobutton(label="Closed Traverse", variable=self.traverse_type, 
-                                       value="closed", command=self.on_traverse_type_change)
-        traverse_menu.add_radiobutton(label="Open Traverse (Coming Soon)", variable=self.traverse_type,
-                                       value="open", state="disabled")
-        
-        options_menu.add_separator()
-        
-        # Units submenu
-        units_menu = Menu(options_menu, tearoff=0)
-        options_menu.add_cascade(label="Units", menu=units_menu)
-        units_menu.add_radiobutton(label="English (feet)", variable=self.units, 
-                                    value="english", command=self.on_units_change)
-        units_menu.add_radiobutton(label="Metric (meters)", variable=self.units, 
-                                    value="metric", command=self.on_units_change)
-        
-        # Help menu
-        help_menu = Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Help", menu=help_menu)
-        help_menu.add_command(label="Check for Updates...", command=self.check_for_updates)
-        help_menu.add_separator()
-        help_menu.add_command(label="About", command=self.show_about)
-        help_menu.add_command(label="Help Contents (Coming Soon)", state="disabled")
-        
-    def setup_statusbar(self):
-        """Setup the status bar at the bottom"""
-        self.statusbar = ttk.Frame(self.root)
-        self.statusbar.pack(side=tk.BOTTOM, fill=tk.X)
-        
-        # File label
-        self.file_label = ttk.Label(self.statusbar, text="File: <new file>", 
-                                     relief=tk.SUNKEN, anchor=tk.W, padding=(5, 2))
-        self.file_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Date/time label
-        self.datetime_label = ttk.Label(self.statusbar, text="", 
-                                         relief=tk.SUNKEN, anchor=tk.E, padding=(5, 2))
-        self.datetime_label.pack(side=tk.RIGHT)
-        
-    def update_clock(self):
-        """Update the clock in the status bar"""
-        now = datetime.now()
-        self.datetime_label.config(text=now.strftime("%m/%d/%Y    %I:%M %p"))
-        self.root.after(1000, self.update_clock)
         
     def setup_ui(self):
-        # Main frame
-        main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Header with program name and icon
-        header_frame = ttk.Frame(main_frame)
-        header_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        # Create colorful polygon icon
-        icon_canvas = tk.Canvas(header_frame, width=40, height=40, 
-                                bg=self.root.cget('bg'), highlightthickness=0)
-        icon_canvas.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # Draw pentagon icon
-        center_x, center_y = 20, 20
-        radius = 15
-        points = []
-        for i in range(5):
-            angle = math.radians(90 + i * 72)
-            x = center_x + radius * math.cos(angle)
-            y = center_y - radius * math.sin(angle)
-            points.extend([x, y])
-        icon_canvas.create_polygon(points, fill='#4ECDC4', outline='#2C3E50', width=2)
-        
-        # Draw inner details
-        inner_radius = 8
-        inner_points = []
-        for i in range(5):
-            angle = math.radians(90 + i * 72)
-            x = center_x + inner_radius * math.cos(angle)
-            y = center_y - inner_radius * math.sin(angle)
-            inner_points.extend([x, y])
-        icon_canvas.create_polygon(inner_points, fill='#96CEB4', outline='#2C3E50', width=1)
-        
-        # Program title
-        title_label = ttk.Label(header_frame, text="Traverse Calculator", 
-                                 font=("Arial", 18, "bold"), foreground="#2C3E50")
-        title_label.pack(side=tk.LEFT)
+        main_frame = self.frame
         
         # Project Identification Data frame
         project_frame = ttk.LabelFrame(main_frame, text="Project Identification Data", padding="10")
@@ -226,11 +120,19 @@ class PolygonTraverseCalculator:
         sides_entry.pack(side=tk.LEFT, padx=(0, 10))
         
         ttk.Button(input_header_frame, text="Generate Input Fields", 
-                   command=self.generate_fields).pack(side=tk.LEFT, padx=10)
+                   command=self.change_side_count).pack(side=tk.LEFT, padx=10)
         
         ttk.Button(input_header_frame, text="Calculate", 
                    command=self.calculate).pack(side=tk.LEFT, padx=10)
         
+        # Traverse selector, only shown when a multi-traverse project is open
+        self.traverse_selector_frame = ttk.Frame(input_header_frame)
+        ttk.Label(self.traverse_selector_frame, text="Traverse:").pack(side=tk.LEFT, padx=(10, 5))
+        self.traverse_selector = ttk.Combobox(self.traverse_selector_frame, textvariable=self.current_traverse,
+                                              state="readonly", width=25)
+        self.traverse_selector.pack(side=tk.LEFT)
+        self.traverse_selector.bind("<<ComboboxSelected>>", lambda e: self.on_traverse_selected())
+        
         # Input frame (scrollable)
         input_frame_container = ttk.LabelFrame(main_frame, text="Input Data", padding="10")
         input_frame_container.pack(fill=tk.X, pady=(0, 10))
@@ -255,10 +157,23 @@ class PolygonTraverseCalculator:
         results_frame = ttk.LabelFrame(main_frame, text="Results", padding="10")
         results_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
-        self.results_text = scrolledtext.ScrolledText(results_frame, width=140, height=20, 
+        results_tabs = ttk.Notebook(results_frame)
+        results_tabs.pack(fill="both", expand=True)
+        
+        report_tab = ttk.Frame(results_tabs)
+        results_tabs.add(report_tab, text="Report")
+        self.results_text = scrolledtext.ScrolledText(report_tab, width=140, height=20, 
                                                       font=("Courier", 9))
         self.results_text.pack(fill="both", expand=True)
         
+        # Every per-leg value as a sortable, filterable table
+        self.results_table = ResultsTable(results_tabs)
+        results_tabs.add(self.results_table, text="Table")
+        
+        # Adjusted vs unadjusted polygon, redrawn after each calculation
+        self.plot = TraversePlot(results_tabs)
+        results_tabs.add(self.plot, text="Plot")
+        
         # Generate initial fields
         self.generate_fields()
         
@@ -272,28 +187,23 @@ class PolygonTraverseCalculator:
         
     def on_units_change(self):
         """Handle units change - preserve existing input data"""
-        # Save current input data
-        saved_bearings = []
-        saved_distances = []
-        for i in range(len(self.bearing_entries)):
-            saved_bearings.append(self.bearing_entries[i].get())
-            saved_distances.append(self.distance_entries[i].get())
-        
-        # Regenerate fields to update unit labels
+        # Regenerate fields to update unit labels; the data stays in the model
+        self.commit_focused_edit()
+        self.num_sides.set(len(self.model))
         self.generate_fields()
         
-        # Restore input data
-        for i in range(min(len(saved_bearings), len(self.bearing_entries))):
-            self.bearing_entries[i].insert(0, saved_bearings[i])
-            self.distance_entries[i].insert(0, saved_distances[i])
-        
         self.is_modified = True
         
     def on_traverse_type_change(self):
         """Handle traverse type change"""
         self.is_modified = True
+    
+    def on_bearing_precision_change(self):
+        """Handle bearing precision change (applies to the next calculation)"""
+        self.is_modified = True
         
     def generate_fields(self):
+        """Rebuild the input table for Number of Sides rows, showing the model's data"""
         # Clear existing entries
         for widget in self.input_frame.winfo_children():
             widget.destroy()
@@ -301,8 +211,10 @@ class PolygonTraverseCalculator:
         self.angle_entries = []
         self.bearing_entries = []
         self.distance_entries = []
+        self.side_labels = []
         
         n = self.num_sides.get()
+        self.model.resize(n)
         unit_label = self.get_unit_label()
         
         # Headers
@@ -315,319 +227,356 @@ class PolygonTraverseCalculator:
         
         # Input fields for each side
         for i in range(n):
-            ttk.Label(self.input_frame, text=f"{i+1}").grid(row=i+1, column=0, padx=5, pady=2)
-            
-            bearing_entry = ttk.Entry(self.input_frame, width=25)
-            bearing_entry.grid(row=i+1, column=1, padx=5, pady=2)
-            self.bearing_entries.append(bearing_entry)
-            
-            distance_entry = ttk.Entry(self.input_frame, width=15)
-            distance_entry.grid(row=i+1, column=2, padx=5, pady=2)
-            self.distance_entries.append(distance_entry)
+            self.add_leg_row()
+    
+    def add_leg_row(self):
+        """Append the widgets for the next model row to the input table"""
+        i = len(self.bearing_entries)
+        side_label = ttk.Label(self.input_frame, text=f"{i+1}")
+        side_label.grid(row=i+1, column=0, padx=5, pady=2)
+        self.side_labels.append(side_label)
+        
+        bearing_entry = ttk.Entry(self.input_frame, width=25)
+        bearing_entry.grid(row=i+1, column=1, padx=5, pady=2)
+        self.bearing_entries.append(bearing_entry)
+        
+        distance_entry = ttk.Entry(self.input_frame, width=15)
+        distance_entry.grid(row=i+1, column=2, padx=5, pady=2)
+        self.distance_entries.append(distance_entry)
+        
+        bearing_entry.insert(0, self.model.bearing_text[i])
+        distance_entry.insert(0, self.model.distance_text[i])
+        
+        # Typing is recorded as one undo step when the field is left or Enter is pressed
+        for field, entry in enumerate((bearing_entry, distance_entry)):
+            entry.bind("<FocusOut>", lambda e, i=i, field=field: self.commit_leg_edit(i, field))
+            entry.bind("<Return>", lambda e, i=i, field=field: self.commit_leg_edit(i, field))
+    
+    # Leg data and undo history
+    def leg_rows(self):
+        """Current (bearing, distance) text of every side"""
+        return self.model.rows()
+    
+    def fill_legs(self, rows, start=0):
+        """Write (bearing, distance) text into the entries, beginning at row start"""
+        for i, (bearing, distance) in enumerate(rows, start):
+            self.set_leg_value(i, 0, bearing)
+            self.set_leg_value(i, 1, distance)
+    
+    def set_leg_value(self, i, field, value):
+        entry = (self.bearing_entries, self.distance_entries)[field][i]
+        entry.delete(0, tk.END)
+        entry.insert(0, value)
+        self.model.set_text(i, field, value)
+    
+    def resize_legs(self, count, rows=()):
+        """Change the number of sides in place, keeping existing rows and filling new ones from rows"""
+        old_count = len(self.bearing_entries)
+        self.model.resize(count, rows)
+        for i in range(old_count - 1, count - 1, -1):
+            self.side_labels.pop().destroy()
+            self.bearing_entries.pop().destroy()
+            self.distance_entries.pop().destroy()
+        for i in range(old_count, count):
+            self.add_leg_row()
+        self.num_sides.set(count)
+    
+    def replace_legs(self, rows):
+        kept = min(len(rows), len(self.model))
+        self.resize_legs(len(rows), rows[kept:])
+        self.fill_legs(rows[:kept])
+    
+    def commit_leg_edit(self, i, field):
+        """Record a typed change to one field as an undo step"""
+        if i >= len(self.bearing_entries):
+            return
+        value = (self.bearing_entries, self.distance_entries)[field][i].get()
+        old = self.model.text(i, field)
+        if value != old:
+            self.model.set_text(i, field, value)
+            self.history.record(LegEdit(i, field, old, value))
+            self.is_modified = True
+    
+    def commit_focused_edit(self):
+        """Record any edit still in progress in the focused entry"""
+        focus = self.root.focus_get()
+        for field, entries in enumerate((self.bearing_entries, self.distance_entries)):
+            if focus in entries:
+                self.commit_leg_edit(entries.index(focus), field)
+    
+    def change_side_count(self):
+        """Apply the Number of Sides field, keeping the data of the remaining sides"""
+        try:
+            count = self.num_sides.get()
+        except tk.TclError:
+            count = -1
+        old_count = len(self.bearing_entries)
+        if count < 3:
+            messagebox.showerror("Error", "Number of sides must be a whole number of at least 3.")
+            self.num_sides.set(old_count)
+            return
+        if count == old_count:
+            return
+        self.commit_focused_edit()
+        removed = self.leg_rows()[count:]
+        self.resize_legs(count)
+        self.history.record(SideCountEdit(old_count, count, removed))
+        self.is_modified = True
+    
+    def undo(self):
+        self.commit_focused_edit()
+        if self.history.undo() is not None:
+            self.is_modified = True
+    
+    def redo(self):
+        self.commit_focused_edit()
+        if self.history.redo() is not None:
+            self.is_modified = True
     
     def dms_to_decimal(self, dms_str):
         """Convert DD.MMSS to decimal degrees"""
-        try:
-            parts = dms_str.split('.')
-            degrees = float(parts[0])
-            if len(parts) > 1:
-                mmss = parts[1].ljust(4, '0')[:4]
-                minutes = float(mmss[:2])
-                seconds = float(mmss[2:4])
-                decimal = abs(degrees) + minutes/60 + seconds/3600
-                return decimal if degrees >= 0 else -decimal
-            return degrees
-        except:
-            return float(dms_str)
+        return traverse_solver.dms_to_decimal(dms_str)
     
     def bearing_to_azimuth(self, bearing_str):
         """Convert bearing to azimuth (0-360 from North)"""
-        bearing_str = bearing_str.strip().upper()
-        
-        try:
-            # Check if it's already azimuth (just numbers)
-            if bearing_str.replace('.', '').replace('-', '').isdigit():
-                return self.dms_to_decimal(bearing_str)
-            
-            # Parse quadrant bearing (e.g., N45.30E)
-            if 'N' in bearing_str and 'E' in bearing_str:
-                angle = self.dms_to_decimal(bearing_str.replace('N', '').replace('E', ''))
-                return angle
-            elif 'S' in bearing_str and 'E' in bearing_str:
-                angle = self.dms_to_decimal(bearing_str.replace('S', '').replace('E', ''))
-                return 180 - angle
-            elif 'S' in bearing_str and 'W' in bearing_str:
-                angle = self.dms_to_decimal(bearing_str.replace('S', '').replace('W', ''))
-                return 180 + angle
-            elif 'N' in bearing_str and 'W' in bearing_str:
-                angle = self.dms_to_decimal(bearing_str.replace('N', '').replace('W', ''))
-                return 360 - angle
-            else:
-                return self.dms_to_decimal(bearing_str)
-        except Exception as e:
-            raise ValueError(f"Invalid bearing format: {bearing_str}")
+        return traverse_solver.bearing_to_azimuth(bearing_str)
     
     def azimuth_to_bearing(self, azimuth):
         """Convert azimuth to quadrant bearing string (e.g., N 45°30'15" E)"""
-        # Normalize azimuth to 0-360
-        azimuth = azimuth % 360
-        
-        if azimuth <= 90:
-            # NE quadrant
-            degrees = int(azimuth)
-            minutes = int((azimuth - degrees) * 60)
-            seconds = int(((azimuth - degrees) * 60 - minutes) * 60)
-            return f"N {degrees:02d}°{minutes:02d}'{seconds:02d}\" E"
-        elif azimuth <= 180:
-            # SE quadrant
-            angle = 180 - azimuth
-            degrees = int(angle)
-            minutes = int((angle - degrees) * 60)
-            seconds = int(((angle - degrees) * 60 - minutes) * 60)
-            return f"S {degrees:02d}°{minutes:02d}'{seconds:02d}\" E"
-        elif azimuth <= 270:
-            # SW quadrant
-            angle = azimuth - 180
-            degrees = int(angle)
-            minutes = int((angle - degrees) * 60)
-            seconds = int(((angle - degrees) * 60 - minutes) * 60)
-            return f"S {degrees:02d}°{minutes:02d}'{seconds:02d}\" W"
-        else:
-            # NW quadrant
-            angle = 360 - azimuth
-            degrees = int(angle)
-            minutes = int((angle - degrees) * 60)
-            seconds = int(((angle - degrees) * 60 - minutes) * 60)
-            return f"N {degrees:02d}°{minutes:02d}'{seconds:02d}\" W"
+        return traverse_solver.azimuth_to_bearing(azimuth)
     
     def calculate_interior_angles(self, bearings):
         """Calculate interior angles from consecutive bearings"""
-        n = len(bearings)
-        angles = []
-        
-        for i in range(n):
-            current_bearing = bearings[i]
-            next_bearing = bearings[(i + 1) % n]
-            
-            back_azimuth = (current_bearing + 180) % 360
-            interior_angle = (back_azimuth - next_bearing) % 360
-            
-            angles.append(interior_angle)
-        
-        return angles
+        return traverse_solver.calculate_interior_angles(bearings)
     
     def calculate(self):
+        completion = None
         try:
-            n = self.num_sides.get()
-            unit_label = self.get_unit_label()
-            
-            # Read input data
-            bearings = []
-            distances = []
-            
-            for i in range(n):
-                bearing = self.bearing_to_azimuth(self.bearing_entries[i].get())
-                distance = float(self.distance_entries[i].get())
-                
-                bearings.append(bearing)
-                distances.append(distance)
-            
-            # Calculate interior angles from bearings
-            angles = self.calculate_interior_angles(bearings)
-            
-            # Clear results
-            self.results_text.delete(1.0, tk.END)
-            
-            # Build results string
-            results = []
-            
-            # 1. Check sum of interior angles
-            theoretical_sum = (n - 2) * 180
-            actual_sum = sum(angles)
-            angular_misclosure = actual_sum - theoretical_sum
-            
-            results.append("=" * 120)
-            results.append("POLYGON TRAVERSE CALCULATION RESULTS")
-            results.append("=" * 120)
-            results.append("")
-            
-            # Project info header
-            if self.project_name.get() or self.user_name.get() or self.project_address.get() or self.traverse_id.get():
-                results.append("PROJECT INFORMATION")
-                results.append("-" * 120)
-                if self.project_name.get():
-                    results.append(f"Project Name: {self.project_name.get()}")
-                if self.user_name.get():
-                    results.append(f"User Name: {self.user_name.get()}")
-                if self.project_address.get():
-                    results.append(f"Project Address: {self.project_address.get()}")
-                if self.traverse_id.get():
-                    results.append(f"Traverse ID: {self.traverse_id.get()}")
-                results.append(f"Units: {self.get_unit_name().title()}")
-                results.append(f"Date: {datetime.now().strftime('%m/%d/%Y %I:%M %p')}")
-                results.append("")
-            
-            # Display computed interior angles
-            results.append("COMPUTED INTERIOR ANGLES FROM BEARINGS")
-            results.append("-" * 120)
-            results.append(f"{'Side':<6} {'Bearing':<20} {'Interior Angle':<20}")
-            results.append("-" * 120)
-            for i in range(n):
-                results.append(f"{i+1:<6} {bearings[i]:>15.6f}°   {angles[i]:>15.6f}°")
-            results.append("")
-            
-            results.append("1. ANGULAR MISCLOSURE CHECK")
-            results.append("-" * 120)
-            results.append(f"Number of sides: {n}")
-            results.append(f"Theoretical sum of interior angles: {theoretical_sum:.4f}°")
-            results.append(f"Actual sum of interior angles: {actual_sum:.4f}°")
-            results.append(f"Angular misclosure: {angular_misclosure:.4f}°")
-            results.append(f"Allowable error (±√n minutes): ±{math.sqrt(n):.2f}'")
-            
-            # 2. Distribute angular error
-            angular_correction = -angular_misclosure / n
-            adjusted_angles = [angle + angular_correction for angle in angles]
-            
-            results.append(f"\nCorrection per angle: {angular_correction:.6f}°\n")
-            
-            # 3. Compute azimuths
-            azimuths = []
-            azimuth = bearings[0]
-            azimuths.append(azimuth)
-            
-            for i in range(1, n):
-                azimuth = (azimuth + 180 - adjusted_angles[i-1]) % 360
-                azimuths.append(azimuth)
-            
-            results.append("2. ADJUSTED ANGLES AND AZIMUTHS")
-            results.append("-" * 120)
-            results.append(f"{'Side':<6} {'Original Angle':<20} {'Correction':<20} {'Adjusted Angle':<20} {'Azimuth':<20}")
-            results.append("-" * 120)
-            
-            for i in range(n):
-                results.append(
-                    f"{i+1:<6} {angles[i]:>15.6f}°   {angular_correction:>15.6f}°   "
-                    f"{adjusted_angles[i]:>15.6f}°   {azimuths[i]:>15.6f}°")
+            self.commit_focused_edit()
             
-            # 4. Calculate latitudes and departures
-            latitudes = []
-            departures = []
-            
-            for i in range(n):
-                lat = distances[i] * math.cos(math.radians(azimuths[i]))
-                dep = distances[i] * math.sin(math.radians(azimuths[i]))
-                latitudes.append(lat)
-                departures.append(dep)
-            
-            sum_lat = sum(latitudes)
-            sum_dep = sum(departures)
-            
-            results.append(f"\n3. LATITUDES AND DEPARTURES")
-            results.append("-" * 120)
-            results.append(f"{'Side':<6} {'Distance':<15} {'Azimuth':<20} {'Latitude':<20} {'Departure':<20}")
-            results.append("-" * 120)
-            
-            total_perimeter = sum(distances)
-            for i in range(n):
-                results.append(
-                    f"{i+1:<6} {distances[i]:>12.3f} {unit_label}   {azimuths[i]:>15.6f}°   "
-                    f"{latitudes[i]:>15.6f} {unit_label}   {departures[i]:>15.6f} {unit_label}")
-            
-            results.append("-" * 120)
-            results.append(f"{'TOTAL':<6} {total_perimeter:>12.3f} {unit_label}   {'':<19} "
-                          f"{sum_lat:>15.6f} {unit_label}   {sum_dep:>15.6f} {unit_label}")
-            
-            # 5. Linear misclosure
-            linear_misclosure = math.sqrt(sum_lat**2 + sum_dep**2)
-            relative_accuracy = f"1:{int(total_perimeter/linear_misclosure)}" if linear_misclosure > 0 else "Perfect"
-            
-            results.append(f"\n4. LINEAR MISCLOSURE")
-            results.append("-" * 120)
-            results.append(f"Error in latitude (ΣL): {sum_lat:.6f} {unit_label}")
-            results.append(f"Error in departure (ΣD): {sum_dep:.6f} {unit_label}")
-            results.append(f"Total linear misclosure: {linear_misclosure:.6f} {unit_label}")
-            results.append(f"Relative accuracy: {relative_accuracy}\n")
-            
-            # 6. Apply Bowditch corrections
-            lat_corrections = []
-            dep_corrections = []
-            adjusted_lats = []
-            adjusted_deps = []
-            
-            for i in range(n):
-                lat_corr = -(sum_lat * distances[i]) / total_perimeter
-                dep_corr = -(sum_dep * distances[i]) / total_perimeter
-                lat_corrections.append(lat_corr)
-                dep_corrections.append(dep_corr)
-                adjusted_lats.append(latitudes[i] + lat_corr)
-                adjusted_deps.append(departures[i] + dep_corr)
-            
-            results.append("5. CORRECTIONS AND ADJUSTED VALUES (Bowditch Method)")
-            results.append("-" * 120)
-            results.append(f"{'Side':<6} {'Lat Corr':<15} {'Dep Corr':<15} {'Adjusted Lat':<20} {'Adjusted Dep':<20}")
-            results.append("-" * 120)
-            
-            for i in range(n):
-                results.append(
-                    f"{i+1:<6} {lat_corrections[i]:>12.6f} {unit_label}  {dep_corrections[i]:>12.6f} {unit_label}  "
-                    f"{adjusted_lats[i]:>15.6f} {unit_label}   {adjusted_deps[i]:>15.6f} {unit_label}")
-            
-            results.append("-" * 120)
-            results.append(f"{'TOTAL':<6} {'':<15} {'':<15} "
-                          f"{sum(adjusted_lats):>15.6f} {unit_label}   {sum(adjusted_deps):>15.6f} {unit_label}")
-            
-            # 7. FINAL CORRECTED BEARINGS AND DISTANCES
-            results.append("\n" + "=" * 120)
-            results.append("6. FINAL CORRECTED BEARINGS AND DISTANCES")
-            results.append("=" * 120)
-            results.append(f"{'Side':<6} {'Corrected Bearing':<25} {'Corrected Distance':<20}")
-            results.append("-" * 120)
-            
-            corrected_distances = []
-            corrected_bearings = []
-            
-            for i in range(n):
-                # Calculate corrected distance from adjusted lat/dep
-                corr_dist = math.sqrt(adjusted_lats[i]**2 + adjusted_deps[i]**2)
-                corrected_distances.append(corr_dist)
-                
-                # Calculate corrected bearing from adjusted lat/dep
-                if adjusted_lats[i] == 0:
-                    if adjusted_deps[i] > 0:
-                        corr_azimuth = 90
-                    else:
-                        corr_azimuth = 270
-                else:
-                    corr_azimuth = math.degrees(math.atan2(adjusted_deps[i], adjusted_lats[i]))
-                    if corr_azimuth < 0:
-                        corr_azimuth += 360
-                
-                corr_bearing = self.azimuth_to_bearing(corr_azimuth)
-                corrected_bearings.append(corr_bearing)
-                
-                results.append(f"{i+1:<6} {corr_bearing:<25} {corr_dist:>15.3f} {unit_label}")
-            
-            results.append("-" * 120)
-            results.append(f"{'TOTAL':<6} {'':<25} {sum(corrected_distances):>15.3f} {unit_label}")
-            
-            results.append("\n" + "=" * 120)
-            results.append("CALCULATION COMPLETED SUCCESSFULLY")
-            results.append("=" * 120)
-            
-            # Store results for export
-            self.last_results = "\n".join(results)
-            
-            # Display results
-            self.results_text.insert(tk.END, self.last_results)
-            
-            messagebox.showinfo("Success", "Calculation completed successfully!")
+            # Blank bearings or distances can be solved from the closure
+            if missing_measurements.has_missing(self.model.bearing_text, self.model.distance_text):
+                completion = self.complete_missing_measurements()
+                if completion is None:
+                    return
             
+            # Read input data
+            bearings, distances = self.model.legs()
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred:\n{str(e)}")
+            return
+        
+        project_info = {
+            "project_name": self.project_name.get(),
+            "user_name": self.user_name.get(),
+            "project_address": self.project_address.get(),
+            "traverse_id": self.traverse_id.get()
+        }
+        # Adjust and build the report on this tab's worker; the window stays usable meanwhile
+        self.worker.submit(traverse_report.calculate_traverse,
+                           (bearings, distances, project_info, self.units.get(), self.bearing_precision.get(),
+                            traverse_report.SECTIONS, completion),
+                           len(bearings), self.show_calculation, self.calculation_failed)
+        self.window.refresh_tab(self)
+    
+    def complete_missing_measurements(self):
+        """Offer to fill in blank measurements solved from the closure; returns the Completion, or None"""
+        bearing_text, distance_text = self.model.bearing_text, self.model.distance_text
+        unit_label, precision = self.get_unit_label(), self.bearing_precision.get()
+        try:
+            completion = missing_measurements.complete_legs(bearing_text, distance_text)
+        except missing_measurements.AmbiguousCompletion as e:
+            # Both solutions are proper polygons: only the user can say which was measured
+            choice = self.choose_solution(e.solutions, unit_label, precision)
+            if choice is None:
+                return None
+            completion = missing_measurements.complete_legs(bearing_text, distance_text, choice)
+        else:
+            lines = [value.describe(unit_label, precision) for value in completion.filled]
+            lines += completion.warnings
+            for alternative in completion.alternatives:
+                lines.append("Other solution: " + missing_measurements.describe_solution(alternative, unit_label,
+                                                                                         precision))
+            if not messagebox.askyesno("Missing Measurements",
+                                       "These blank measurements can be computed from the closure:\n\n"
+                                       + "\n".join(lines) + "\n\nFill them in and calculate?"):
+                return None
+        
+        old_rows = self.leg_rows()
+        new_rows = completion.rows(bearing_text, distance_text)
+        self.replace_legs(new_rows)
+        self.history.record(ReplaceEdit(old_rows, new_rows, "Compute Missing Measurements"))
+        self.is_modified = True
+        return completion
+    
+    def choose_solution(self, solutions, unit_label, precision):
+        """Ask which of several closure solutions to fill in; returns its index, or None if cancelled"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Missing Measurements")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(frame, text="Both of these close the traverse without its sides crossing.\n"
+                              "Choose the one that matches the field notes:",
+                  justify=tk.LEFT).pack(anchor=tk.W, pady=(0, 10))
+        selected = tk.IntVar(value=0)
+        for index, solution in enumerate(solutions):
+            ttk.Radiobutton(frame, variable=selected, value=index,
+                            text=missing_measurements.describe_solution(solution, unit_label, precision)
+                            ).pack(anchor=tk.W, pady=2)
+        
+        chosen = []
+        
+        def accept():
+            chosen.append(selected.get())
+            dialog.destroy()
+        
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons, text="Cancel", command=dialog.destroy).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Fill In and Calculate", command=accept).pack(side=tk.RIGHT, padx=5)
+        dialog.grab_set()
+        self.root.wait_window(dialog)
+        return chosen[0] if chosen else None
+    
+    def show_calculation(self, result):
+        """Display a finished calculation from the worker"""
+        # Store results for export
+        self.last_adjustment = result.adjustment
+        self.last_results = result.report
+        
+        # Display results
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, self.last_results)
+        self.results_table.set_adjustment(result.adjustment, self.get_unit_label(), self.bearing_precision.get())
+        self.clear_suspect_rows()
+        self.highlight_suspect_rows(result.suspect_legs)
+        self.update_plot()
+        self.window.refresh_tab(self)
+        
+        messagebox.showinfo("Success", self.tab_message("Calculation completed successfully!"))
+    
+    def calculation_failed(self, error):
+        self.window.refresh_tab(self)
+        messagebox.showerror("Error", self.tab_message(f"An error occurred:\n{str(error)}"))
+    
+    def clear_results(self):
+        """Clear the report and drop any calculation still running for the old data"""
+        self.worker.cancel()
+        self.results_text.delete(1.0, tk.END)
+        self.last_results = ""
+        self.window.refresh_tab(self)
+    
+    # Tab
+    def tab_title(self):
+        """Text shown on this project's tab"""
+        title = os.path.basename(self.current_file) if self.current_file else self.untitled_name
+        return f"{title} (calculating)" if self.worker.busy else title
+    
+    def tab_message(self, message):
+        """Prefix a message with the tab it concerns when more than one project is open"""
+        if len(self.window.tabs) > 1:
+            return f"{self.tab_title()}: {message}"
+        return message
+    
+    def is_blank(self):
+        """True for an untouched new tab, which opening a file can reuse"""
+        return (self.current_file is None and self.project is None and not self.is_modified
+                and not self.worker.busy and not any(self.model.bearing_text)
+                and not any(self.model.distance_text))
+    
+    def highlight_suspect_rows(self, legs):
+        """Mark input rows suspected of containing a blunder"""
+        for leg in legs:
+            if leg < len(self.side_labels):
+                self.side_labels[leg].configure(foreground="#C0392B", text=f"{leg+1} ⚠")
+                self.bearing_entries[leg].configure(style="Suspect.TEntry")
+                self.distance_entries[leg].configure(style="Suspect.TEntry")
+    
+    def clear_suspect_rows(self):
+        """Remove blunder highlighting from all input rows"""
+        for i, label in enumerate(self.side_labels):
+            label.configure(foreground="", text=f"{i+1}")
+            self.bearing_entries[i].configure(style="TEntry")
+            self.distance_entries[i].configure(style="TEntry")
+    
+    def update_plot(self):
+        """Draw the last adjustment and the unadjusted (unclosed) traverse on the plot tab"""
+        adj = self.last_adjustment
+        if adj is None:
+            self.plot.clear()
+            return
+        unadjusted = [(0.0, 0.0)]
+        northing = easting = 0.0
+        for lat, dep in zip(adj.latitudes, adj.departures):
+            northing += lat
+            easting += dep
+            unadjusted.append((northing, easting))
+        self.plot.set_traverse(adj.coordinates(), unadjusted)
+    
+    # Multi-traverse projects
+    def show_project_traverses(self):
+        """Show or hide the traverse selector for the open project"""
+        if self.project is None:
+            self.traverse_selector_frame.pack_forget()
+            return
+        self.traverse_selector['values'] = list(self.project.traverses)
+        self.traverse_selector_frame.pack(side=tk.LEFT)
+    
+    def store_current_traverse(self):
+        """Copy the entries back into the project's current traverse"""
+        name = self.current_traverse.get()
+        if self.project is None or name not in self.project.traverses:
+            return
+        traverse = self.project.traverses[name]
+        self.commit_focused_edit()
+        bearings = list(self.model.bearing_text)
+        distances = list(self.model.distance_text)
+        if bearings == traverse.bearings and distances == traverse.distances:
+            return
+        
+        # Keep existing station IDs and number any new ones after the traverse name
+        station_count = len(bearings) if traverse.closed else len(bearings) + 1
+        station_ids = traverse.station_ids[:station_count]
+        station_ids += [f"{name}-{i+1}" for i in range(len(station_ids), station_count)]
+        self.project.add_traverse(traverse_project.Traverse(
+            name, station_ids, bearings, distances, traverse.closed))
+    
+    def on_traverse_selected(self):
+        """Switch the input fields to another traverse of the project"""
+        name = self.current_traverse.get()
+        previous = self._shown_traverse
+        if previous == name:
+            return
+        self.current_traverse.set(previous)
+        self.store_current_traverse()
+        self.current_traverse.set(name)
+        self._shown_traverse = name
+        self.load_project_data(traverse_project.traverse_to_legacy_data(self.project, name))
+        self.clear_results()
+        self.results_table.clear()
+        self.plot.clear()
     
     # File operations
     def get_project_data(self):
         """Get all project data as a dictionary"""
+        self.commit_focused_edit()
+        if self.project is not None:
+            # Multi-traverse project: write every traverse back, not just the one on screen
+            self.store_current_traverse()
+            self.project.project_info.update({
+                "project_name": self.project_name.get(),
+                "user_name": self.user_name.get(),
+                "project_address": self.project_address.get()
+            })
+            self.project.settings = {
+                "traverse_type": self.traverse_type.get(),
+                "units": self.units.get(),
+                "bearing_precision": self.bearing_precision.get()
+            }
+            return self.project.to_dict()
+        
         data = {
             "project_info": {
                 "project_name": self.project_name.get(),
@@ -637,20 +586,13 @@ class PolygonTraverseCalculator:
             },
             "settings": {
                 "traverse_type": self.traverse_type.get(),
-                "units": self.units.get()
+                "units": self.units.get(),
+                "bearing_precision": self.bearing_precision.get()
             },
-            "num_sides": self.num_sides.get(),
-            "data": []
+            "num_sides": len(self.model),
+            "data": self.model.to_data()
         }
         
-        for i in range(len(self.bearing_entries)):
-            bearing = self.bearing_entries[i].get()
-            distance = self.distance_entries[i].get()
-            data["data"].append({
-                "bearing": bearing,
-                "distance": distance
-            })
-        
         return data
     
     def load_project_data(self, data):
@@ -664,19 +606,16 @@ class PolygonTraverseCalculator:
         # Load settings
         self.traverse_type.set(data.get("settings", {}).get("traverse_type", "closed"))
         self.units.set(data.get("settings", {}).get("units", "metric"))
+        self.bearing_precision.set(data.get("settings", {}).get("bearing_precision", 0))
         self.on_traverse_type_change()
         
-        # Load sides
-        self.num_sides.set(data.get("num_sides", 4))
+        # Load sides and data
+        n = data.get("num_sides", 4)
+        rows = [(item.get("bearing", ""), item.get("distance", "")) for item in data.get("data", [])[:n]]
+        self.model.replace(rows)
+        self.num_sides.set(n)
         self.generate_fields()
-        
-        # Load data
-        for i, item in enumerate(data.get("data", [])):
-            if i < len(self.bearing_entries):
-                self.bearing_entries[i].delete(0, tk.END)
-                self.bearing_entries[i].insert(0, item.get("bearing", ""))
-                self.distance_entries[i].delete(0, tk.END)
-                self.distance_entries[i].insert(0, item.get("distance", ""))
+        self.history.clear()
     
     def save_file(self):
         """Save to current file or prompt for new file"""
@@ -698,34 +637,78 @@ class PolygonTraverseCalculator:
     def save_to_file(self, filename):
         """Save project data to file"""
         try:
-            data = self.get_project_data()
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            traverse_file.write_project(filename, self.get_project_data())
             self.current_file = filename
             self.is_modified = False
-            self.file_label.config(text=f"File: {os.path.basename(filename)}")
+            self.window.refresh_tab(self)
+            self.window.update_catalog(filename)
+            self.window.recent_files.add(filename)
             messagebox.showinfo("Success", f"File saved successfully:\n{filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save file:\n{str(e)}")
     
-    def import_file(self):
-        """Import a traverse file"""
+    def load_file(self, filename):
+        """Load a traverse file into this tab; returns False (after reporting why) if it fails"""
+        try:
+            data = traverse_file.read_project(filename)
+            if traverse_project.is_project_data(data):
+                self.project = traverse_project.TraverseProject.from_dict(data)
+                first = next(iter(self.project.traverses))
+                self.current_traverse.set(first)
+                self._shown_traverse = first
+                data = traverse_project.traverse_to_legacy_data(self.project, first)
+            else:
+                self.project = None
+            self.show_project_traverses()
+            self.load_project_data(data)
+            self.current_file = filename
+            self.is_modified = False
+            self.window.refresh_tab(self)
+            self.window.recent_files.add(filename)
+            return True
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import file:\n{str(e)}")
+            return False
+    
+    def import_field_data(self):
+        """Replace the input legs with those read from a CSV, LandXML or raw data-collector file"""
         filename = filedialog.askopenfilename(
-            defaultextension=".trv",
-            filetypes=[("Traverse Files", "*.trv"), ("All Files", "*.*")],
-            title="Import Traverse File"
+            filetypes=[("Field Data", "*.csv *.txt *.xml *.landxml *.rw5 *.raw"),
+                       ("CSV Files", "*.csv *.txt"),
+                       ("LandXML Files", "*.xml *.landxml"),
+                       ("Raw Data Files", "*.rw5 *.raw"),
+                       ("All Files", "*.*")],
+            title="Import Field Data"
         )
-        if filename:
-            try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-                self.load_project_data(data)
-                self.current_file = filename
-                self.is_modified = False
-                self.file_label.config(text=f"File: {os.path.basename(filename)}")
-                messagebox.showinfo("Success", f"File imported successfully:\n{filename}")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to import file:\n{str(e)}")
+        if not filename:
+            return
+        try:
+            imported = traverse_import.import_traverse(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import field data:\n{str(e)}")
+            return
+        
+        if len(imported) == 0:
+            message = "No traverse legs found in file."
+            if imported.error_count:
+                message += "\n\n" + imported.error_summary()
+            messagebox.showerror("Error", message)
+            return
+        
+        self.commit_focused_edit()
+        old_rows = self.leg_rows()
+        new_rows = list(traverse_import.azimuth_entries(imported))
+        self.replace_legs(new_rows)
+        self.history.record(ReplaceEdit(old_rows, new_rows, f"Import {os.path.basename(filename)}"))
+        self.clear_results()
+        self.is_modified = True
+        
+        message = f"Imported {len(imported)} legs from {os.path.basename(filename)}"
+        if imported.error_count:
+            messagebox.showwarning("Import Warnings",
+                f"{message}\n{imported.error_count} lines were skipped:\n\n{imported.error_summary()}")
+        else:
+            messagebox.showinfo("Success", message)
     
     def print_output(self):
         """Print the output (platform dependent)"""
@@ -833,41 +816,610 @@ class PolygonTraverseCalculator:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export:\\n{str(e)}")
     
-    def close_project(self):
-        """Close current project"""
+    def export_coordinates(self):
+        """Export adjusted coordinates and corrected legs as LandXML, DXF or GeoJSON"""
+        if self.last_adjustment is None:
+            messagebox.showwarning("Warning", "No results to export. Please calculate first.")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xml",
+            filetypes=[("LandXML Files", "*.xml"),
+                       ("DXF Files", "*.dxf"),
+                       ("GeoJSON Files", "*.geojson"),
+                       ("All Files", "*.*")],
+            title="Export Coordinates"
+        )
+        if filename:
+            try:
+                name = self.traverse_id.get() or self.project_name.get() or "Traverse"
+                traverse_export.export_traverse(filename, self.last_adjustment, name=name,
+                                                units=self.units.get())
+                messagebox.showinfo("Success", f"Coordinates exported successfully:\n{filename}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export:\n{str(e)}")
+    
+    def confirm_close(self, action="closing"):
+        """Offer to save unsaved changes; returns False if the user cancelled"""
         if self.is_modified:
             result = messagebox.askyesnocancel("Save Changes", 
-                "Do you want to save changes before closing?")
+                f"Do you want to save changes to {self.tab_title()} before {action}?")
             if result is None:  # Cancel
-                return
+                return False
             elif result:  # Yes
                 self.save_file()
+        return True
+    
+    def close(self):
+        """Stop this tab's worker and destroy its widgets"""
+        self.worker.shutdown()
+        self.frame.destroy()
+    
+    def get_spatial_index(self):
+        """Spatial index over the adjusted stations, or None if nothing has been calculated"""
+        if self.project is not None:
+            # Bring every traverse's coordinates up to date (only edited traverses are recomputed)
+            self.store_current_traverse()
+            failures = [name for name, outcome in self.project.adjust_all().items()
+                        if isinstance(outcome, Exception)]
+            if failures:
+                messagebox.showwarning("Warning", "Could not adjust: " + ", ".join(failures))
+            return self.project.spatial_index
+        if self.last_adjustment is None:
+            return None
+        index = StationGrid()
+        index.add_adjustment(self.last_adjustment)
+        return index
+    
+    def find_stations(self):
+        """Look up adjusted stations by location"""
+        index = self.get_spatial_index()
+        if index is None or len(index) == 0:
+            messagebox.showwarning("Warning", "No station coordinates. Please calculate first.")
+            return
         
-        # Reset everything
-        self.project_name.set("")
-        self.user_name.set("")
-        self.project_address.set("")
-        self.traverse_id.set("")
-        self.num_sides.set(4)
-        self.generate_fields()
-        self.results_text.delete(1.0, tk.END)
-        self.current_file = None
-        self.is_modified = False
-        self.file_label.config(text="File: <new file>")
-        self.last_results = ""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Find Stations")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        northing = tk.StringVar(value="0")
+        easting = tk.StringVar(value="0")
+        radius = tk.StringVar(value="10")
+        unit_label = self.get_unit_label()
+        
+        ttk.Label(frame, text="Northing:").grid(row=0, column=0, sticky=tk.E, padx=5, pady=3)
+        ttk.Entry(frame, textvariable=northing, width=15).grid(row=0, column=1, sticky=tk.W, padx=5, pady=3)
+        ttk.Label(frame, text="Easting:").grid(row=1, column=0, sticky=tk.E, padx=5, pady=3)
+        ttk.Entry(frame, textvariable=easting, width=15).grid(row=1, column=1, sticky=tk.W, padx=5, pady=3)
+        ttk.Label(frame, text=f"Radius / Tolerance ({unit_label}):").grid(row=2, column=0, sticky=tk.E, padx=5, pady=3)
+        ttk.Entry(frame, textvariable=radius, width=15).grid(row=2, column=1, sticky=tk.W, padx=5, pady=3)
+        
+        output = scrolledtext.ScrolledText(frame, width=60, height=15, font=("Courier", 9))
+        output.grid(row=4, column=0, columnspan=4, pady=(10, 0))
+        
+        def label(key):
+            return f"{key[0]}: {key[1]}" if isinstance(key, tuple) else f"Station {key}"
+        
+        def show(lines):
+            output.delete(1.0, tk.END)
+            output.insert(tk.END, "\n".join(lines) if lines else "No stations found.")
+        
+        def run(query):
+            try:
+                n, e, r = float(northing.get()), float(easting.get()), float(radius.get())
+            except ValueError:
+                messagebox.showerror("Error", "Northing, easting and radius must be numbers.", parent=dialog)
+                return
+            if query == "within":
+                show([f"{label(key):<40} {d:>12.3f} {unit_label}" for d, key in index.within(n, e, r)])
+            elif query == "nearest":
+                show([f"{label(key):<40} {d:>12.3f} {unit_label}" for d, key in index.nearest(n, e, 5)])
+            else:
+                pairs = index.duplicates(r)
+                if self.project is not None:
+                    # A shared station reached by two traverses is not a duplicate
+                    pairs = [(d, a, b) for d, a, b in pairs if a[1] != b[1]]
+                show([f"{label(a)}  ~  {label(b)}  ({d:.3f} {unit_label})" for d, a, b in pairs])
+        
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=3, column=0, columnspan=4, pady=(10, 0))
+        ttk.Button(buttons, text="Within Radius", command=lambda: run("within")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Nearest 5", command=lambda: run("nearest")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Duplicate Points", command=lambda: run("duplicates")).pack(side=tk.LEFT, padx=5)
+    
+    def monte_carlo_dialog(self):
+        """Ask for measurement standard errors and run a Monte Carlo error propagation"""
+        if not self.last_results:
+            messagebox.showwarning("Warning", "Please calculate first.")
+            return
+        try:
+            self.commit_focused_edit()
+            bearings, distances = self.model.legs()
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred:\n{str(e)}")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Monte Carlo Error Propagation")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        unit_label = self.get_unit_label()
+        fields = [
+            ("Bearing standard error (seconds):", tk.StringVar(value="5")),
+            (f"Distance standard error ({unit_label}):", tk.StringVar(value="0.005")),
+            ("Distance error (ppm):", tk.StringVar(value="0")),
+            ("Number of trials:", tk.StringVar(value=str(monte_carlo.DEFAULT_TRIALS))),
+            ("Confidence level (%):", tk.StringVar(value="95"))
+        ]
+        for row, (text, var) in enumerate(fields):
+            ttk.Label(frame, text=text).grid(row=row, column=0, sticky=tk.E, padx=5, pady=3)
+            ttk.Entry(frame, textvariable=var, width=15).grid(row=row, column=1, sticky=tk.W, padx=5, pady=3)
+        
+        progress_bar = ttk.Progressbar(frame, length=300, mode='determinate')
+        progress_bar.grid(row=len(fields), column=0, columnspan=2, pady=(10, 5))
+        
+        def finish(result):
+            report = monte_carlo.format_report(result, unit_label)
+            self.last_results += "\n\n" + report
+            self.results_text.insert(tk.END, "\n\n" + report)
+            self.results_text.see(tk.END)
+            dialog.destroy()
+        
+        def failed(error):
+            run_button.config(state="normal")
+            messagebox.showerror("Error", f"Monte Carlo run failed:\n{error}", parent=dialog)
+        
+        def run():
+            try:
+                sigma_bearing, sigma_distance, ppm = (float(fields[i][1].get()) for i in range(3))
+                trials = int(fields[3][1].get())
+                confidence = float(fields[4][1].get()) / 100
+                if not 0 < confidence < 1:
+                    raise ValueError("Confidence must be between 0 and 100")
+            except ValueError as e:
+                messagebox.showerror("Error", f"Invalid input:\n{e}", parent=dialog)
+                return
+            run_button.config(state="disabled")
+            
+            def progress(value):
+                self.root.after(0, lambda: progress_bar.configure(value=value))
+            
+            def worker():
+                try:
+                    result = monte_carlo.run_monte_carlo(bearings, distances, sigma_bearing, sigma_distance, ppm,
+                                                         trials=trials, confidence=confidence,
+                                                         progress_callback=progress)
+                except Exception as e:
+                    self.root.after(0, lambda error=e: failed(error))
+                    return
+                self.root.after(0, lambda: finish(result))
+            
+            # Run on a background thread; the trials themselves go to a process pool
+            threading.Thread(target=worker, daemon=True).start()
+        
+        run_button = ttk.Button(frame, text="Run", command=run)
+        run_button.grid(row=len(fields) + 1, column=0, columnspan=2, pady=(5, 0))
+
+
+class TraverseCalculatorWindow:
+    """Main window: menus, status bar and a notebook with one PolygonTraverseCalculator tab per project"""
+    
+    def __init__(self, root):
+        self.root = root
+        self.root.title("Traverse Calculator")
+        self.root.geometry("1300x900")
+        
+        # Open projects, in tab order
+        self.tabs = []
+        self._untitled_count = 0
+        
+        # Project catalog, opened on first use
+        self.catalog = None
+        self.recent_files = RecentFiles()
+        
+        # Create icon
+        self.create_icon()
+        
+        # Setup UI
+        self.setup_menu()
+        self.setup_ui()
+        self.setup_statusbar()
+        self.new_tab()
+        
+        # Update clock
+        self.update_clock()
+        
+        # Check for updates on startup (after 3 seconds to let UI load)
+        if UPDATER_AVAILABLE:
+            updater.check_for_updates_on_startup(self.root, delay_ms=3000)
+        
+    def create_icon(self):
+        """Create a colorful polygon icon"""
+        # Create a small toplevel window temporarily to generate icon
+        icon_size = 32
+        icon_canvas = tk.Canvas(self.root, width=icon_size, height=icon_size, 
+                                bg='white', highlightthickness=0)
+        
+        # Draw a colorful pentagon
+        center_x, center_y = icon_size // 2, icon_size // 2
+        radius = 12
+        points = []
+        colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
+        
+        for i in range(5):
+            angle = math.radians(90 + i * 72)
+            x = center_x + radius * math.cos(angle)
+            y = center_y - radius * math.sin(angle)
+            points.extend([x, y])
+        
+        icon_canvas.create_polygon(points, fill='#4ECDC4', outline='#2C3E50', width=2)
+        
+        # We can't easily set a custom icon in tkinter without external files
+        # The icon will be displayed in the header instead
+        icon_canvas.destroy()
+        
+    def tab_command(self, name):
+        """Menu command that calls a method of the selected tab"""
+        return lambda: getattr(self.current_tab(), name)()
+    
+    def setup_menu(self):
+        """Setup the menu bar"""
+        menubar = Menu(self.root)
+        self.root.config(menu=menubar)
+        
+        # File menu
+        file_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="File", menu=file_menu)
+        file_menu.add_command(label="New Tab", command=self.new_tab, accelerator="Ctrl+N")
+        file_menu.add_command(label="Save", command=self.tab_command("save_file"), accelerator="Ctrl+S")
+        file_menu.add_command(label="Save As...", command=self.tab_command("save_file_as"))
+        file_menu.add_command(label="Import Input File...", command=self.import_file)
+        file_menu.add_command(label="Recent Projects...", command=self.project_browser)
+        file_menu.add_command(label="Import Field Data...", command=self.tab_command("import_field_data"))
+        file_menu.add_separator()
+        file_menu.add_command(label="Print", command=self.tab_command("print_output"))
+        file_menu.add_command(label="Export to PDF...", command=self.tab_command("export_pdf"))
+        file_menu.add_command(label="Export Coordinates...", command=self.tab_command("export_coordinates"))
+        file_menu.add_separator()
+        file_menu.add_command(label="Close Tab", command=self.close_tab, accelerator="Ctrl+W")
+        file_menu.add_command(label="Exit", command=self.exit_app)
+        
+        # Edit menu
+        self.edit_menu = Menu(menubar, tearoff=0, postcommand=self.update_edit_menu)
+        menubar.add_cascade(label="Edit", menu=self.edit_menu)
+        self.edit_menu.add_command(label="Undo", command=self.tab_command("undo"), accelerator="Ctrl+Z")
+        self.edit_menu.add_command(label="Redo", command=self.tab_command("redo"), accelerator="Ctrl+Y")
+        
+        # Bind keyboard shortcuts
+        self.root.bind('<Control-n>', lambda e: self.new_tab())
+        self.root.bind('<Control-w>', lambda e: self.close_tab())
+        self.root.bind('<Control-s>', lambda e: self.current_tab().save_file())
+        self.root.bind('<Control-z>', lambda e: self.current_tab().undo())
+        self.root.bind('<Control-y>', lambda e: self.current_tab().redo())
+        
+        # Options/Settings menu; the radio buttons are attached to the selected tab's settings
+        options_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Options", menu=options_menu)
+        
+        # Traverse Type submenu
+        self.traverse_menu = Menu(options_menu, tearoff=0)
+        options_menu.add_cascade(label="Traverse Type", menu=self.traverse_menu)
+        self.traverse_menu.add_radiobutton(label="Closed Traverse", value="closed",
+                                           command=self.tab_command("on_traverse_type_change"))
+        self.traverse_menu.add_radiobutton(label="Open Traverse (Coming Soon)", value="open", state="disabled")
+        
+        options_menu.add_separator()
+        
+        # Units submenu
+        self.units_menu = Menu(options_menu, tearoff=0)
+        options_menu.add_cascade(label="Units", menu=self.units_menu)
+        self.units_menu.add_radiobutton(label="English (feet)", value="english",
+                                        command=self.tab_command("on_units_change"))
+        self.units_menu.add_radiobutton(label="Metric (meters)", value="metric",
+                                        command=self.tab_command("on_units_change"))
+        
+        # Bearing precision submenu
+        self.precision_menu = Menu(options_menu, tearoff=0)
+        options_menu.add_cascade(label="Bearing Precision", menu=self.precision_menu)
+        for places, label in ((0, "Whole Seconds"), (1, "0.1 Seconds"), (2, "0.01 Seconds")):
+            self.precision_menu.add_radiobutton(label=label, value=places,
+                                                command=self.tab_command("on_bearing_precision_change"))
+        
+        # Tools menu
+        tools_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Tools", menu=tools_menu)
+        tools_menu.add_command(label="Find Stations...", command=self.tab_command("find_stations"))
+        tools_menu.add_command(label="Project Catalog...", command=self.catalog_dialog)
+        tools_menu.add_command(label="Monte Carlo Error Propagation...",
+                               command=self.tab_command("monte_carlo_dialog"))
+        
+        # Help menu
+        help_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Help", menu=help_menu)
+        help_menu.add_command(label="Check for Updates...", command=self.check_for_updates)
+        help_menu.add_separator()
+        help_menu.add_command(label="About", command=self.show_about)
+        help_menu.add_command(label="Help Contents (Coming Soon)", state="disabled")
+        
+    def setup_statusbar(self):
+        """Setup the status bar at the bottom"""
+        self.statusbar = ttk.Frame(self.root)
+        self.statusbar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # File label
+        self.file_label = ttk.Label(self.statusbar, text="File: <new file>", 
+                                     relief=tk.SUNKEN, anchor=tk.W, padding=(5, 2))
+        self.file_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Date/time label
+        self.datetime_label = ttk.Label(self.statusbar, text="", 
+                                         relief=tk.SUNKEN, anchor=tk.E, padding=(5, 2))
+        self.datetime_label.pack(side=tk.RIGHT)
+        
+    def update_clock(self):
+        """Update the clock in the status bar"""
+        now = datetime.now()
+        self.datetime_label.config(text=now.strftime("%m/%d/%Y    %I:%M %p"))
+        self.root.after(1000, self.update_clock)
+        
+    def setup_ui(self):
+        # Style for input rows flagged by the blunder analysis
+        style = ttk.Style(self.root)
+        style.configure("Suspect.TEntry", fieldbackground="#FADBD8", foreground="#C0392B")
+        
+        # Main frame
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Header with program name and icon
+        header_frame = ttk.Frame(main_frame)
+        header_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        # Create colorful polygon icon
+        icon_canvas = tk.Canvas(header_frame, width=40, height=40, 
+                                bg=self.root.cget('bg'), highlightthickness=0)
+        icon_canvas.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Draw pentagon icon
+        center_x, center_y = 20, 20
+        radius = 15
+        points = []
+        for i in range(5):
+            angle = math.radians(90 + i * 72)
+            x = center_x + radius * math.cos(angle)
+            y = center_y - radius * math.sin(angle)
+            points.extend([x, y])
+        icon_canvas.create_polygon(points, fill='#4ECDC4', outline='#2C3E50', width=2)
+        
+        # Draw inner details
+        inner_radius = 8
+        inner_points = []
+        for i in range(5):
+            angle = math.radians(90 + i * 72)
+            x = center_x + inner_radius * math.cos(angle)
+            y = center_y - inner_radius * math.sin(angle)
+            inner_points.extend([x, y])
+        icon_canvas.create_polygon(inner_points, fill='#96CEB4', outline='#2C3E50', width=1)
+        
+        # Program title
+        title_label = ttk.Label(header_frame, text="Traverse Calculator", 
+                                 font=("Arial", 18, "bold"), foreground="#2C3E50")
+        title_label.pack(side=tk.LEFT)
+        
+        # One tab per open project
+        self.notebook = ttk.Notebook(main_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.on_tab_changed())
+    
+    # Tabs
+    def current_tab(self):
+        return self.tabs[self.notebook.index("current")]
+    
+    def new_tab(self):
+        """Open an empty project in a new tab and select it"""
+        self._untitled_count += 1
+        tab = PolygonTraverseCalculator(self, self.notebook, f"Untitled {self._untitled_count}")
+        self.tabs.append(tab)
+        self.notebook.add(tab.frame, text=tab.tab_title())
+        self.notebook.select(tab.frame)
+        return tab
+    
+    def close_tab(self, tab=None):
+        """Close a tab (the selected one by default), offering to save it first"""
+        tab = tab or self.current_tab()
+        if not tab.confirm_close():
+            return
+        self.tabs.remove(tab)
+        self.notebook.forget(tab.frame)
+        tab.close()
+        if not self.tabs:
+            self.new_tab()
+    
+    def refresh_tab(self, tab):
+        """Update a tab's title, and the status bar if it is the selected tab"""
+        if tab not in self.tabs:
+            return
+        self.notebook.tab(tab.frame, text=tab.tab_title())
+        if tab is self.current_tab():
+            self.update_file_label()
+    
+    def on_tab_changed(self):
+        """Point the settings menus and status bar at the newly selected tab"""
+        if not self.tabs:
+            return
+        tab = self.current_tab()
+        for index in range(2):
+            self.traverse_menu.entryconfigure(index, variable=tab.traverse_type)
+            self.units_menu.entryconfigure(index, variable=tab.units)
+        for index in range(3):
+            self.precision_menu.entryconfigure(index, variable=tab.bearing_precision)
+        self.update_file_label()
+    
+    def update_file_label(self):
+        tab = self.current_tab()
+        name = os.path.basename(tab.current_file) if tab.current_file else "<new file>"
+        self.file_label.config(text=f"File: {name}")
+    
+    def update_edit_menu(self):
+        """Show what Undo/Redo will do and grey them out when there is nothing to do"""
+        history = self.current_tab().history
+        undo_label, redo_label = history.undo_label(), history.redo_label()
+        self.edit_menu.entryconfigure(0, label=f"Undo {undo_label}".strip(),
+                                      state="normal" if undo_label else "disabled")
+        self.edit_menu.entryconfigure(1, label=f"Redo {redo_label}".strip(),
+                                      state="normal" if redo_label else "disabled")
+    
+    # File operations
+    def import_file(self):
+        """Open one or more traverse files, each in its own tab"""
+        filenames = filedialog.askopenfilenames(
+            defaultextension=".trv",
+            filetypes=[("Traverse Files", "*.trv"), ("All Files", "*.*")],
+            title="Import Traverse File"
+        )
+        opened = self.open_files(filenames)
+        if len(opened) == 1:
+            messagebox.showinfo("Success", f"File imported successfully:\n{opened[0]}")
+        elif opened:
+            messagebox.showinfo("Success", f"{len(opened)} files imported.")
+    
+    def open_files(self, filenames):
+        """Load files into tabs, reusing the selected tab if it is blank; returns the files opened"""
+        opened = []
+        for filename in filenames:
+            tab = self.current_tab()
+            if not tab.is_blank():
+                tab = self.new_tab()
+            if tab.load_file(filename):
+                opened.append(filename)
+        return opened
     
     def exit_app(self):
         """Exit the application"""
-        if self.is_modified:
-            result = messagebox.askyesnocancel("Save Changes", 
-                "Do you want to save changes before exiting?")
-            if result is None:  # Cancel
+        for tab in list(self.tabs):
+            self.notebook.select(tab.frame)
+            if not tab.confirm_close("exiting"):
                 return
-            elif result:  # Yes
-                self.save_file()
         
+        for tab in self.tabs:
+            tab.worker.shutdown()
+        if self.catalog is not None:
+            self.catalog.close()
         self.root.destroy()
     
+    def project_browser(self):
+        """Browse recent or folder .trv files by their headers and open them in tabs"""
+        ProjectBrowser(self.root, self.recent_files, self.open_files)
+    
+    # Project catalog
+    def open_catalog(self):
+        if self.catalog is None:
+            self.catalog = project_catalog.ProjectCatalog()
+        return self.catalog
+    
+    def update_catalog(self, filename):
+        """Re-index a saved file, if the project catalog is in use"""
+        if self.catalog is None and not os.path.exists(project_catalog.DEFAULT_CATALOG):
+            return
+        try:
+            self.open_catalog().scan(folders=[], files=[filename])
+        except Exception:
+            # The file itself was saved; the catalog catches up on its next scan
+            pass
+    
+    def catalog_dialog(self):
+        """Search the project catalog and open matching files in tabs"""
+        try:
+            catalog = self.open_catalog()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not open the project catalog:\n{str(e)}")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Project Catalog")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        filters = [("Project Name:", "project_name"), ("User Name:", "user_name"),
+                   ("Project Address:", "project_address"), ("Traverse ID:", "traverse_id")]
+        values = {}
+        for row, (text, key) in enumerate(filters):
+            values[key] = tk.StringVar()
+            ttk.Label(frame, text=text).grid(row=row, column=0, sticky=tk.E, padx=5, pady=3)
+            ttk.Entry(frame, textvariable=values[key], width=40).grid(row=row, column=1, sticky=tk.W, padx=5, pady=3)
+        worse_than = tk.StringVar()
+        ttk.Label(frame, text="Accuracy worse than 1:").grid(row=len(filters), column=0, sticky=tk.E, padx=5, pady=3)
+        ttk.Entry(frame, textvariable=worse_than, width=15).grid(row=len(filters), column=1, sticky=tk.W,
+                                                                 padx=5, pady=3)
+        
+        table = ttk.Frame(frame)
+        table.grid(row=len(filters) + 2, column=0, columnspan=2, sticky="nsew", pady=(10, 0))
+        columns = (("traverse", "Traverse", 120), ("project", "Project", 160), ("address", "Address", 200),
+                   ("legs", "Legs", 60), ("accuracy", "Accuracy", 110), ("file", "File", 320))
+        tree = ttk.Treeview(table, columns=[c[0] for c in columns], show="headings", height=15)
+        for column, heading, width in columns:
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor=tk.E if column in ("legs", "accuracy") else tk.W)
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        status = ttk.Label(frame, text="")
+        status.grid(row=len(filters) + 3, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        def search():
+            try:
+                limit = float(worse_than.get()) if worse_than.get().strip() else None
+            except ValueError:
+                messagebox.showerror("Error", "Accuracy must be a number.", parent=dialog)
+                return
+            rows = catalog.query(worse_than=limit, limit=CATALOG_DISPLAY_LIMIT + 1,
+                                 **{key: var.get().strip() for key, var in values.items()})
+            tree.delete(*tree.get_children())
+            for row in rows[:CATALOG_DISPLAY_LIMIT]:
+                accuracy = row["error"] or project_catalog.format_accuracy(row["accuracy"], row["closed"],
+                                                                             computed=row["computed"])
+                tree.insert("", tk.END, values=(row["traverse_id"], row["project_name"], row["project_address"],
+                                                row["legs"], accuracy, row["path"]))
+            shown = (f"first {CATALOG_DISPLAY_LIMIT} traverses" if len(rows) > CATALOG_DISPLAY_LIMIT
+                     else f"{len(rows)} traverses")
+            status.config(text=f"{shown} shown; {len(catalog)} files in {len(catalog.folders())} folders")
+        
+        def rescan():
+            status.config(text="Scanning...")
+            dialog.update_idletasks()
+            try:
+                catalog.scan()
+            except Exception as e:
+                messagebox.showerror("Error", f"Catalog scan failed:\n{str(e)}", parent=dialog)
+            search()
+        
+        def add_folder():
+            folder = filedialog.askdirectory(parent=dialog, title="Add Folder to Catalog")
+            if folder:
+                catalog.add_folder(folder)
+                rescan()
+        
+        def open_selected():
+            paths = dict.fromkeys(tree.set(item, "file") for item in tree.selection())
+            self.open_files(list(paths))
+        
+        tree.bind("<Double-1>", lambda e: open_selected())
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=len(filters) + 1, column=0, columnspan=2, pady=(10, 0))
+        ttk.Button(buttons, text="Search", command=search).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Add Folder...", command=add_folder).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Rescan", command=rescan).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Open Selected", command=open_selected).pack(side=tk.LEFT, padx=5)
+        
+        # Files changed since the last scan are re-read before the first search
+        rescan()
+    
     def check_for_updates(self):
         """Manually check for updates"""
         if UPDATER_AVAILABLE:
@@ -894,8 +1446,20 @@ class PolygonTraverseCalculator:
 
 
 def main():
+    # Needed for the process pools (Monte Carlo) in the frozen executable
+    multiprocessing.freeze_support()
+    
+    # Headless service mode: TraverseCalculator --serve [--host H] [--port N] [--workers N]
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        import traverse_service
+        traverse_service.main(["serve"] + sys.argv[2:])
+        return
+    
     root = tk.Tk()
-    app = PolygonTraverseCalculator(root)
+    app = TraverseCalculatorWindow(root)
+    
+    # Traverse files named on the command line open in their own tabs
+    app.open_files(sys.argv[1:])
     
     # Handle window close
     root.protocol("WM_DELETE_WINDOW", app.exit_app)
@@ -8,7 +8,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('version.json', '.')],  # Include version file for reference
-    hiddenimports=['updater'],  # Include the updater module
+    hiddenimports=['updater', 'delta_patch'],  # Include the updater and delta patch modules
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
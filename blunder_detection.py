@@ -0,0 +1,110 @@
+"""
+Blunder Detection for Traverse Calculator
+Locates a single blunder in a closed traverse that failed to close, by testing the
+linear misclosure vector against every leg and station in one O(n) pass instead of
+re-running the adjustment once per leg.
+
+Three single-blunder hypotheses are tested:
+    distance  one leg's distance is wrong: the misclosure is parallel to that leg
+    bearing   one leg's bearing is wrong: removing the misclosure leaves that leg's length unchanged
+    angle     one turned angle is wrong: every later leg is rotated about that station, so the
+              start and the unclosed end point are equally far from it
+"""
+
+import math
+
+# Relative accuracy (1:N) below which calculate() runs the blunder analysis
+BLUNDER_ACCURACY_THRESHOLD = 5000
+
+# A hypothesis is plausible when it leaves less than this fraction of the misclosure unexplained
+PLAUSIBLE_RESIDUAL_RATIO = 0.1
+
+
+class BlunderSuspect:
+    """One single-blunder hypothesis and how well it explains the misclosure"""
+    
+    def __init__(self, kind, leg, residual, correction, misclosure):
+        # 'distance', 'bearing' or 'angle'
+        self.kind = kind
+        # 0-based leg index (for 'angle', the first leg after the suspect station)
+        self.leg = leg
+        # Misclosure left over if this blunder is corrected (project units)
+        self.residual = residual
+        # Suggested fix: distance change for 'distance', degrees for 'bearing' and 'angle'
+        self.correction = correction
+        self.plausible = residual <= PLAUSIBLE_RESIDUAL_RATIO * misclosure
+    
+    def describe(self, unit_label="m"):
+        if self.kind == 'distance':
+            return f"Distance of side {self.leg + 1} off by {-self.correction:+.3f} {unit_label}"
+        if self.kind == 'bearing':
+            return f"Bearing of side {self.leg + 1} off by {-self.correction:+.4f}°"
+        return f"Angle at start of side {self.leg + 1} off by {-self.correction:+.4f}° (sides {self.leg + 1}-end rotated)"
+
+
+def _signed_angle(ax, ay, bx, by):
+    """Angle in degrees that rotates vector a onto vector b, in the azimuth sense"""
+    # x is east and y is north, so clockwise (increasing azimuth) is the negative math angle
+    return -math.degrees(math.atan2(ax * by - ay * bx, ax * bx + ay * by))
+
+
+def locate_blunders(bearings, distances, max_suspects=None):
+    """
+    Rank single-blunder hypotheses for a closed traverse.
+    bearings are unadjusted azimuths in decimal degrees. Returns BlunderSuspects
+    sorted from the best explanation (smallest residual) to the worst.
+    """
+    n = len(bearings)
+    # Leg vectors in (departure, latitude) = (x, y) form
+    xs = [d * math.sin(math.radians(a)) for a, d in zip(bearings, distances)]
+    ys = [d * math.cos(math.radians(a)) for a, d in zip(bearings, distances)]
+    ex, ey = sum(xs), sum(ys)
+    misclosure = math.hypot(ex, ey)
+    if misclosure == 0:
+        return []
+    
+    suspects = []
+    station_x = station_y = 0.0
+    for i in range(n):
+        x, y, length = xs[i], ys[i], distances[i]
+        
+        # The leg that would close the figure if everything else were right
+        fix_x, fix_y = x - ex, y - ey
+        fix_length = math.hypot(fix_x, fix_y)
+        
+        if length > 0:
+            # Distance blunder: only the part of the misclosure across the leg stays unexplained
+            ux, uy = x / length, y / length
+            along = ex * ux + ey * uy
+            across = abs(ex * uy - ey * ux)
+            suspects.append(BlunderSuspect('distance', i, across, -along, misclosure))
+            
+            # Bearing blunder: the closing leg must keep the measured length
+            if fix_length > 0:
+                suspects.append(BlunderSuspect('bearing', i, abs(fix_length - length),
+                                               _signed_angle(x, y, fix_x, fix_y), misclosure))
+        
+        # Angle blunder at the station starting leg i: rotating legs i..n-1 about it
+        # must carry the unclosed end point back onto the start point
+        if i > 0:
+            to_end_x, to_end_y = ex - station_x, ey - station_y
+            to_start_x, to_start_y = -station_x, -station_y
+            residual = abs(math.hypot(to_end_x, to_end_y) - math.hypot(to_start_x, to_start_y))
+            suspects.append(BlunderSuspect('angle', i, residual,
+                                           _signed_angle(to_end_x, to_end_y, to_start_x, to_start_y),
+                                           misclosure))
+        
+        station_x += x
+        station_y += y
+    
+    suspects.sort(key=lambda s: s.residual)
+    if max_suspects is not None:
+        del suspects[max_suspects:]
+    return suspects
+
+
+def needs_blunder_check(adjustment, threshold=BLUNDER_ACCURACY_THRESHOLD):
+    """True if an adjustment closed worse than 1:threshold"""
+    if adjustment.linear_misclosure == 0:
+        return False
+    return adjustment.total_perimeter / adjustment.linear_misclosure < threshold
@@ -0,0 +1,86 @@
+"""
+Calculation Worker for Traverse Calculator
+Runs one project tab's calculations in the background, so the window stays
+responsive while a large traverse is adjusted and each tab calculates
+independently of the others.
+
+Small traverses are calculated on a thread. Larger ones go to a worker
+process owned by the tab, started on first use and kept for the tab's later
+calculations, so large adjustments in different tabs run in parallel rather
+than taking turns in one interpreter. Only the latest request's result is
+delivered: recalculating while a calculation is still running discards the
+older result.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Traverses with more legs than this are calculated in the tab's worker process
+PROCESS_MIN_LEGS = 2000
+
+
+class CalculationWorker:
+    """Background calculations for one tab; callbacks run on the Tk thread via root.after"""
+    
+    def __init__(self, root, process_min_legs=PROCESS_MIN_LEGS):
+        self.root = root
+        self.process_min_legs = process_min_legs
+        self._executor = None
+        self._job = 0
+        self._running = None
+        self._closed = False
+    
+    @property
+    def busy(self):
+        """True while the latest calculation has not finished"""
+        return self._running is not None
+    
+    def submit(self, function, args, legs, on_done, on_error):
+        """
+        Run function(*args) in the background, then call on_done(result) or
+        on_error(exception). function and args must be picklable when legs is
+        above process_min_legs.
+        """
+        if self._closed:
+            raise RuntimeError("Calculation worker has been shut down")
+        self._job += 1
+        job = self._running = self._job
+        executor = self._process_executor() if legs > self.process_min_legs else None
+        
+        def run():
+            try:
+                if executor is not None:
+                    result = executor.submit(function, *args).result()
+                else:
+                    result = function(*args)
+            except Exception as e:
+                self.root.after(0, lambda error=e: self._deliver(job, on_error, error))
+                return
+            self.root.after(0, lambda: self._deliver(job, on_done, result))
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def cancel(self):
+        """Drop the result of any calculation still running"""
+        self._job += 1
+        self._running = None
+    
+    def shutdown(self):
+        """Cancel pending results and stop the worker process"""
+        self.cancel()
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def _process_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        return self._executor
+    
+    def _deliver(self, job, callback, value):
+        # Superseded or cancelled results are ignored
+        if job != self._job or self._closed:
+            return
+        self._running = None
+        callback(value)
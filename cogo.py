@@ -0,0 +1,183 @@
+"""
+Coordinate Geometry for Traverse Calculator
+Bulk COGO on adjusted station coordinates: inverses between point pairs,
+bearing-bearing and bearing-distance intersections, radial sideshots and
+stakeout angles and distances. Every function takes whole lists of operations
+and computes them in one call, with numpy arrays when numpy is installed and a
+plain-Python loop otherwise.
+
+Points are (northing, easting) pairs, as from TraverseAdjustment.coordinates().
+Directions are azimuths in decimal degrees clockwise from north, the same
+convention as traverse_solver.bearing_to_azimuth() and azimuth_to_bearing();
+directions() converts typed bearings. Any argument may be a single point or
+value, which then applies to every operation. Results are lists, with NaN where
+there is no solution (parallel lines, a circle the line does not reach).
+"""
+
+import math
+
+import traverse_solver
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many operations the plain-Python loop is faster than building numpy arrays
+NUMPY_MIN_OPERATIONS = 64
+
+NAN_POINT = (math.nan, math.nan)
+
+
+def _is_point(value):
+    return len(value) == 2 and not hasattr(value[0], "__len__")
+
+
+def _columns(points):
+    """(northings, eastings) of one point or a list of points"""
+    if _is_point(points):
+        return [float(points[0])], [float(points[1])]
+    return [float(p[0]) for p in points], [float(p[1]) for p in points]
+
+
+def _values(values):
+    if hasattr(values, "__len__"):
+        return [float(v) for v in values]
+    return [float(values)]
+
+
+def _broadcast(*columns):
+    """Repeat length-1 columns to the common length; returns (count, columns)"""
+    count = max(len(column) for column in columns)
+    for column in columns:
+        if len(column) not in (1, count):
+            raise ValueError(f"COGO inputs have different lengths ({len(column)} and {count})")
+    return count, [column * count if len(column) == 1 else column for column in columns]
+
+
+def _use_numpy(count):
+    return NUMPY_AVAILABLE and count >= NUMPY_MIN_OPERATIONS
+
+
+def _points(northings, eastings):
+    if hasattr(northings, "tolist"):
+        northings, eastings = northings.tolist(), eastings.tolist()
+    return list(zip(northings, eastings))
+
+
+def _azimuth(dn, de):
+    return math.degrees(math.atan2(de, dn)) % 360
+
+
+def directions(values):
+    """Azimuths from typed bearings (N45.3015E, 045.3015) or numbers already in decimal degrees"""
+    return [traverse_solver.bearing_to_azimuth(v) if isinstance(v, str) else float(v) for v in values]
+
+
+def inverse(from_points, to_points):
+    """(azimuths, distances) from each from_point to its to_point"""
+    count, (n1, e1, n2, e2) = _broadcast(*_columns(from_points), *_columns(to_points))
+    if _use_numpy(count):
+        dn = np.subtract(n2, n1)
+        de = np.subtract(e2, e1)
+        return (np.mod(np.degrees(np.arctan2(de, dn)), 360).tolist(), np.hypot(dn, de).tolist())
+    azimuths, distances = [], []
+    for i in range(count):
+        dn, de = n2[i] - n1[i], e2[i] - e1[i]
+        azimuths.append(_azimuth(dn, de))
+        distances.append(math.hypot(dn, de))
+    return azimuths, distances
+
+
+def radial(origins, azimuths, distances):
+    """Points at each azimuth and distance from its origin (sideshots, radial stakeout)"""
+    count, (n0, e0, az, d) = _broadcast(*_columns(origins), _values(azimuths), _values(distances))
+    if _use_numpy(count):
+        rad = np.radians(az)
+        d = np.asarray(d)
+        return _points(np.add(n0, d * np.cos(rad)), np.add(e0, d * np.sin(rad)))
+    points = []
+    for i in range(count):
+        rad = math.radians(az[i])
+        points.append((n0[i] + d[i] * math.cos(rad), e0[i] + d[i] * math.sin(rad)))
+    return points
+
+
+def intersect_bearings(points_a, azimuths_a, points_b, azimuths_b):
+    """Intersection of the line through each point_a at azimuth_a with the line through point_b at azimuth_b"""
+    count, (na, ea, aza, nb, eb, azb) = _broadcast(*_columns(points_a), _values(azimuths_a),
+                                                   *_columns(points_b), _values(azimuths_b))
+    if _use_numpy(count):
+        ra, rb = np.radians(aza), np.radians(azb)
+        # Direction vectors (dn, de) = (cos, sin); solve A + t*u = B + s*v for t
+        un, ue, vn, ve = np.cos(ra), np.sin(ra), np.cos(rb), np.sin(rb)
+        dn, de = np.subtract(nb, na), np.subtract(eb, ea)
+        cross = un * ve - ue * vn
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.where(np.abs(cross) > 1e-12, (dn * ve - de * vn) / cross, np.nan)
+        return _points(na + t * un, ea + t * ue)
+    points = []
+    for i in range(count):
+        ra, rb = math.radians(aza[i]), math.radians(azb[i])
+        un, ue, vn, ve = math.cos(ra), math.sin(ra), math.cos(rb), math.sin(rb)
+        cross = un * ve - ue * vn
+        if abs(cross) <= 1e-12:
+            points.append(NAN_POINT)
+            continue
+        t = ((nb[i] - na[i]) * ve - (eb[i] - ea[i]) * vn) / cross
+        points.append((na[i] + t * un, ea[i] + t * ue))
+    return points
+
+
+def intersect_bearing_distance(points_a, azimuths_a, points_b, distances_b):
+    """
+    Where the line through each point_a at azimuth_a meets the circle of radius
+    distance_b around point_b. Returns (first, second) point lists, ordered along
+    the azimuth; both are NaN where the line misses the circle.
+    """
+    count, (na, ea, az, nb, eb, r) = _broadcast(*_columns(points_a), _values(azimuths_a),
+                                                *_columns(points_b), _values(distances_b))
+    if _use_numpy(count):
+        rad = np.radians(az)
+        un, ue = np.cos(rad), np.sin(rad)
+        dn, de = np.subtract(nb, na), np.subtract(eb, ea)
+        # Distance along the line to the foot of the perpendicular from B, and the half-chord
+        along = dn * un + de * ue
+        offset = dn * ue - de * un
+        with np.errstate(invalid="ignore"):
+            half = np.sqrt(np.square(r) - offset * offset)
+        first = _points(na + (along - half) * un, ea + (along - half) * ue)
+        second = _points(na + (along + half) * un, ea + (along + half) * ue)
+        return first, second
+    first, second = [], []
+    for i in range(count):
+        rad = math.radians(az[i])
+        un, ue = math.cos(rad), math.sin(rad)
+        dn, de = nb[i] - na[i], eb[i] - ea[i]
+        along = dn * un + de * ue
+        offset = dn * ue - de * un
+        if r[i] * r[i] < offset * offset:
+            first.append(NAN_POINT)
+            second.append(NAN_POINT)
+            continue
+        half = math.sqrt(r[i] * r[i] - offset * offset)
+        first.append((na[i] + (along - half) * un, ea[i] + (along - half) * ue))
+        second.append((na[i] + (along + half) * un, ea[i] + (along + half) * ue))
+    return first, second
+
+
+def stakeout(stations, backsights, targets):
+    """
+    Setting-out figures for each target from an occupied station sighting a backsight:
+    (angles_right, azimuths, distances), with the angle turned clockwise from the
+    backsight in decimal degrees.
+    """
+    backsight_azimuths, _ = inverse(stations, backsights)
+    azimuths, distances = inverse(stations, targets)
+    count, (back, forward) = _broadcast(backsight_azimuths, azimuths)
+    if _use_numpy(count):
+        angles = np.mod(np.subtract(forward, back), 360).tolist()
+    else:
+        angles = [(f - b) % 360 for f, b in zip(forward, back)]
+    return angles, azimuths, distances
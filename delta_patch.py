@@ -0,0 +1,209 @@
+"""
+Binary Delta Patches for Traverse Calculator
+Creates and applies small patches between two builds of the executable,
+so an update only downloads the bytes that changed.
+
+Patch layout (everything after the magic is zlib-compressed):
+    magic        b'TCDELTA1'
+    source hash  32 bytes  SHA-256 of the file the patch applies to
+    target hash  32 bytes  SHA-256 of the file the patch produces
+    target size  8 bytes
+    operations   b'C' + offset (8 bytes) + length (8 bytes)   copy from the source file
+                 b'I' + length (4 bytes) + data               insert new bytes
+
+Usage (release tooling):
+    python delta_patch.py create old.exe new.exe TraverseCalculator_1.0.1.patch
+    python delta_patch.py apply old.exe TraverseCalculator_1.0.1.patch new.exe
+"""
+
+import hashlib
+import os
+import struct
+import sys
+import zlib
+
+PATCH_MAGIC = b'TCDELTA1'
+
+# Size of the blocks used to find matching regions in the source file
+MATCH_BLOCK_SIZE = 32
+
+# Copy operations shorter than this are cheaper to store as inserted bytes
+MIN_COPY_LENGTH = 64
+
+COPY_HEADER = struct.Struct('>QQ')
+INSERT_HEADER = struct.Struct('>I')
+TARGET_HEADER = struct.Struct('>32s32sQ')
+
+
+class PatchError(Exception):
+    """Raised when a patch cannot be applied or does not produce the expected file"""
+
+
+def _index_blocks(source):
+    """Map each aligned block of the source to its first offset"""
+    index = {}
+    for offset in range(0, len(source) - MATCH_BLOCK_SIZE + 1, MATCH_BLOCK_SIZE):
+        index.setdefault(source[offset:offset + MATCH_BLOCK_SIZE], offset)
+    return index
+
+
+def _match_length(source, src_pos, target, tgt_pos):
+    """Length of the common run starting at source[src_pos] and target[tgt_pos]"""
+    length = 0
+    step = 4096
+    limit = min(len(source) - src_pos, len(target) - tgt_pos)
+    # Compare in large chunks first, then narrow down to the exact byte
+    while step >= 1:
+        while (length + step <= limit and
+               source[src_pos + length:src_pos + length + step] ==
+               target[tgt_pos + length:tgt_pos + length + step]):
+            length += step
+        step //= 8
+    return length
+
+
+def diff_bytes(source, target):
+    """
+    Compute the operations that rebuild target from source.
+    Returns a list of ('C', offset, length) and ('I', data) tuples.
+    """
+    index = _index_blocks(source)
+    operations = []
+    literal_start = 0
+    pos = 0
+    end = len(target) - MATCH_BLOCK_SIZE
+    
+    while pos <= end:
+        src_pos = index.get(target[pos:pos + MATCH_BLOCK_SIZE])
+        if src_pos is None:
+            pos += 1
+            continue
+        
+        length = _match_length(source, src_pos, target, pos)
+        
+        # Extend the match backwards into the pending literal bytes
+        start, src_start = pos, src_pos
+        while (start > literal_start and src_start > 0 and
+               source[src_start - 1] == target[start - 1]):
+            start -= 1
+            src_start -= 1
+            length += 1
+        
+        if length < MIN_COPY_LENGTH:
+            # Search on from after this block's position, never from inside the rewound bytes
+            pos += 1
+            continue
+        
+        if start > literal_start:
+            operations.append(('I', target[literal_start:start]))
+        operations.append(('C', src_start, length))
+        pos = start + length
+        literal_start = pos
+    
+    if literal_start < len(target):
+        operations.append(('I', target[literal_start:]))
+    
+    return operations
+
+
+def encode_patch(source, target):
+    """Build the complete patch bytes for turning source into target"""
+    body = [TARGET_HEADER.pack(hashlib.sha256(source).digest(),
+                               hashlib.sha256(target).digest(),
+                               len(target))]
+    for op in diff_bytes(source, target):
+        if op[0] == 'C':
+            body.append(b'C' + COPY_HEADER.pack(op[1], op[2]))
+        else:
+            body.append(b'I' + INSERT_HEADER.pack(len(op[1])))
+            body.append(op[1])
+    return PATCH_MAGIC + zlib.compress(b''.join(body), 9)
+
+
+def create_patch(old_path, new_path, patch_path):
+    """Write a patch that turns old_path into new_path. Returns the patch size in bytes."""
+    with open(old_path, 'rb') as f:
+        source = f.read()
+    with open(new_path, 'rb') as f:
+        target = f.read()
+    
+    patch = encode_patch(source, target)
+    with open(patch_path, 'wb') as f:
+        f.write(patch)
+    return len(patch)
+
+
+def apply_patch(old_path, patch_path, out_path):
+    """
+    Rebuild the new file from old_path and a patch, verifying both ends.
+    Raises PatchError if old_path is not the file the patch was made from,
+    or if the result does not match the target hash.
+    """
+    with open(patch_path, 'rb') as f:
+        patch = f.read()
+    if not patch.startswith(PATCH_MAGIC):
+        raise PatchError("Not a Traverse Calculator patch file")
+    try:
+        body = zlib.decompress(patch[len(PATCH_MAGIC):])
+    except zlib.error as e:
+        raise PatchError(f"Corrupt patch: {e}")
+    
+    source_hash, target_hash, target_size = TARGET_HEADER.unpack_from(body, 0)
+    pos = TARGET_HEADER.size
+    
+    source_digest = hashlib.sha256()
+    with open(old_path, 'rb') as f:
+        while True:
+            buffer = f.read(1024 * 1024)
+            if not buffer:
+                break
+            source_digest.update(buffer)
+    if source_digest.digest() != source_hash:
+        raise PatchError("Installed file does not match the patch source")
+    
+    target_digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(old_path, 'rb') as source, open(out_path, 'wb') as out:
+            while pos < len(body):
+                op = body[pos:pos + 1]
+                pos += 1
+                if op == b'C':
+                    offset, length = COPY_HEADER.unpack_from(body, pos)
+                    pos += COPY_HEADER.size
+                    source.seek(offset)
+                    data = source.read(length)
+                    if len(data) != length:
+                        raise PatchError("Copy operation runs past the end of the source file")
+                elif op == b'I':
+                    (length,) = INSERT_HEADER.unpack_from(body, pos)
+                    pos += INSERT_HEADER.size
+                    data = body[pos:pos + length]
+                    pos += length
+                else:
+                    raise PatchError(f"Unknown patch operation {op!r}")
+                out.write(data)
+                target_digest.update(data)
+                written += len(data)
+        
+        if written != target_size or target_digest.digest() != target_hash:
+            raise PatchError("Patched file does not match the expected result")
+    except Exception:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+    
+    return target_digest.hexdigest()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "create":
+        size = create_patch(sys.argv[2], sys.argv[3], sys.argv[4])
+        print(f"Patch written: {sys.argv[4]} ({size} bytes, "
+              f"{size * 100 / max(os.path.getsize(sys.argv[3]), 1):.1f}% of full file)")
+    elif len(sys.argv) == 5 and sys.argv[1] == "apply":
+        digest = apply_patch(sys.argv[2], sys.argv[3], sys.argv[4])
+        print(f"Patched file written: {sys.argv[4]} (SHA-256 {digest})")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,122 @@
+"""
+Edit History for Traverse Calculator
+Undo/redo kept as a log of small edit records instead of full copies of the
+traverse. Each record holds only what it changed: one cell for a leg edit,
+the dropped rows when the side count shrinks, both versions of the legs for
+an import. Undo and redo cost the size of the change, not of the traverse.
+
+The history works on any target with these methods:
+    set_leg_value(index, field, value)   field 0 = bearing, 1 = distance
+    resize_legs(count, rows)             keep the first rows, append rows after them
+    replace_legs(rows)                   rows are (bearing, distance) text pairs
+"""
+
+from collections import deque
+
+# Oldest edits are dropped beyond this many steps
+MAX_HISTORY = 1000
+
+FIELD_NAMES = ("Bearing", "Distance")
+
+
+class LegEdit:
+    """One cell of the input table changed"""
+    
+    def __init__(self, index, field, old, new):
+        self.index = index
+        self.field = field
+        self.old = old
+        self.new = new
+    
+    @property
+    def label(self):
+        return f"Side {self.index + 1} {FIELD_NAMES[self.field]}"
+    
+    def apply(self, target):
+        target.set_leg_value(self.index, self.field, self.new)
+    
+    def revert(self, target):
+        target.set_leg_value(self.index, self.field, self.old)
+
+
+class SideCountEdit:
+    """The number of sides changed; only rows removed by shrinking are stored"""
+    
+    def __init__(self, old_count, new_count, removed_rows=()):
+        self.old_count = old_count
+        self.new_count = new_count
+        self.removed_rows = tuple(removed_rows)
+    
+    @property
+    def label(self):
+        return f"Number of Sides ({self.old_count} to {self.new_count})"
+    
+    def apply(self, target):
+        target.resize_legs(self.new_count, ())
+    
+    def revert(self, target):
+        target.resize_legs(self.old_count, self.removed_rows)
+
+
+class ReplaceEdit:
+    """Every leg replaced at once, e.g. by an import"""
+    
+    def __init__(self, old_rows, new_rows, label="Import"):
+        # Stored column-wise as tuples of strings, which is cheaper than a tuple per row
+        self.old = (tuple(row[0] for row in old_rows), tuple(row[1] for row in old_rows))
+        self.new = (tuple(row[0] for row in new_rows), tuple(row[1] for row in new_rows))
+        self.label = label
+    
+    def apply(self, target):
+        target.replace_legs(list(zip(*self.new)))
+    
+    def revert(self, target):
+        target.replace_legs(list(zip(*self.old)))
+
+
+class EditHistory:
+    """Undo and redo stacks of edit records for one target"""
+    
+    def __init__(self, target, max_steps=MAX_HISTORY):
+        self.target = target
+        self._undo = deque(maxlen=max_steps)
+        self._redo = []
+    
+    def record(self, edit):
+        """Log an edit that has already been made to the target"""
+        self._undo.append(edit)
+        self._redo.clear()
+    
+    def undo(self):
+        """Revert the latest edit and return it, or None if there is nothing to undo"""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        edit.revert(self.target)
+        self._redo.append(edit)
+        return edit
+    
+    def redo(self):
+        """Re-apply the latest undone edit and return it, or None"""
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        edit.apply(self.target)
+        self._undo.append(edit)
+        return edit
+    
+    def can_undo(self):
+        return bool(self._undo)
+    
+    def can_redo(self):
+        return bool(self._redo)
+    
+    def undo_label(self):
+        return self._undo[-1].label if self._undo else ""
+    
+    def redo_label(self):
+        return self._redo[-1].label if self._redo else ""
+    
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,251 @@
+"""
+Folder Watch for Traverse Calculator
+Headless watch mode for a shared drop folder: new or changed .trv files are
+adjusted as they arrive, each report is written next to the others in an output
+folder, and one summary row per traverse is appended to a CSV file.
+
+Polling only stats the directory entries. A file is read again only when its
+modification time or size changed, and is recalculated only when the project it
+holds differs from the one last reported (re-saving or copying an unchanged
+project is skipped). Files are left alone until they have not been modified for
+SETTLE_SECONDS, so a copy still in progress is not read half-written.
+Calculations run on a process pool and their results are written as each one
+finishes. What has been reported is kept in the output folder, so a restarted
+watcher only recalculates files that changed while it was stopped.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import traverse_project
+import traverse_report
+
+TRV_EXTENSION = ".trv"
+
+# Seconds between polls of the watched folder
+POLL_INTERVAL = 5.0
+
+# A file must be this many seconds old before it is read
+SETTLE_SECONDS = 2.0
+
+# Watcher state in the output folder: path -> fingerprint and project digest
+STATE_FILE = ".watch_state.json"
+
+SUMMARY_FILE = "summary.csv"
+
+SUMMARY_COLUMNS = ("time", "path", "traverse_id", "legs", "angular_misclosure", "linear_misclosure",
+                   "relative_accuracy", "report", "error")
+
+
+def _ignore_interrupt():
+    # Ctrl+C is handled by the watcher, which stops the pool itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def project_digest(project):
+    """Digest of a project's inputs: what the reports are calculated from"""
+    text = json.dumps(project.to_dict(), sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def report_path(report_base, traverse_name):
+    """Report file for one traverse: report_base plus the traverse name made safe for file names"""
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in traverse_name or "")
+    return f"{report_base}_{safe_name}.txt" if safe_name else report_base + ".txt"
+
+
+def process_file(path, report_base, previous_digest, sections=traverse_report.SECTIONS):
+    """
+    Adjust every traverse of a .trv file and write their reports to report_base
+    plus the traverse name; runs in worker processes. Returns (digest, summary
+    rows), with rows None when the project is unchanged since previous_digest.
+    """
+    try:
+        with open(path, 'r') as f:
+            project = traverse_project.TraverseProject.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        return None, [{"path": path, "error": str(e)}]
+    digest = project_digest(project)
+    if digest == previous_digest:
+        return digest, None
+    
+    rows = []
+    for name, report in traverse_report.project_reports(project, sections):
+        row = {"path": path, "traverse_id": name}
+        if isinstance(report, str):
+            row["error"] = report
+        else:
+            adj = report.adjustment
+            row.update(legs=adj.n, angular_misclosure=f"{adj.angular_misclosure:.6f}",
+                       linear_misclosure=f"{adj.linear_misclosure:.6f}",
+                       relative_accuracy=adj.relative_accuracy,
+                       report=report_path(report_base, name))
+            os.makedirs(os.path.dirname(row["report"]), exist_ok=True)
+            with open(row["report"], 'w', encoding='utf-8') as f:
+                for line in report.lines():
+                    f.write(line + "\n")
+        rows.append(row)
+    return digest, rows
+
+
+class FolderWatcher:
+    """Polls a folder and reports new or changed .trv files on a process pool"""
+    
+    def __init__(self, folder, output_dir, summary_path=None, workers=None,
+                 sections=traverse_report.SECTIONS, settle_seconds=SETTLE_SECONDS):
+        self.folder = os.path.abspath(folder)
+        self.output_dir = os.path.abspath(output_dir)
+        self.summary_path = summary_path or os.path.join(self.output_dir, SUMMARY_FILE)
+        self.workers = workers
+        self.sections = sections
+        self.settle_seconds = settle_seconds
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.state_path = os.path.join(self.output_dir, STATE_FILE)
+        # path -> [mtime_ns, size, digest] of the files already reported
+        self.state = self._load_state()
+        # future -> (path, fingerprint) of calculations still running
+        self.pending = {}
+        # Seconds until the newest file skipped by the last poll has settled, 0 if none
+        self.settle_wait = 0.0
+        self._executor = None
+    
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(temp_path, self.state_path)
+    
+    def fingerprints(self):
+        """path -> (mtime_ns, size) of every .trv file under the folder"""
+        found = {}
+        directories = [self.folder]
+        while directories:
+            try:
+                entries = list(os.scandir(directories.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if os.path.abspath(entry.path) != self.output_dir:
+                            directories.append(entry.path)
+                    elif entry.name.lower().endswith(TRV_EXTENSION):
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return found
+    
+    def poll(self):
+        """Queue every new or changed file that has settled; returns how many were queued"""
+        found = self.fingerprints()
+        in_flight = {path for path, _ in self.pending.values()}
+        settled_before = time.time_ns() - int(self.settle_seconds * 1e9)
+        self.settle_wait = 0.0
+        queued = 0
+        for path, fingerprint in found.items():
+            known = self.state.get(path)
+            if path in in_flight or (known and tuple(known[:2]) == fingerprint):
+                continue
+            if fingerprint[0] > settled_before:
+                # Still being written; look again on the next poll
+                wait_seconds = min((fingerprint[0] - settled_before) / 1e9, self.settle_seconds)
+                self.settle_wait = max(self.settle_wait, wait_seconds)
+                continue
+            # Reports mirror the file's place under the watched folder
+            report_base = os.path.join(self.output_dir, os.path.splitext(os.path.relpath(path, self.folder))[0])
+            future = self._pool().submit(process_file, path, report_base,
+                                         known[2] if known else None, self.sections)
+            self.pending[future] = (path, fingerprint)
+            queued += 1
+        
+        gone = [path for path in self.state if path not in found]
+        for path in gone:
+            del self.state[path]
+        if gone:
+            self._save_state()
+        return queued
+    
+    def collect(self, timeout=0):
+        """Write the results of calculations that finish within timeout; returns the summary rows"""
+        if not self.pending:
+            return []
+        done, _ = wait(self.pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        rows = []
+        for future in done:
+            path, fingerprint = self.pending.pop(future)
+            try:
+                digest, file_rows = future.result()
+            except Exception as e:
+                digest, file_rows = None, [{"path": path, "error": str(e)}]
+            self.state[path] = [*fingerprint, digest]
+            if file_rows:
+                rows.extend(file_rows)
+        if done:
+            self._write_summary(rows)
+            self._save_state()
+        return rows
+    
+    def _write_summary(self, rows):
+        if not rows:
+            return
+        new_file = not os.path.exists(self.summary_path)
+        stamp = datetime.now().isoformat(timespec="seconds")
+        with open(self.summary_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS, restval="")
+            if new_file:
+                writer.writeheader()
+            for row in rows:
+                writer.writerow({"time": stamp, **row})
+    
+    def run(self, interval=POLL_INTERVAL, on_rows=None, once=False):
+        """
+        Poll and report until interrupted. on_rows(rows) is called with the summary
+        rows of each batch of finished files. once stops when everything found by
+        the first poll has been reported, waiting for files still being written
+        to settle and reporting those too.
+        """
+        try:
+            while True:
+                self.poll()
+                deadline = time.monotonic() + interval
+                while time.monotonic() < deadline:
+                    if not self.pending:
+                        if once:
+                            if not self.settle_wait:
+                                return
+                            # Poll again as soon as the skipped files have settled
+                            deadline = time.monotonic() + self.settle_wait
+                        time.sleep(max(0, deadline - time.monotonic()))
+                        break
+                    rows = self.collect(timeout=max(0, deadline - time.monotonic()))
+                    if rows and on_rows is not None:
+                        on_rows(rows)
+        finally:
+            self.close()
+    
+    def close(self):
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_interrupt)
+        return self._executor
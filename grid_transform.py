@@ -0,0 +1,127 @@
+"""
+Grid Transformation for Traverse Calculator
+Converts adjusted ground coordinates to grid coordinates (state plane or any
+other projected grid) and back, with a combined scale factor, a rotation and an
+offset, plus an optional elevation factor per point:
+
+    grid = offset + scale_factor * elevation_factor * R(rotation) * (ground - origin)
+
+The rotation is in decimal degrees clockwise, so a ground azimuth plus the
+rotation is the grid azimuth. Whole lists of points are transformed in one call,
+with numpy arrays when numpy is installed and a plain-Python loop otherwise, so
+the output of adjust_traverse(), TraverseProject.adjust_all() or cogo can be fed
+straight in without writing it out first.
+"""
+
+import math
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many points the plain-Python loop is faster than building numpy arrays
+NUMPY_MIN_POINTS = 64
+
+# Mean earth radius in project units, for elevation factors
+EARTH_RADIUS = {"metric": 6371000.0, "english": 20902231.0}
+
+
+def elevation_factors(elevations, units="metric"):
+    """Elevation (sea level) factor R / (R + h) of each ellipsoid height h, in project units"""
+    radius = EARTH_RADIUS[units]
+    if hasattr(elevations, "__len__"):
+        return [radius / (radius + float(h)) for h in elevations]
+    return radius / (radius + float(elevations))
+
+
+class GridTransform:
+    """Scale, rotation and offset from ground to grid coordinates"""
+    
+    def __init__(self, scale_factor=1.0, rotation=0.0, northing_offset=0.0, easting_offset=0.0,
+                 origin=(0.0, 0.0)):
+        if scale_factor <= 0:
+            raise ValueError("Scale factor must be positive")
+        self.scale_factor = float(scale_factor)
+        self.rotation = float(rotation)
+        self.northing_offset = float(northing_offset)
+        self.easting_offset = float(easting_offset)
+        # Ground point that is scaled and rotated about (usually the first station)
+        self.origin = (float(origin[0]), float(origin[1]))
+    
+    @classmethod
+    def from_control(cls, ground_a, ground_b, grid_a, grid_b):
+        """The transform that takes two ground control points onto their grid coordinates"""
+        ground_dn, ground_de = ground_b[0] - ground_a[0], ground_b[1] - ground_a[1]
+        grid_dn, grid_de = grid_b[0] - grid_a[0], grid_b[1] - grid_a[1]
+        ground_distance = math.hypot(ground_dn, ground_de)
+        if ground_distance == 0:
+            raise ValueError("Control points must be different")
+        rotation = math.degrees(math.atan2(grid_de, grid_dn) - math.atan2(ground_de, ground_dn))
+        return cls(math.hypot(grid_dn, grid_de) / ground_distance, rotation % 360,
+                   grid_a[0], grid_a[1], ground_a)
+    
+    def __repr__(self):
+        return (f"GridTransform(scale_factor={self.scale_factor!r}, rotation={self.rotation!r}, "
+                f"northing_offset={self.northing_offset!r}, easting_offset={self.easting_offset!r}, "
+                f"origin={self.origin!r})")
+    
+    def azimuth(self, azimuth):
+        """Grid azimuth of a ground azimuth"""
+        return (azimuth + self.rotation) % 360
+    
+    def distance(self, distance, elevation_factor=1.0):
+        """Grid distance of a ground distance"""
+        return distance * self.scale_factor * elevation_factor
+    
+    def apply(self, points, elevation_factors=None):
+        """
+        Grid (northing, easting) of each ground point. elevation_factors is one
+        factor per point, a single factor for all of them, or None.
+        """
+        return self._transform(points, elevation_factors, inverse=False)
+    
+    def inverse(self, points, elevation_factors=None):
+        """Ground (northing, easting) of each grid point"""
+        return self._transform(points, elevation_factors, inverse=True)
+    
+    def _transform(self, points, factors, inverse):
+        points = list(points)
+        count = len(points)
+        if factors is None:
+            factors = 1.0
+        if hasattr(factors, "__len__") and len(factors) != count:
+            raise ValueError(f"{len(factors)} elevation factors for {count} points")
+        
+        rad = math.radians(-self.rotation if inverse else self.rotation)
+        cos, sin = math.cos(rad), math.sin(rad)
+        # Forward: rotate and scale about the origin, then move to the offset; inverse undoes it
+        if inverse:
+            from_n, from_e = self.northing_offset, self.easting_offset
+            to_n, to_e = self.origin
+        else:
+            from_n, from_e = self.origin
+            to_n, to_e = self.northing_offset, self.easting_offset
+        
+        if NUMPY_AVAILABLE and count >= NUMPY_MIN_POINTS:
+            array = np.asarray(points, dtype=float).reshape(count, 2)
+            dn = array[:, 0] - from_n
+            de = array[:, 1] - from_e
+            scale = self.scale_factor * np.asarray(factors, dtype=float)
+            if inverse:
+                scale = 1.0 / scale
+            northings = to_n + scale * (dn * cos - de * sin)
+            eastings = to_e + scale * (de * cos + dn * sin)
+            return list(zip(northings.tolist(), eastings.tolist()))
+        
+        if not hasattr(factors, "__len__"):
+            factors = [factors] * count
+        result = []
+        for (n, e), factor in zip(points, factors):
+            scale = self.scale_factor * factor
+            if inverse:
+                scale = 1.0 / scale
+            dn, de = n - from_n, e - from_e
+            result.append((to_n + scale * (dn * cos - de * sin), to_e + scale * (de * cos + dn * sin)))
+        return result
@@ -0,0 +1,344 @@
+"""
+Missing Measurements for Traverse Calculator
+Completes a closed traverse whose field data lacks a bearing or distance by
+solving the closure condition directly: the missing values must make the
+latitudes and departures sum to zero. Up to two unknowns can be found:
+
+    one leg's bearing, distance, or both
+    two distances       the two legs' bearing lines meet the closing vector
+    bearing + distance  a circle meets a line: up to two solutions
+    two bearings        two circles meet: up to two solutions
+
+Where the circle only just reaches the line or the other circle (legs within
+TANGENT_TOLERANCE of perpendicular, or of collinear), the two solutions are taken
+as one and any shortfall is reported as misclosure. Where two solutions exist
+and one of them makes the sides of the traverse cross, the other is used. When both give a proper polygon the closure cannot
+tell them apart: complete_legs() raises AmbiguousCompletion listing both, and a
+solution is only used when the caller chooses one. A missing value is a blank
+entry or "?".
+
+With only one missing bearing or distance the closure is still overdetermined:
+the value is solved by least squares and the misclosure left over is reported.
+Otherwise the computed values absorb the whole misclosure, so the traverse
+closes exactly and its closure is no longer an independent check.
+"""
+
+import math
+
+import traverse_solver
+
+# Entries treated as missing measurements
+MISSING_MARKERS = ("", "?")
+
+# Bearing lines closer to parallel than this (sine of the angle) cannot fix two distances
+PARALLEL_TOLERANCE = 1e-9
+
+# Two missing distances on legs within this many degrees of parallel are reported as weak,
+# as are two missing bearings on nearly collinear legs and a bearing and a distance on
+# nearly perpendicular ones
+WEAK_ANGLE = 5.0
+
+# A circle and a line (or two circles) that miss or cut each other by less than this
+# fraction of the lengths involved are treated as touching: one solution, with the
+# shortfall reported as misclosure
+TANGENT_TOLERANCE = 1e-5
+
+# Shortfalls smaller than this fraction of the lengths are rounding error, not misclosure
+ROUNDING_TOLERANCE = 1e-12
+
+
+class AmbiguousCompletion(ValueError):
+    """Raised when two different measurements both close the traverse without crossing sides"""
+    
+    def __init__(self, solutions):
+        # Each a list of FilledValue, in the order complete_legs() accepts as choice
+        self.solutions = solutions
+        super().__init__("The closure has two solutions: "
+                         + " or ".join(f"({number}) {describe_solution(solution)}"
+                                       for number, solution in enumerate(solutions, 1))
+                         + "; enter the measured value to choose")
+
+
+def is_missing(text):
+    return text is None or str(text).strip() in MISSING_MARKERS
+
+
+def has_missing(bearing_strs, distance_strs):
+    """True if any bearing or distance entry is blank"""
+    return any(map(is_missing, bearing_strs)) or any(map(is_missing, distance_strs))
+
+
+class FilledValue:
+    """One computed measurement"""
+    
+    def __init__(self, leg, kind, value):
+        # 0-based leg index
+        self.leg = leg
+        # 'bearing' (an azimuth in decimal degrees) or 'distance'
+        self.kind = kind
+        self.value = value
+    
+    def text(self):
+        """Value as it is typed into the calculator (DDD.MMSS azimuth or distance)"""
+        if self.kind == "bearing":
+            return traverse_solver.decimal_to_dms(self.value)
+        return f"{self.value:.4f}"
+    
+    def describe(self, unit_label="m", precision=0):
+        if self.kind == "bearing":
+            return f"Side {self.leg + 1} bearing {traverse_solver.azimuth_to_bearing(self.value, precision)}"
+        return f"Side {self.leg + 1} distance {self.value:.3f} {unit_label}".rstrip()
+
+
+def describe_solution(solution, unit_label="", precision=0):
+    """One line for a list of FilledValue"""
+    return "; ".join(value.describe(unit_label, precision) for value in solution)
+
+
+class Completion:
+    """Legs of a traverse with its missing measurements solved from the closure"""
+    
+    def __init__(self, bearings, distances, filled, residual=0.0, alternatives=(), warnings=()):
+        # Azimuths and distances of every leg, computed values included
+        self.bearings = bearings
+        self.distances = distances
+        # FilledValue per computed measurement, in leg order
+        self.filled = filled
+        # Misclosure the computed values could not remove (a single bearing or distance,
+        # or legs that only just reach each other)
+        self.residual = residual
+        # Other solutions, each a list of FilledValue
+        self.alternatives = list(alternatives)
+        # Notes on poorly determined solutions
+        self.warnings = list(warnings)
+    
+    def __len__(self):
+        return len(self.filled)
+    
+    def rows(self, bearing_strs, distance_strs):
+        """(bearing, distance) text of every leg with the computed values filled in"""
+        rows = [[b, d] for b, d in zip(bearing_strs, distance_strs)]
+        for value in self.filled:
+            rows[value.leg][value.kind == "distance"] = value.text()
+        return [tuple(row) for row in rows]
+
+
+def _unit(azimuth):
+    rad = math.radians(azimuth)
+    return math.cos(rad), math.sin(rad)
+
+
+def _cross(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def _azimuth(dn, de):
+    return math.degrees(math.atan2(de, dn)) % 360
+
+
+def _segments_cross(a, b, c, d):
+    """True if segments ab and cd cross at a point inside both"""
+    ab, cd = (b[0] - a[0], b[1] - a[1]), (d[0] - c[0], d[1] - c[1])
+    d1 = _cross(ab, (c[0] - a[0], c[1] - a[1]))
+    d2 = _cross(ab, (d[0] - a[0], d[1] - a[1]))
+    d3 = _cross(cd, (a[0] - c[0], a[1] - c[1]))
+    d4 = _cross(cd, (b[0] - c[0], b[1] - c[1]))
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def sides_cross(bearings, distances):
+    """True if two sides of the closed traverse that do not share a station cross each other"""
+    points = traverse_solver.open_traverse_coordinates(bearings, distances)[:-1]
+    n = len(points)
+    ends = [(points[i], points[(i + 1) % n]) for i in range(n)]
+    # Sweep the sides by their lowest northing, comparing each with those it overlaps
+    active = []
+    for i in sorted(range(n), key=lambda k: min(ends[k][0][0], ends[k][1][0])):
+        a, b = ends[i]
+        low = min(a[0], b[0])
+        active = [j for j in active if max(ends[j][0][0], ends[j][1][0]) >= low]
+        for j in active:
+            if abs(i - j) not in (1, n - 1) and _segments_cross(a, b, *ends[j]):
+                return True
+        active.append(i)
+    return False
+
+
+def complete_legs(bearing_strs, distance_strs, choice=None):
+    """
+    Parse a closed traverse's legs, solving up to two missing values from the
+    closure. Returns a Completion (with no filled values when nothing is missing).
+    choice picks one of AmbiguousCompletion.solutions (from 0) when the closure
+    has two. Raises AmbiguousCompletion when it has two and none was chosen, and
+    ValueError for unparsable entries, more than two unknowns or a closure the
+    known legs make impossible.
+    """
+    n = len(bearing_strs)
+    missing_bearings = [i for i, text in enumerate(bearing_strs) if is_missing(text)]
+    missing_distances = [i for i, text in enumerate(distance_strs) if is_missing(text)]
+    unknowns = len(missing_bearings) + len(missing_distances)
+    if unknowns > 2:
+        raise ValueError(f"{unknowns} measurements are missing; the closure can only supply two")
+    if unknowns and n < 3:
+        raise ValueError("A closed traverse needs at least 3 sides to solve missing measurements")
+    
+    bearings = [None if i in missing_bearings else traverse_solver.bearing_to_azimuth(text)
+                for i, text in enumerate(bearing_strs)]
+    distances = [None if i in missing_distances else traverse_solver.parse_distance(text)
+                 for i, text in enumerate(distance_strs)]
+    if not unknowns:
+        return Completion(bearings, distances, [])
+    
+    # (vn, ve): what the incomplete legs must add up to for the traverse to close
+    vn = ve = 0.0
+    for azimuth, distance in zip(bearings, distances):
+        if azimuth is not None and distance is not None:
+            un, ue = _unit(azimuth)
+            vn -= distance * un
+            ve -= distance * ue
+    closing = math.hypot(vn, ve)
+    
+    residual = 0.0
+    solutions = []
+    warnings = []
+    if unknowns == 1 or missing_bearings == missing_distances:
+        i = (missing_bearings or missing_distances)[0]
+        if missing_bearings and missing_distances:
+            # Both values of one leg: the leg is the closing vector itself
+            if closing == 0:
+                raise ValueError(f"Side {i + 1}: the other legs already close, so it has no length")
+            solutions.append([FilledValue(i, "bearing", _azimuth(vn, ve)),
+                              FilledValue(i, "distance", closing)])
+        elif missing_distances:
+            # Least squares: the component of the closing vector along the known bearing
+            u = _unit(bearings[i])
+            distance = vn * u[0] + ve * u[1]
+            if distance <= 0:
+                raise ValueError(f"Side {i + 1}: its bearing points away from closing the traverse")
+            residual = abs(_cross(u, (vn, ve)))
+            solutions.append([FilledValue(i, "distance", distance)])
+        else:
+            residual = abs(closing - distances[i])
+            solutions.append([FilledValue(i, "bearing", _azimuth(vn, ve))])
+    elif len(missing_distances) == 2:
+        i, j = missing_distances
+        ui, uj = _unit(bearings[i]), _unit(bearings[j])
+        det = _cross(ui, uj)
+        if abs(det) < PARALLEL_TOLERANCE:
+            raise ValueError(f"Sides {i + 1} and {j + 1} are parallel; their distances cannot be solved")
+        di = _cross((vn, ve), uj) / det
+        dj = _cross(ui, (vn, ve)) / det
+        if di <= 0 or dj <= 0:
+            raise ValueError(f"Sides {i + 1} and {j + 1}: no positive distances close the traverse")
+        solutions.append([FilledValue(i, "distance", di), FilledValue(j, "distance", dj)])
+        angle = math.degrees(math.asin(min(1.0, abs(det))))
+        if angle < WEAK_ANGLE:
+            warnings.append(f"Sides {i + 1} and {j + 1} are {angle:.2f}° from parallel, "
+                            "so their computed distances are poorly determined")
+    elif len(missing_bearings) == 2:
+        # Leg i ends on a circle of radius d_i about its start and of radius d_j about the closing point
+        i, j = missing_bearings
+        di, dj = distances[i], distances[j]
+        tolerance = TANGENT_TOLERANCE * (di + dj)
+        if closing == 0 or closing > di + dj + tolerance or closing < abs(di - dj) - tolerance:
+            raise ValueError(f"Sides {i + 1} and {j + 1}: their distances cannot close the traverse")
+        along = (di * di - dj * dj + closing * closing) / (2 * closing)
+        offset = math.sqrt(max(0.0, di * di - along * along))
+        if offset <= tolerance:
+            # The circles touch: the two legs lie along the closing line
+            offset = 0.0
+            residual = max(0.0, closing - di - dj, abs(di - dj) - closing)
+            if residual <= ROUNDING_TOLERANCE * (di + dj):
+                residual = 0.0
+        angle = math.degrees(math.asin(min(1.0, closing * offset / (di * dj))))
+        if angle < WEAK_ANGLE:
+            warnings.append(f"Sides {i + 1} and {j + 1} are {angle:.2f}° from parallel, "
+                            "so their computed bearings are poorly determined")
+        wn, we = vn / closing, ve / closing
+        for sign in ((1, -1) if offset > 0 else (1,)):
+            pn = along * wn - sign * offset * we
+            pe = along * we + sign * offset * wn
+            solutions.append([FilledValue(i, "bearing", _azimuth(pn, pe)),
+                              FilledValue(j, "bearing", _azimuth(vn - pn, ve - pe))])
+    else:
+        # Bearing of leg i (length d_i known) and distance of leg j (bearing known):
+        # |v - d_j u_j| = d_i, a quadratic in d_j
+        i, j = missing_bearings[0], missing_distances[0]
+        di, uj = distances[i], _unit(bearings[j])
+        along = vn * uj[0] + ve * uj[1]
+        # Distance of the closing point from the line of leg j
+        across = abs(_cross(uj, (vn, ve)))
+        tolerance = TANGENT_TOLERANCE * max(closing, di)
+        if across > di + tolerance:
+            raise ValueError(f"Side {i + 1} is too short for side {j + 1} to close the traverse")
+        root = math.sqrt(max(0.0, di * di - across * across))
+        if root <= tolerance:
+            # The circle touches the line: leg i is perpendicular to leg j
+            root = 0.0
+            residual = max(0.0, across - di)
+            if residual <= ROUNDING_TOLERANCE * max(closing, di):
+                residual = 0.0
+        angle = math.degrees(math.asin(min(1.0, root / di)))
+        if angle < WEAK_ANGLE:
+            warnings.append(f"Sides {i + 1} and {j + 1} are {angle:.2f}° from perpendicular, "
+                            "so their computed values are poorly determined")
+        for dj in ((along + root, along - root) if root > 0 else (along,)):
+            if dj > 0:
+                solutions.append([FilledValue(i, "bearing", _azimuth(vn - dj * uj[0], ve - dj * uj[1])),
+                                  FilledValue(j, "distance", dj)])
+        if not solutions:
+            raise ValueError(f"Sides {i + 1} and {j + 1}: no positive distance closes the traverse")
+    
+    def completed(solution):
+        legs_bearings, legs_distances = list(bearings), list(distances)
+        for value in solution:
+            (legs_bearings if value.kind == "bearing" else legs_distances)[value.leg] = value.value
+        return legs_bearings, legs_distances
+    
+    for solution in solutions:
+        solution.sort(key=lambda value: (value.leg, value.kind))
+    if len(solutions) > 1:
+        if choice is not None:
+            if not 0 <= choice < len(solutions):
+                raise ValueError(f"There is no solution {choice + 1}")
+            solutions.insert(0, solutions.pop(choice))
+        else:
+            proper = [solution for solution in solutions if not sides_cross(*completed(solution))]
+            if len(proper) != 1:
+                raise AmbiguousCompletion(solutions)
+            solutions.remove(proper[0])
+            warnings.append("The other solution makes sides of the traverse cross, so it is not used")
+            solutions.insert(0, proper[0])
+    return Completion(*completed(solutions[0]), solutions[0], residual, solutions[1:], warnings)
+
+
+def complete_traverse(traverse, choice=None):
+    """
+    Fill in the missing bearing/distance text of a closed traverse_project.Traverse
+    in place. Returns the Completion, or None for open traverses and complete ones.
+    """
+    if not traverse.closed or not has_missing(traverse.bearings, traverse.distances):
+        return None
+    completion = complete_legs(traverse.bearings, traverse.distances, choice)
+    rows = completion.rows(traverse.bearings, traverse.distances)
+    traverse.bearings = [row[0] for row in rows]
+    traverse.distances = [row[1] for row in rows]
+    traverse.revision += 1
+    return completion
+
+
+def complete_project(project):
+    """
+    Complete every closed traverse of a TraverseProject that has missing values.
+    Returns {traverse name: Completion or error text} for the traverses that had any.
+    """
+    results = {}
+    for name, traverse in project.traverses.items():
+        try:
+            completion = complete_traverse(traverse)
+        except ValueError as e:
+            results[name] = str(e)
+            continue
+        if completion is not None:
+            results[name] = completion
+    return results
@@ -0,0 +1,325 @@
+"""
+Monte Carlo Error Propagation for Traverse Calculator
+Perturbs the measured bearings and distances with their standard errors, re-runs the
+Bowditch adjustment for every trial, and reports confidence intervals for the adjusted
+coordinates, corrected bearings and distances, area and misclosure.
+
+Trials are split into chunks that run on a process pool. Within a chunk, trials are
+evaluated as 2-D (trial x leg) arrays when numpy is installed, with a pure-Python
+fallback otherwise. Only running sums are kept, so memory does not grow with the
+number of trials; intervals use the normal approximation mean ± z·σ.
+"""
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import traverse_solver
+
+# Optional: vectorized trials
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+DEFAULT_TRIALS = 10000
+
+# Trial x leg values evaluated per batch; small enough that the arrays stay in CPU cache
+BATCH_ELEMENTS = 65536
+
+# Chunks per worker, so faster workers pick up more of the load
+CHUNKS_PER_WORKER = 4
+
+# Leg outputs (one value per leg/station) and scalar outputs, in report order
+LEG_OUTPUTS = ("northing", "easting", "corrected_azimuth", "corrected_distance")
+SCALAR_OUTPUTS = ("area", "linear_misclosure")
+
+
+class MonteCarloResult:
+    """Nominal values plus the spread of every adjusted output over all trials"""
+    
+    def __init__(self, nominal, sums, trials, confidence, inputs):
+        self.nominal = nominal
+        self.trials = trials
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        # sigma_bearing (seconds), sigma_distance, ppm
+        self.inputs = inputs
+        self.mean_offset = {}
+        self.std = {}
+        for name, (sum_dev, sum_sq_dev) in sums.items():
+            if name in SCALAR_OUTPUTS:
+                self.mean_offset[name], self.std[name] = _mean_std(sum_dev, sum_sq_dev, trials)
+            else:
+                stats = [_mean_std(s, sq, trials) for s, sq in zip(sum_dev, sum_sq_dev)]
+                self.mean_offset[name] = [m for m, _ in stats]
+                self.std[name] = [sd for _, sd in stats]
+    
+    def interval(self, name, i=None):
+        """(low, high) confidence interval of an output (i selects the leg/station)"""
+        nominal, mean, std = self.nominal[name], self.mean_offset[name], self.std[name]
+        if i is not None:
+            nominal, mean, std = nominal[i], mean[i], std[i]
+        centre = nominal + mean
+        return centre - self.z * std, centre + self.z * std
+    
+    def half_width(self, name, i=None):
+        """± half-width of the confidence interval"""
+        std = self.std[name] if i is None else self.std[name][i]
+        return self.z * std
+
+
+def _mean_std(sum_dev, sum_sq_dev, trials):
+    mean = sum_dev / trials
+    variance = max(sum_sq_dev / trials - mean * mean, 0.0)
+    if trials > 1:
+        variance *= trials / (trials - 1)
+    return mean, math.sqrt(variance)
+
+
+def nominal_outputs(bearings, distances):
+    """Unperturbed adjusted outputs, used as the reference for every trial"""
+    adj = traverse_solver.adjust_traverse(bearings, distances)
+    points = adj.coordinates()
+    return {
+        "northing": [p[0] for p in points],
+        "easting": [p[1] for p in points],
+        "corrected_azimuth": list(adj.corrected_azimuths),
+        "corrected_distance": list(adj.corrected_distances),
+        "area": traverse_solver.polygon_area(points),
+        "linear_misclosure": adj.linear_misclosure
+    }
+
+
+def _wrap_degrees(delta):
+    """Wrap an azimuth difference into [-180, 180)"""
+    return (delta + 180) % 360 - 180
+
+
+def _run_chunk_numpy(bearings, distances, nominal, sigma_deg, sigma_distance, ppm, trials, seed):
+    """Accumulate deviation sums for one chunk of trials using (trial x leg) arrays"""
+    rng = np.random.default_rng(seed)
+    bearings = np.asarray(bearings, dtype=float)
+    distances = np.asarray(distances, dtype=float)
+    n = len(bearings)
+    ref = {name: np.asarray(nominal[name], dtype=float) for name in LEG_OUTPUTS}
+    sums = {name: [np.zeros(n), np.zeros(n)] for name in LEG_OUTPUTS}
+    sums.update({name: [0.0, 0.0] for name in SCALAR_OUTPUTS})
+    distance_sigma = np.sqrt(sigma_distance ** 2 + (distances * ppm * 1e-6) ** 2)
+    sigma_rad = math.radians(sigma_deg)
+    leg_index = np.arange(n)
+    
+    # adjust_traverse turns the bearings into interior angles, corrects them, and rebuilds
+    # azimuth i as bearing i - i * correction. The angles sum to 180n - 360 * (number of
+    # differences that wrap), so the correction only changes when a perturbation changes
+    # that wrap count; otherwise each trial azimuth is the nominal one plus its noise.
+    nominal_wraps = _wrap_counts(bearings[None, :])[0]
+    nominal_correction = _angle_correction(nominal_wraps, n)
+    base = np.radians(bearings - leg_index * nominal_correction)
+    cos_base, sin_base = np.cos(base), np.sin(base)
+    ref_azimuth = np.radians(ref["corrected_azimuth"])
+    cos_ref, sin_ref = np.cos(ref_azimuth), np.sin(ref_azimuth)
+    
+    batch = max(1, BATCH_ELEMENTS // n)
+    done = 0
+    while done < trials:
+        t = min(batch, trials - done)
+        done += t
+        noise = rng.standard_normal((t, n), dtype=np.float32) * sigma_rad
+        dist = distances + rng.standard_normal((t, n), dtype=np.float32) * distance_sigma
+        
+        # Trials whose wrap count differs get a different angle correction on every leg
+        correction_change = _angle_correction(_wrap_counts(bearings + np.degrees(noise)), n) - nominal_correction
+        changed = correction_change != 0
+        if changed.any():
+            noise[changed] -= np.radians(correction_change[changed])[:, None] * leg_index
+        
+        # cos/sin of (base + noise) from the precomputed base; exact while the noise stays small
+        if np.abs(noise).max() < 0.01:
+            noise_sq = noise * noise
+            cos_noise = 1 - noise_sq * (0.5 - noise_sq / 24)
+            sin_noise = noise * (1 - noise_sq / 6)
+            cos_az = cos_base * cos_noise - sin_base * sin_noise
+            sin_az = sin_base * cos_noise + cos_base * sin_noise
+        else:
+            cos_az = np.cos(base + noise)
+            sin_az = np.sin(base + noise)
+        
+        # Latitudes/departures and the Bowditch correction, one row per trial
+        lats = dist * cos_az
+        deps = dist * sin_az
+        sum_lat = lats.sum(axis=1)
+        sum_dep = deps.sum(axis=1)
+        share = dist / dist.sum(axis=1)[:, None]
+        adj_lats = lats - sum_lat[:, None] * share
+        adj_deps = deps - sum_dep[:, None] * share
+        
+        northing = np.zeros_like(adj_lats)
+        easting = np.zeros_like(adj_deps)
+        np.cumsum(adj_lats[:, :-1], axis=1, out=northing[:, 1:])
+        np.cumsum(adj_deps[:, :-1], axis=1, out=easting[:, 1:])
+        cross = easting[:, :-1] * northing[:, 1:] - easting[:, 1:] * northing[:, :-1]
+        area = 0.5 * np.abs(cross.sum(axis=1) + easting[:, -1] * northing[:, 0] - easting[:, 0] * northing[:, -1])
+        
+        # Corrected azimuth deviation as the angle between the trial and nominal directions
+        azimuth_dev = np.degrees(np.arctan2(adj_deps * cos_ref - adj_lats * sin_ref,
+                                            adj_lats * cos_ref + adj_deps * sin_ref))
+        
+        devs = {
+            "northing": northing - ref["northing"],
+            "easting": easting - ref["easting"],
+            "corrected_azimuth": azimuth_dev,
+            "corrected_distance": np.sqrt(adj_lats * adj_lats + adj_deps * adj_deps) - ref["corrected_distance"],
+            "area": area - nominal["area"],
+            "linear_misclosure": np.hypot(sum_lat, sum_dep) - nominal["linear_misclosure"]
+        }
+        for name, dev in devs.items():
+            sums[name][0] += dev.sum(axis=0)
+            sums[name][1] += np.einsum('ij,ij->j', dev, dev) if dev.ndim == 2 else (dev * dev).sum()
+    
+    return {name: (s.tolist() if hasattr(s, 'tolist') else s, sq.tolist() if hasattr(sq, 'tolist') else sq)
+            for name, (s, sq) in sums.items()}
+
+
+def _wrap_counts(bearings):
+    """
+    Per row, how many consecutive-bearing differences wrap past 0/360 when
+    calculate_interior_angles takes (bearing + 180 - next bearing) % 360
+    """
+    diff = np.empty_like(bearings)
+    diff[:, :-1] = bearings[:, :-1] - bearings[:, 1:]
+    diff[:, -1] = bearings[:, -1] - bearings[:, 0]
+    diff += 180
+    return (diff >= 360).sum(axis=1) - (diff < 0).sum(axis=1)
+
+
+def _angle_correction(wraps, n):
+    """Angular correction per angle for a given wrap count (see adjust_traverse)"""
+    angle_sum = 180 * n - 360 * wraps
+    return -(angle_sum - (n - 2) * 180) / n
+
+
+def _run_chunk_python(bearings, distances, nominal, sigma_deg, sigma_distance, ppm, trials, seed):
+    """Accumulate deviation sums for one chunk of trials without numpy"""
+    rng = random.Random(seed)
+    n = len(bearings)
+    sums = {name: [[0.0] * n, [0.0] * n] for name in LEG_OUTPUTS}
+    sums.update({name: [0.0, 0.0] for name in SCALAR_OUTPUTS})
+    distance_sigmas = [math.sqrt(sigma_distance ** 2 + (d * ppm * 1e-6) ** 2) for d in distances]
+    
+    for _ in range(trials):
+        az = [b + rng.gauss(0, sigma_deg) for b in bearings]
+        dist = [d + rng.gauss(0, s) for d, s in zip(distances, distance_sigmas)]
+        outputs = nominal_outputs(az, dist)
+        for name in LEG_OUTPUTS:
+            s, sq = sums[name]
+            for i, (value, ref) in enumerate(zip(outputs[name], nominal[name])):
+                dev = _wrap_degrees(value - ref) if name == "corrected_azimuth" else value - ref
+                s[i] += dev
+                sq[i] += dev * dev
+        for name in SCALAR_OUTPUTS:
+            dev = outputs[name] - nominal[name]
+            sums[name][0] += dev
+            sums[name][1] += dev * dev
+    
+    return {name: tuple(value) for name, value in sums.items()}
+
+
+def _run_chunk(args):
+    """Process-pool entry point"""
+    if NUMPY_AVAILABLE:
+        return _run_chunk_numpy(*args)
+    return _run_chunk_python(*args)
+
+
+def _merge(total, part):
+    for name, (s, sq) in part.items():
+        if name not in total:
+            total[name] = [s, sq]
+        elif name in SCALAR_OUTPUTS:
+            total[name][0] += s
+            total[name][1] += sq
+        else:
+            total[name][0] = [a + b for a, b in zip(total[name][0], s)]
+            total[name][1] = [a + b for a, b in zip(total[name][1], sq)]
+
+
+def run_monte_carlo(bearings, distances, sigma_bearing_seconds, sigma_distance, ppm=0.0,
+                    trials=DEFAULT_TRIALS, confidence=0.95, workers=None, seed=None,
+                    progress_callback=None):
+    """
+    Propagate measurement errors through the Bowditch adjustment.
+    bearings are azimuths in decimal degrees; sigma_bearing_seconds is the standard error of
+    each bearing in arc-seconds; distance errors are sigma_distance + ppm of the length.
+    workers=1 runs in this process; None uses one process per CPU.
+    Returns a MonteCarloResult.
+    """
+    if trials < 2:
+        raise ValueError("At least 2 trials are needed")
+    nominal = nominal_outputs(bearings, distances)
+    sigma_deg = sigma_bearing_seconds / 3600.0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    
+    chunk_count = min(trials, max(1, workers * CHUNKS_PER_WORKER))
+    chunk_sizes = [trials // chunk_count + (1 if i < trials % chunk_count else 0) for i in range(chunk_count)]
+    jobs = [(list(bearings), list(distances), nominal, sigma_deg, sigma_distance, ppm, size, seed + i)
+            for i, size in enumerate(chunk_sizes)]
+    
+    totals = {}
+    done = 0
+    if workers <= 1:
+        results = map(_run_chunk, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_run_chunk, jobs)
+    try:
+        for size, part in zip(chunk_sizes, results):
+            _merge(totals, part)
+            done += size
+            if progress_callback:
+                progress_callback(done / trials * 100)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    inputs = {"sigma_bearing": sigma_bearing_seconds, "sigma_distance": sigma_distance, "ppm": ppm}
+    return MonteCarloResult(nominal, totals, trials, confidence, inputs)
+
+
+def format_report(result, unit_label="m"):
+    """Text report of a MonteCarloResult in the same layout as the calculation results"""
+    pct = f"{result.confidence * 100:g}%"
+    lines = []
+    lines.append("=" * 120)
+    lines.append("MONTE CARLO ERROR PROPAGATION")
+    lines.append("=" * 120)
+    lines.append(f"Trials: {result.trials}    Confidence: {pct}    "
+                 f"σ bearing: {result.inputs['sigma_bearing']:g}\"    "
+                 f"σ distance: {result.inputs['sigma_distance']:g} {unit_label} + {result.inputs['ppm']:g} ppm")
+    lines.append("")
+    low, high = result.interval("area")
+    lines.append(f"Area: {result.nominal['area']:.3f} sq {unit_label}   ({pct}: {low:.3f} to {high:.3f}, "
+                 f"±{result.half_width('area'):.3f})")
+    low, high = result.interval("linear_misclosure")
+    lines.append(f"Linear misclosure: {result.nominal['linear_misclosure']:.6f} {unit_label}   "
+                 f"({pct}: {max(low, 0):.6f} to {high:.6f})")
+    lines.append("")
+    lines.append(f"{'Station':<8} {'Northing':>15} {'± ' + pct:>12} {'Easting':>15} {'± ' + pct:>12}   "
+                 f"{'Side':<6} {'Corrected Bearing':<20} {'± sec':>8} {'Corrected Dist':>15} {'± ' + pct:>12}")
+    lines.append("-" * 120)
+    for i in range(len(result.nominal["northing"])):
+        lines.append(
+            f"{i+1:<8} {result.nominal['northing'][i]:>15.4f} {result.half_width('northing', i):>12.4f} "
+            f"{result.nominal['easting'][i]:>15.4f} {result.half_width('easting', i):>12.4f}   "
+            f"{i+1:<6} {traverse_solver.azimuth_to_bearing(result.nominal['corrected_azimuth'][i]):<20} "
+            f"{result.half_width('corrected_azimuth', i) * 3600:>8.2f} "
+            f"{result.nominal['corrected_distance'][i]:>15.4f} {result.half_width('corrected_distance', i):>12.4f}")
+    lines.append("-" * 120)
+    return "\n".join(lines)
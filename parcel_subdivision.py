@@ -0,0 +1,561 @@
+"""
+Parcel Subdivision for Traverse Calculator
+Splits lots of a given area off an adjusted closed traverse, with the cut line
+either parallel to a side or through a fixed point. Points are (northing,
+easting) pairs, as from TraverseAdjustment.coordinates(); sides are numbered
+from 0, side k running from station k to station k + 1.
+
+Cut lines are solved rather than found by trial and error:
+
+    parallel to a side  the area behind a line parallel to the side is a
+                        piecewise quadratic of the line's offset. One sweep over
+                        the stations gives the area up to each station's offset;
+                        a lot is then a bisection of those running totals and a
+                        quadratic solved exactly.
+    from a point on a   the area is the point's running fan of triangles over
+    side                the boundary stations: bisect the running totals for the
+                        side the cut ends on, then solve one linear equation.
+    through any other   the cut direction is bracketed between the directions in
+    point               which the line passes a station, then found by regula
+                        falsi (Illinois). Inside the bracket the line crosses the
+                        same sides, so the area is updated from its cut points
+                        instead of being recalculated over every station. An
+                        area reached only where the lot peaks or dips between
+                        those directions is bracketed by golden-section search
+                        for the peak first.
+
+Lots can be fanned out from a point on a side; a single cut may go through any
+point.
+"""
+
+import bisect
+import math
+
+# Lot areas are solved to this fraction of the parcel area
+AREA_TOLERANCE = 1e-12
+
+# Regula falsi iterations allowed per cut line (it normally takes under ten)
+MAX_ITERATIONS = 100
+
+# A point this close to a side (as a fraction of the parcel's size) is on it
+BOUNDARY_TOLERANCE = 1e-6
+
+
+def _cross(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def _shoelace(points):
+    """Twice the signed area: positive when the stations run clockwise on the map"""
+    total = 0.0
+    for i in range(len(points)):
+        total += _cross(points[i - 1], points[i])
+    return total
+
+
+def _between(p, q, t):
+    return p[0] + t * (q[0] - p[0]), p[1] + t * (q[1] - p[1])
+
+
+def _clip(points, value):
+    """Part of a polygon where value(point), a linear function, is >= 0"""
+    values = [value(p) for p in points]
+    kept = []
+    for i in range(len(points)):
+        j = (i + 1) % len(points)
+        if values[i] >= 0:
+            kept.append(points[i])
+        if (values[i] > 0 > values[j]) or (values[i] < 0 < values[j]):
+            kept.append(_between(points[i], points[j], values[i] / (values[i] - values[j])))
+    return kept
+
+
+def _crossings(points, value):
+    """Points where the line value(point) == 0 meets the polygon boundary"""
+    values = [value(p) for p in points]
+    found = []
+    for i in range(len(points)):
+        j = (i + 1) % len(points)
+        if values[i] == 0:
+            found.append(points[i])
+        elif (values[i] > 0 > values[j]) or (values[i] < 0 < values[j]):
+            found.append(_between(points[i], points[j], values[i] / (values[i] - values[j])))
+    return found
+
+
+def _distance_to_segment(point, start, end):
+    dn, de = end[0] - start[0], end[1] - start[1]
+    length_squared = dn * dn + de * de
+    t = 0.0
+    if length_squared > 0:
+        t = min(1.0, max(0.0, ((point[0] - start[0]) * dn + (point[1] - start[1]) * de) / length_squared))
+    return math.hypot(point[0] - start[0] - t * dn, point[1] - start[1] - t * de)
+
+
+class Lot:
+    """One lot of a subdivision"""
+    
+    def __init__(self, number, vertices, cut):
+        # Lots are numbered from 1, starting at the chosen side
+        self.number = number
+        # (northing, easting) corners, in the parcel's order
+        self.vertices = vertices
+        # Cut line closing the lot off from the rest of the parcel, [] for the remainder
+        self.cut = cut
+        self.area = abs(_shoelace(vertices)) / 2
+    
+    def __repr__(self):
+        return f"Lot({self.number}, area={self.area:.4f}, {len(self.vertices)} corners)"
+
+
+class Parcel:
+    """An adjusted closed traverse to be subdivided"""
+    
+    def __init__(self, points):
+        self.points = [(float(n), float(e)) for n, e in points]
+        if len(self.points) < 3:
+            raise ValueError("A parcel needs at least 3 stations")
+        twice_area = _shoelace(self.points)
+        if twice_area == 0:
+            raise ValueError("The parcel has no area")
+        # +1 when the stations run clockwise (interior to the right of each side), -1 otherwise
+        self.orientation = 1 if twice_area > 0 else -1
+        self.area = abs(twice_area) / 2
+    
+    def side(self, k):
+        """(start, end) stations of side k"""
+        if not 0 <= k < len(self.points):
+            raise ValueError(f"The parcel has no side {k + 1}")
+        return self.points[k], self.points[(k + 1) % len(self.points)]
+    
+    def on_side(self, point, k):
+        """True if a point lies on side k, within BOUNDARY_TOLERANCE"""
+        start, end = self.side(k)
+        return _distance_to_segment(point, start, end) <= BOUNDARY_TOLERANCE * math.sqrt(self.area)
+    
+    def running_areas(self, areas=None, lots=None):
+        """
+        Area to be cut off at each cut line: running totals of the given lot
+        areas, or of lots equal lots. A last lot reaching the far end of the
+        parcel needs no cut and is left out.
+        """
+        if lots is not None:
+            if lots < 2:
+                raise ValueError("Subdivide into at least 2 lots")
+            areas = [self.area / lots] * (lots - 1)
+        totals = []
+        total = 0.0
+        for area in areas:
+            if area <= 0:
+                raise ValueError("Lot areas must be positive")
+            total += area
+            totals.append(total)
+        if totals and totals[-1] > self.area * (1 + AREA_TOLERANCE):
+            raise ValueError(f"The lots total {totals[-1]:.4f}, more than the parcel's {self.area:.4f}")
+        if totals and totals[-1] >= self.area * (1 - AREA_TOLERANCE):
+            totals.pop()
+        return totals
+    
+    def _check_area(self, area):
+        if not 0 < area < self.area:
+            raise ValueError(f"A lot must be larger than 0 and smaller than the parcel ({self.area:.4f})")
+
+
+class ParallelCut:
+    """
+    Cut lines parallel to one side of a parcel. The parcel's width along a line
+    at offset h from the side changes linearly between station offsets, so the
+    area behind the line is kept at each station offset and solved exactly
+    in between.
+    """
+    
+    def __init__(self, parcel, side):
+        self.parcel = parcel
+        start, end = parcel.side(side)
+        length = math.hypot(end[0] - start[0], end[1] - start[1])
+        if length == 0:
+            raise ValueError(f"Side {side + 1} has no length")
+        self.origin = start
+        # Unit vectors along the side and across it towards the interior
+        self.along = ((end[0] - start[0]) / length, (end[1] - start[1]) / length)
+        self.across = (-parcel.orientation * self.along[1], parcel.orientation * self.along[0])
+        
+        self.offsets = offsets = [self.offset_of(p) for p in parcel.points]
+        positions = [(p[0] - start[0]) * self.along[0] + (p[1] - start[1]) * self.along[1]
+                     for p in parcel.points]
+        count = len(offsets)
+        # Sides by the offset at which the sweep reaches them (level sides add no width)
+        reached = {}
+        for i in range(count):
+            j = (i + 1) % count
+            if offsets[i] != offsets[j]:
+                reached.setdefault(min(offsets[i], offsets[j]), []).append(i)
+        
+        def width(crossed, h):
+            total = 0.0
+            for i in crossed:
+                j = (i + 1) % count
+                position = positions[i] + (h - offsets[i]) / (offsets[j] - offsets[i]) * (positions[j] - positions[i])
+                # Sides crossed going up and going down bound the parcel from opposite ends
+                total += position if offsets[j] > offsets[i] else -position
+            return total
+        
+        # Per band between consecutive station offsets: the width at its bottom and top,
+        # and the area below its bottom
+        self.levels = sorted(set(offsets))
+        self.bottom_widths = []
+        self.top_widths = []
+        self.below = [0.0]
+        crossed = []
+        for low, high in zip(self.levels, self.levels[1:]):
+            crossed = [i for i in crossed if max(offsets[i], offsets[(i + 1) % count]) > low]
+            crossed.extend(reached.get(low, ()))
+            bottom, top = width(crossed, low), width(crossed, high)
+            self.bottom_widths.append(bottom)
+            self.top_widths.append(top)
+            self.below.append(self.below[-1] + (bottom + top) / 2 * (high - low))
+        if self.below[-1] < 0:
+            # Widths were measured against the side's direction
+            self.bottom_widths = [-w for w in self.bottom_widths]
+            self.top_widths = [-w for w in self.top_widths]
+            self.below = [-a for a in self.below]
+    
+    def offset_of(self, point):
+        """Distance of a point from the side's line, positive towards the interior"""
+        return (point[0] - self.origin[0]) * self.across[0] + (point[1] - self.origin[1]) * self.across[1]
+    
+    def offset(self, area):
+        """Offset of the parallel line that cuts area off next to the side"""
+        self.parcel._check_area(area)
+        k = min(max(bisect.bisect_right(self.below, area) - 1, 0), len(self.bottom_widths) - 1)
+        rest = area - self.below[k]
+        bottom = self.bottom_widths[k]
+        slope = (self.top_widths[k] - bottom) / (self.levels[k + 1] - self.levels[k])
+        # rest = bottom * x + slope * x^2 / 2, solved in the form that stays accurate as slope -> 0
+        root = math.sqrt(max(0.0, bottom * bottom + 2 * slope * rest))
+        return self.levels[k] + (2 * rest / (bottom + root) if bottom + root > 0 else 0.0)
+    
+    def lots(self, cuts):
+        """
+        Lots between the lines at the given offsets (ascending), from the side to
+        the far end, in one walk round the boundary: each station goes to the lot
+        whose band holds it, and each point where a side crosses a cut line to
+        the lots on either side of it.
+        """
+        corners = [[] for _ in range(len(cuts) + 1)]
+        on_cut = [[] for _ in cuts]
+        points, offsets = self.parcel.points, self.offsets
+        count = len(points)
+        for i in range(count):
+            j = (i + 1) % count
+            hi, hj = offsets[i], offsets[j]
+            first, last = bisect.bisect_left(cuts, hi), bisect.bisect_right(cuts, hi)
+            for lot in range(first, last + 1):
+                corners[lot].append(points[i])
+            for k in range(first, last):
+                on_cut[k].append(points[i])
+            if hi == hj:
+                continue
+            crossed = range(bisect.bisect_right(cuts, min(hi, hj)), bisect.bisect_left(cuts, max(hi, hj)))
+            for k in (crossed if hj > hi else reversed(crossed)):
+                point = _between(points[i], points[j], (cuts[k] - hi) / (hj - hi))
+                corners[k].append(point)
+                corners[k + 1].append(point)
+                on_cut[k].append(point)
+        
+        def along(p):
+            return (p[0] - self.origin[0]) * self.along[0] + (p[1] - self.origin[1]) * self.along[1]
+        
+        return [Lot(number, lot_corners, sorted(on_cut[number - 1], key=along) if number <= len(cuts) else [])
+                for number, lot_corners in enumerate(corners, 1)]
+
+
+class PointCut:
+    """
+    Cut lines through a fixed point, starting along one side and turning into
+    the parcel. The lot is the part of the parcel on the side's side of the line;
+    its area is a function of how far (0-180 degrees) the line has turned.
+    """
+    
+    def __init__(self, parcel, side, point):
+        self.parcel = parcel
+        start, end = parcel.side(side)
+        if start == end:
+            raise ValueError(f"Side {side + 1} has no length")
+        self.start = math.degrees(math.atan2(end[1] - start[1], end[0] - start[0]))
+        self.point = (float(point[0]), float(point[1]))
+        # Stations relative to the point, so every cut line passes through the origin
+        self.local = [(p[0] - self.point[0], p[1] - self.point[1]) for p in parcel.points]
+        # Turns at which the line passes a station: the area is smooth between them
+        turns = {0.0, 180.0}
+        for n, e in self.local:
+            if n or e:
+                turns.add(((math.degrees(math.atan2(e, n)) - self.start) * parcel.orientation) % 180)
+        self.turns = sorted(turns)
+        self._areas = {}
+    
+    def azimuth(self, turn):
+        """Azimuth of the cut line after turning from the side"""
+        return (self.start + self.parcel.orientation * turn) % 360
+    
+    def _side_of(self, turn):
+        """Function of a local point, >= 0 on the lot's side of the line"""
+        rad = math.radians(self.azimuth(turn))
+        dn, de = math.cos(rad), math.sin(rad)
+        orientation = self.parcel.orientation
+        return lambda p: orientation * (de * p[0] - dn * p[1])
+    
+    def area(self, turn):
+        """Lot area with the line turned this far, from a full clip of the parcel"""
+        if turn not in self._areas:
+            kept = _clip(self.local, self._side_of(turn))
+            self._areas[turn] = self.parcel.orientation * _shoelace(kept) / 2
+        return self._areas[turn]
+    
+    def _band_area(self, low, high):
+        """
+        Lot area as a function of the turn between two consecutive station turns.
+        The clipped parcel keeps the same stations and crosses the same sides
+        throughout, so only the terms touching its two moving corners change.
+        """
+        side_of = self._side_of((low + high) / 2)
+        values = [side_of(p) for p in self.local]
+        count = len(values)
+        # Corners of the clipped parcel: a station index, or the pair of stations of a crossed side
+        corners = []
+        for i in range(count):
+            j = (i + 1) % count
+            if values[i] >= 0:
+                corners.append(i)
+            if (values[i] > 0 > values[j]) or (values[i] < 0 < values[j]):
+                corners.append((i, j))
+        fixed = 0.0
+        moving = []
+        for a, b in zip(corners[-1:] + corners[:-1], corners):
+            if isinstance(a, int) and isinstance(b, int):
+                fixed += _cross(self.local[a], self.local[b])
+            else:
+                moving.append((a, b))
+        orientation = self.parcel.orientation
+        
+        def area(turn):
+            side_of = self._side_of(turn)
+            
+            def corner(c):
+                if isinstance(c, int):
+                    return self.local[c]
+                p, q = self.local[c[0]], self.local[c[1]]
+                vp, vq = side_of(p), side_of(q)
+                return _between(p, q, vp / (vp - vq)) if vp != vq else p
+            
+            total = fixed
+            for a, b in moving:
+                total += _cross(corner(a), corner(b))
+            return orientation * total / 2
+        
+        return area
+    
+    def turn(self, area):
+        """How far the line turns from the side to cut area off"""
+        self.parcel._check_area(area)
+        def above(k):
+            return self.area(self.turns[k]) > area
+        
+        low, high = 0, len(self.turns) - 1
+        if above(low) == above(high):
+            # From a point inside the parcel the area need not grow steadily as the line turns
+            low = next((k for k in range(high) if above(k) != above(k + 1)), None)
+            if low is None:
+                return self._turn_past_extreme(area, above(0))
+            high = low + 1
+        # Bisect the station turns down to one band, then solve within it
+        while high - low > 1:
+            middle = (low + high) // 2
+            if above(middle) == above(low):
+                low = middle
+            else:
+                high = middle
+        a, b = self.turns[low], self.turns[high]
+        return self._solve_band(self._band_area(a, b), a, b, area)
+    
+    def _turn_past_extreme(self, area, above):
+        """
+        Turn for an area reached only between station turns, where the lot area
+        peaks (or dips) inside a band: find each band's extreme by golden-section
+        search and solve from the band's start up to the first one that gets there.
+        """
+        direction = -1 if above else 1
+        ratio = (math.sqrt(5) - 1) / 2
+        for a, b in zip(self.turns, self.turns[1:]):
+            band_area = self._band_area(a, b)
+            low, high = a, b
+            c, d = high - ratio * (high - low), low + ratio * (high - low)
+            fc, fd = direction * band_area(c), direction * band_area(d)
+            for _ in range(MAX_ITERATIONS):
+                if high - low <= 1e-12:
+                    break
+                if fc < fd:
+                    low, c, fc = c, d, fd
+                    d = low + ratio * (high - low)
+                    fd = direction * band_area(d)
+                else:
+                    high, d, fd = d, c, fc
+                    c = high - ratio * (high - low)
+                    fc = direction * band_area(c)
+            extreme = (low + high) / 2
+            if direction * (band_area(extreme) - area) >= -AREA_TOLERANCE * self.parcel.area:
+                return self._solve_band(band_area, a, extreme, area)
+        raise ValueError(f"No line through the point cuts off {area:.4f} next to this side")
+    
+    def _solve_band(self, band_area, a, b, area):
+        """Turn between a and b, where band_area - area changes sign"""
+        fa, fb = band_area(a) - area, band_area(b) - area
+        tolerance = AREA_TOLERANCE * self.parcel.area
+        if abs(fa) <= tolerance:
+            return a
+        if abs(fb) <= tolerance:
+            return b
+        # Illinois: regula falsi that halves a stale end's value so both ends keep moving
+        kept = 0
+        for _ in range(MAX_ITERATIONS):
+            c = (a * fb - b * fa) / (fb - fa)
+            fc = band_area(c) - area
+            if abs(fc) <= tolerance or b - a <= 1e-12:
+                return c
+            if (fc < 0) == (fb < 0):
+                b, fb = c, fc
+                if kept == -1:
+                    fa /= 2
+                kept = -1
+            else:
+                a, fa = c, fc
+                if kept == 1:
+                    fb /= 2
+                kept = 1
+        return c
+    
+    def cut_line(self, turn):
+        """Points where the line meets the boundary, in order along the line"""
+        rad = math.radians(self.azimuth(turn))
+        dn, de = math.cos(rad), math.sin(rad)
+        points = sorted(_crossings(self.local, self._side_of(turn)), key=lambda p: p[0] * dn + p[1] * de)
+        return [(p[0] + self.point[0], p[1] + self.point[1]) for p in points]
+    
+    def lots(self, turns):
+        """Lots between the lines at the given turns (ascending), from the side to the far end"""
+        bounds = [None] + list(turns) + [None]
+        found = []
+        for number, (low, high) in enumerate(zip(bounds, bounds[1:]), 1):
+            vertices = self.local
+            if high is not None:
+                vertices = _clip(vertices, self._side_of(high))
+            if low is not None:
+                side_of = self._side_of(low)
+                vertices = _clip(vertices, lambda p: -side_of(p))
+            vertices = [(p[0] + self.point[0], p[1] + self.point[1]) for p in vertices]
+            found.append(Lot(number, vertices, self.cut_line(high) if high is not None else []))
+        return found
+
+
+class FanCut:
+    """
+    Cut lines from a point on one side to the far boundary. The lot runs from
+    the point along that side and on around the boundary to the cut's far end,
+    so its area is the point's fan of triangles over the stations passed plus
+    one triangle that grows linearly along the side being cut.
+    """
+    
+    def __init__(self, parcel, side, point):
+        self.parcel = parcel
+        if not parcel.on_side(point, side):
+            raise ValueError(f"The point is not on side {side + 1}")
+        start, end = parcel.side(side)
+        tolerance = BOUNDARY_TOLERANCE * math.sqrt(parcel.area)
+        count = len(parcel.points)
+        if math.hypot(point[0] - end[0], point[1] - end[1]) <= tolerance:
+            # At the side's end station: run back along the side
+            self.point = end
+            order = [(side - i) % count for i in range(count)]
+            direction = -1
+        else:
+            self.point = (float(point[0]), float(point[1]))
+            order = [(side + 1 + i) % count for i in range(count)]
+            if math.hypot(point[0] - start[0], point[1] - start[1]) <= tolerance:
+                self.point = start
+                order.pop()
+            direction = 1
+        # Boundary from the point back round to it
+        self.boundary = [self.point] + [parcel.points[i] for i in order] + [self.point]
+        local = [(p[0] - self.point[0], p[1] - self.point[1]) for p in self.boundary]
+        sign = parcel.orientation * direction
+        self.triangles = [sign * _cross(a, b) / 2 for a, b in zip(local, local[1:])]
+        # Lot area when the cut reaches each boundary station
+        self.swept = [0.0]
+        for triangle in self.triangles:
+            self.swept.append(self.swept[-1] + triangle)
+    
+    def position(self, area):
+        """(boundary side, fraction along it) of the far end of the cut taking area off"""
+        self.parcel._check_area(area)
+        # Bracket between consecutive stations (the ends bound the whole parcel), then solve exactly
+        k = min(max(bisect.bisect_right(self.swept, area) - 1, 0), len(self.triangles) - 1)
+        triangle = self.triangles[k]
+        return k, (area - self.swept[k]) / triangle if triangle else 0.0
+    
+    def far_end(self, position):
+        k, fraction = position
+        return _between(self.boundary[k], self.boundary[k + 1], fraction)
+    
+    def lots(self, positions):
+        """Lots between the cuts ending at the given positions (in order), from the side to the far end"""
+        bounds = [(0, 0.0)] + list(positions) + [(len(self.triangles) - 1, 1.0)]
+        found = []
+        for number, (first, last) in enumerate(zip(bounds, bounds[1:]), 1):
+            vertices = [self.point, self.far_end(first)]
+            vertices += self.boundary[first[0] + 1:last[0] + 1]
+            vertices.append(self.far_end(last))
+            # Cuts ending on a station repeat it
+            corners = [p for i, p in enumerate(vertices) if p != vertices[i - 1]]
+            cut = [self.point, self.far_end(last)] if number <= len(positions) else []
+            found.append(Lot(number, corners, cut))
+        return found
+
+
+def cut_parallel(points, side, area):
+    """The lot of area next to a side, cut off by a line parallel to it"""
+    cut = ParallelCut(Parcel(points), side)
+    return cut.lots([cut.offset(area)])[0]
+
+
+def cut_through_point(points, side, point, area):
+    """
+    The lot of area next to a side, cut off by a line through point. From a
+    point on the side the cut runs to the far boundary; from anywhere else the
+    line is turned about the point.
+    """
+    parcel = Parcel(points)
+    if parcel.on_side(point, side):
+        cut = FanCut(parcel, side, point)
+        return cut.lots([cut.position(area)])[0]
+    cut = PointCut(parcel, side, point)
+    return cut.lots([cut.turn(area)])[0]
+
+
+def subdivide_parallel(points, side, areas=None, lots=None):
+    """
+    Lots of the given areas (or lots equal lots) along a side, each cut off by a
+    line parallel to it. Whatever is left over is the last lot.
+    """
+    parcel = Parcel(points)
+    cut = ParallelCut(parcel, side)
+    return cut.lots([cut.offset(area) for area in parcel.running_areas(areas, lots)])
+
+
+def subdivide_through_point(points, side, point, areas=None, lots=None):
+    """
+    Lots of the given areas (or lots equal lots) fanned out from a point on a
+    side, starting along that side. Whatever is left over is the last lot.
+    """
+    parcel = Parcel(points)
+    cut = FanCut(parcel, side, point)
+    return cut.lots([cut.position(area) for area in parcel.running_areas(areas, lots)])
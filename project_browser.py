@@ -0,0 +1,307 @@
+"""
+Project Browser for Traverse Calculator
+Lists recently used .trv files, or every .trv file in a folder, with their
+project information, closure and an outline preview. Only each file's header
+line is read (traverse_file.py), a batch at a time in the background of the Tk
+event loop, so hundreds of projects are listed at once whatever their size.
+Files saved without a header are summarized from their legs when selected.
+"""
+
+import json
+import os
+import tkinter as tk
+from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+
+import traverse_file
+import project_catalog
+
+# Recently opened or saved files, most recent first
+RECENT_FILES = os.path.join(os.path.expanduser("~"), ".traverse_recent.json")
+MAX_RECENT_FILES = 100
+
+# Headers read per pass of the event loop while the list fills in
+HEADER_BATCH = 50
+
+PREVIEW_SIZE = 280
+PREVIEW_MARGIN = 12
+
+
+class RecentFiles:
+    """The recent-files list, kept in a small JSON file in the home folder"""
+    
+    def __init__(self, path=RECENT_FILES, limit=MAX_RECENT_FILES):
+        self.path = path
+        self.limit = limit
+        try:
+            with open(path, 'r') as f:
+                self._paths = [p for p in json.load(f) if isinstance(p, str)]
+        except (OSError, ValueError, TypeError):
+            self._paths = []
+    
+    def __iter__(self):
+        return iter(self._paths)
+    
+    def __len__(self):
+        return len(self._paths)
+    
+    def add(self, filename):
+        """Move a file to the top of the list"""
+        filename = os.path.abspath(filename)
+        self._paths = [filename] + [p for p in self._paths if p != filename][:self.limit - 1]
+        self._save()
+    
+    def remove(self, filenames):
+        filenames = {os.path.abspath(f) for f in filenames}
+        self._paths = [p for p in self._paths if p not in filenames]
+        self._save()
+    
+    def _save(self):
+        # The list is a convenience; failing to write it never stops a save or load
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self._paths, f, indent=2)
+        except OSError:
+            pass
+
+
+def header_summary(header):
+    """(traverse IDs, total legs, worst accuracy text) of a file header"""
+    traverses = header.get("traverses", [])
+    names = ", ".join(str(t.get("traverse_id", "")) for t in traverses)
+    legs = sum(t.get("legs") or 0 for t in traverses)
+    errors = [t for t in traverses if t.get("error")]
+    closed = [t for t in traverses if t.get("closed") and not t.get("error")]
+    if errors:
+        accuracy = "Error"
+    elif not closed:
+        accuracy = ""
+    else:
+        # The poorest closure in the file; perfect closures (None) only when all are perfect
+        measured = [t["accuracy"] for t in closed if t.get("accuracy") is not None]
+        accuracy = project_catalog.format_accuracy(min(measured) if measured else None,
+                                                   computed=any(t.get("computed") for t in closed))
+    return names, legs, accuracy
+
+
+def draw_outline(canvas, header, size=PREVIEW_SIZE, margin=PREVIEW_MARGIN):
+    """Draw the traverse outlines of a header on a canvas, north up, scaled to fit"""
+    canvas.delete("all")
+    outlines = [(t.get("outline") or [], t.get("closed")) for t in header.get("traverses", [])]
+    points = [point for outline, _ in outlines for point in outline]
+    if not points:
+        canvas.create_text(size / 2, size / 2, text="No preview", fill="gray")
+        return
+    northings = [p[0] for p in points]
+    eastings = [p[1] for p in points]
+    span = max(max(northings) - min(northings), max(eastings) - min(eastings)) or 1.0
+    scale = (size - 2 * margin) / span
+    # Centre the drawing in the canvas
+    mid_n = (max(northings) + min(northings)) / 2
+    mid_e = (max(eastings) + min(eastings)) / 2
+    
+    def xy(point):
+        return size / 2 + (point[1] - mid_e) * scale, size / 2 - (point[0] - mid_n) * scale
+    
+    for outline, closed in outlines:
+        if not outline:
+            continue
+        coords = [c for point in outline for c in xy(point)]
+        if closed:
+            coords += coords[:2]
+        if len(coords) >= 4:
+            canvas.create_line(*coords, fill="blue", width=2)
+        x, y = xy(outline[0])
+        canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill="red", outline="red")
+
+
+class ProjectBrowser(tk.Toplevel):
+    """Recent or folder listing of .trv files with metadata and an outline preview"""
+    
+    def __init__(self, parent, recent, open_files):
+        super().__init__(parent)
+        self.title("Project Browser")
+        self.transient(parent)
+        self.recent = recent
+        self.open_files = open_files
+        self.folder = None
+        self._paths = []
+        self._headers = {}
+        self._pending = []
+        self._loading = None
+        
+        frame = ttk.Frame(self, padding="10")
+        frame.pack(fill=tk.BOTH, expand=True)
+        
+        toolbar = ttk.Frame(frame)
+        toolbar.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Button(toolbar, text="Recent Files", command=self.show_recent).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="Folder...", command=self.choose_folder).pack(side=tk.LEFT, padx=5)
+        self.filter_text = tk.StringVar()
+        self.filter_text.trace_add("write", lambda *args: self.refill())
+        ttk.Entry(toolbar, textvariable=self.filter_text, width=30).pack(side=tk.RIGHT)
+        ttk.Label(toolbar, text="Filter:").pack(side=tk.RIGHT, padx=5)
+        
+        body = ttk.Frame(frame)
+        table = ttk.Frame(body)
+        table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        columns = (("project", "Project", 160), ("traverses", "Traverses", 140), ("legs", "Legs", 60),
+                   ("accuracy", "Accuracy", 90), ("modified", "Modified", 130), ("file", "File", 300))
+        self.tree = ttk.Treeview(table, columns=[c[0] for c in columns], show="headings", height=18)
+        for column, heading, width in columns:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=tk.E if column in ("legs", "accuracy") else tk.W)
+        scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self.show_preview())
+        self.tree.bind("<Double-1>", lambda e: self.open_selected())
+        
+        side = ttk.Frame(body, padding=(10, 0, 0, 0))
+        side.pack(side=tk.RIGHT, fill=tk.Y)
+        self.preview = tk.Canvas(side, width=PREVIEW_SIZE, height=PREVIEW_SIZE, bg="white",
+                                 highlightthickness=1, highlightbackground="gray")
+        self.preview.pack()
+        self.details = ttk.Label(side, text="", justify=tk.LEFT, wraplength=PREVIEW_SIZE)
+        self.details.pack(fill=tk.X, pady=(5, 0))
+        
+        buttons = ttk.Frame(frame)
+        buttons.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        self.status = ttk.Label(buttons, text="")
+        self.status.pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Close", command=self.destroy).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Remove from Recent", command=self.remove_selected).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(buttons, text="Open", command=self.open_selected).pack(side=tk.RIGHT)
+        body.pack(fill=tk.BOTH, expand=True)
+        
+        self.show_recent()
+    
+    # Listing
+    def show_recent(self):
+        self.folder = None
+        self.show_files([path for path in self.recent if os.path.exists(path)])
+    
+    def choose_folder(self):
+        folder = filedialog.askdirectory(parent=self, title="Browse Projects in Folder")
+        if folder:
+            self.folder = folder
+            paths = []
+            for directory, _, names in os.walk(folder):
+                paths.extend(os.path.join(directory, name) for name in sorted(names)
+                             if name.lower().endswith(project_catalog.TRV_EXTENSION))
+            self.show_files(paths)
+    
+    def show_files(self, paths):
+        """List files straight away and fill in their headers a batch at a time"""
+        self._paths = paths
+        self._pending = [path for path in paths if path not in self._headers]
+        self.refill()
+        if self._loading is None:
+            self._loading = self.after_idle(self._load_headers)
+    
+    def _load_headers(self):
+        batch, self._pending = self._pending[:HEADER_BATCH], self._pending[HEADER_BATCH:]
+        for path in batch:
+            try:
+                self._headers[path] = traverse_file.read_header(path)
+            except (OSError, UnicodeDecodeError) as e:
+                self._headers[path] = str(e)
+            if self.tree.exists(path):
+                self.tree.item(path, values=self.row(path))
+        if self._pending:
+            self._loading = self.after(1, self._load_headers)
+        else:
+            self._loading = None
+        self.update_status()
+    
+    def row(self, path):
+        try:
+            modified = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%m/%d/%Y %I:%M %p")
+        except OSError:
+            modified = ""
+        header = self._headers.get(path)
+        if isinstance(header, dict):
+            names, legs, accuracy = header_summary(header)
+            project_name = header.get("project_info", {}).get("project_name", "")
+            return project_name, names, legs, accuracy, modified, path
+        if isinstance(header, str):
+            return "", "", "", "Unreadable", modified, path
+        if path in self._headers:
+            # Saved without a header: summarized when selected
+            return "", "", "", "", modified, path
+        return "...", "", "", "", modified, path
+    
+    def refill(self):
+        """Show the listed files that match the filter text"""
+        text = self.filter_text.get().strip().lower()
+        self.tree.delete(*self.tree.get_children())
+        for path in self._paths:
+            values = self.row(path)
+            if text and not any(text in str(value).lower() for value in values):
+                continue
+            self.tree.insert("", tk.END, iid=path, values=values)
+        self.update_status()
+    
+    def update_status(self):
+        source = f"in {self.folder}" if self.folder else "recently used"
+        loading = f", reading {len(self._pending)}..." if self._pending else ""
+        self.status.config(text=f"{len(self.tree.get_children())} of {len(self._paths)} files {source}{loading}")
+    
+    # Selection
+    def selected_paths(self):
+        return list(self.tree.selection())
+    
+    def show_preview(self):
+        paths = self.selected_paths()
+        if not paths:
+            return
+        path = paths[0]
+        header = self._headers.get(path)
+        if not isinstance(header, dict):
+            try:
+                header = traverse_file.file_header(path)
+            except Exception as e:
+                self.preview.delete("all")
+                self.details.config(text=f"Cannot read file:\n{str(e)}")
+                return
+            self._headers[path] = header
+            self.tree.item(path, values=self.row(path))
+        draw_outline(self.preview, header)
+        
+        info = header.get("project_info", {})
+        lines = [f"{label}: {info[key]}" for label, key in
+                 (("Project", "project_name"), ("User", "user_name"), ("Address", "project_address"))
+                 if info.get(key)]
+        unit_label = "ft" if header.get("settings", {}).get("units") == "english" else "m"
+        for traverse in header.get("traverses", []):
+            line = f"{traverse.get('traverse_id')}: {traverse.get('legs')} legs"
+            if traverse.get("error"):
+                line += f", {traverse['error']}"
+            elif traverse.get("closed"):
+                accuracy = project_catalog.format_accuracy(traverse.get("accuracy"), computed=traverse.get("computed"))
+                line += f", {accuracy}"
+                if traverse.get("computed"):
+                    line += f" ({traverse['computed']} computed from the closure)"
+                if traverse.get("area") is not None:
+                    line += f", area {traverse['area']:.2f} {unit_label}²"
+            else:
+                line += ", open"
+            lines.append(line)
+        self.details.config(text="\n".join(lines))
+    
+    def open_selected(self):
+        paths = self.selected_paths()
+        if paths:
+            self.open_files(paths)
+    
+    def remove_selected(self):
+        paths = self.selected_paths()
+        if not paths:
+            return
+        if self.folder is not None:
+            messagebox.showinfo("Project Browser", "Only files in the recent list can be removed.", parent=self)
+            return
+        self.recent.remove(paths)
+        self._paths = [path for path in self._paths if path not in paths]
+        self.refill()
@@ -0,0 +1,279 @@
+"""
+Project Catalog for Traverse Calculator
+An SQLite index of .trv files: project information, settings and the closure
+statistics of every traverse in them. Questions such as "every traverse at this
+address with relative accuracy worse than 1:5000" become one query instead of
+opening every file.
+
+Each file is fingerprinted by modification time and size. A rescan stats the
+indexed files and folders but only re-reads files that are new or changed, and
+drops files that have gone. Changed files are summarized on a process pool when
+there are many of them; files saved with a header (traverse_file.py) are
+summarized from their first line alone.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import traverse_file
+
+# Catalog used by the calculator window
+DEFAULT_CATALOG = os.path.join(os.path.expanduser("~"), ".traverse_catalog.sqlite")
+
+TRV_EXTENSION = ".trv"
+
+# Below this many changed files a scan reads them in this process
+PARALLEL_MIN_FILES = 64
+
+# Project fields that query() filters on (substring, case-insensitive)
+TEXT_FILTERS = ("project_name", "user_name", "project_address", "traverse_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    project_name TEXT,
+    user_name TEXT,
+    project_address TEXT,
+    traverse_type TEXT,
+    units TEXT,
+    bearing_precision INTEGER,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS traverses (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    traverse_id TEXT,
+    closed INTEGER,
+    legs INTEGER,
+    perimeter REAL,
+    angular_misclosure REAL,
+    linear_misclosure REAL,
+    accuracy REAL,
+    area REAL,
+    computed INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_project_name ON files(project_name);
+CREATE INDEX IF NOT EXISTS files_project_address ON files(project_address);
+CREATE INDEX IF NOT EXISTS traverses_file ON traverses(file_id);
+CREATE INDEX IF NOT EXISTS traverses_accuracy ON traverses(accuracy);
+"""
+
+FILE_COLUMNS = ("project_name", "user_name", "project_address", "traverse_type", "units",
+                "bearing_precision", "error")
+TRAVERSE_COLUMNS = ("traverse_id", "closed", "legs", "perimeter", "angular_misclosure",
+                    "linear_misclosure", "accuracy", "area", "computed", "error")
+
+
+def closure_statistics(traverse):
+    """Catalog row values for one traverse_project.Traverse (closure figures only for closed ones)"""
+    summary = traverse_file.traverse_summary(traverse)
+    return {column: summary[column] for column in TRAVERSE_COLUMNS}
+
+
+def summarize_file(path):
+    """(file values, [traverse values]) for one .trv file; runs in worker processes"""
+    info = dict.fromkeys(FILE_COLUMNS)
+    try:
+        header = traverse_file.file_header(path)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        info["error"] = str(e)
+        return info, []
+    project_info = header.get("project_info", {})
+    settings = header.get("settings", {})
+    info.update(project_name=project_info.get("project_name", ""),
+                user_name=project_info.get("user_name", ""),
+                project_address=project_info.get("project_address", ""),
+                traverse_type=settings.get("traverse_type", "closed"),
+                units=settings.get("units", "metric"),
+                bearing_precision=settings.get("bearing_precision", 0))
+    return info, [{column: summary.get(column) for column in TRAVERSE_COLUMNS}
+                  for summary in header.get("traverses", [])]
+
+
+def _fingerprint(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _trv_files(folder):
+    for directory, _, names in os.walk(folder):
+        for name in names:
+            if name.lower().endswith(TRV_EXTENSION):
+                yield os.path.join(directory, name)
+
+
+class ScanResult:
+    """What a scan did"""
+    
+    def __init__(self):
+        self.added = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.removed = 0
+    
+    def __str__(self):
+        return (f"{self.added} added, {self.updated} updated, {self.unchanged} unchanged, "
+                f"{self.removed} removed")
+
+
+class ProjectCatalog:
+    """SQLite catalog of .trv files and their traverses"""
+    
+    def __init__(self, path=DEFAULT_CATALOG):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+    
+    def close(self):
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    # Indexing
+    def folders(self):
+        return [row["path"] for row in self.connection.execute("SELECT path FROM folders ORDER BY path")]
+    
+    def add_folder(self, folder):
+        """Include every .trv file under a folder in scans (call scan() to index it)"""
+        folder = os.path.abspath(folder)
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO folders (path) VALUES (?)", (folder,))
+        return folder
+    
+    def remove_folder(self, folder):
+        with self.connection:
+            self.connection.execute("DELETE FROM folders WHERE path = ?", (os.path.abspath(folder),))
+    
+    def scan(self, folders=None, files=(), workers=None):
+        """
+        Bring the catalog up to date with the .trv files under folders (default: every
+        indexed folder), the listed files, and the files already in the catalog.
+        Returns a ScanResult.
+        """
+        if folders is None:
+            folders = self.folders()
+        known = {row["path"]: (row["mtime_ns"], row["size"])
+                 for row in self.connection.execute("SELECT path, mtime_ns, size FROM files")}
+        
+        # Fingerprint every candidate; only new or changed files are read below
+        paths = set(known)
+        for folder in folders:
+            paths.update(_trv_files(folder))
+        paths.update(os.path.abspath(path) for path in files)
+        result = ScanResult()
+        changed = []
+        gone = []
+        for path in paths:
+            fingerprint = _fingerprint(path)
+            if fingerprint is None:
+                if path in known:
+                    gone.append(path)
+            elif known.get(path) == fingerprint:
+                result.unchanged += 1
+            else:
+                changed.append((path, fingerprint))
+        
+        summaries = self._summarize([path for path, _ in changed], workers)
+        with self.connection:
+            for (path, fingerprint), summary in zip(changed, summaries):
+                if path in known:
+                    result.updated += 1
+                else:
+                    result.added += 1
+                self._store(path, fingerprint, *summary)
+            self.connection.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in gone))
+            result.removed = len(gone)
+        return result
+    
+    def _summarize(self, paths, workers):
+        if workers == 1 or len(paths) < PARALLEL_MIN_FILES:
+            return [summarize_file(path) for path in paths]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(summarize_file, paths, chunksize=16))
+    
+    def _store(self, path, fingerprint, info, traverses):
+        self.connection.execute("DELETE FROM files WHERE path = ?", (path,))
+        cursor = self.connection.execute(
+            f"INSERT INTO files (path, mtime_ns, size, {', '.join(FILE_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' * len(FILE_COLUMNS))})",
+            (path, *fingerprint, *(info[column] for column in FILE_COLUMNS)))
+        file_id = cursor.lastrowid
+        self.connection.executemany(
+            f"INSERT INTO traverses (file_id, {', '.join(TRAVERSE_COLUMNS)}) "
+            f"VALUES (?, {', '.join('?' * len(TRAVERSE_COLUMNS))})",
+            ((file_id, *(row[column] for column in TRAVERSE_COLUMNS)) for row in traverses))
+    
+    # Queries
+    def query(self, worse_than=None, better_than=None, closed_only=False, limit=None, **filters):
+        """
+        Traverses matching every given filter, worst closure first.
+        Text filters (project_name, user_name, project_address, traverse_id) match any
+        part of the field, ignoring case. worse_than=5000 keeps closures worse than
+        1:5000. Rows have the file and traverse columns plus "path".
+        """
+        conditions = []
+        params = []
+        for name, value in filters.items():
+            if name not in TEXT_FILTERS:
+                raise ValueError(f"Unknown catalog filter: {name}")
+            if value:
+                escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                table = "t" if name == "traverse_id" else "f"
+                conditions.append(f"{table}.{name} LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+        if worse_than is not None:
+            conditions.append("t.accuracy < ?")
+            params.append(worse_than)
+        if better_than is not None:
+            conditions.append("(t.accuracy >= ? OR (t.closed AND t.accuracy IS NULL AND t.error IS NULL "
+                              "AND NOT COALESCE(t.computed, 0)))")
+            params.append(better_than)
+        if closed_only:
+            conditions.append("t.closed")
+        sql = ("SELECT f.path, f.project_name, f.user_name, f.project_address, f.units, "
+               "t.traverse_id, t.closed, t.legs, t.perimeter, t.angular_misclosure, "
+               "t.linear_misclosure, t.accuracy, t.area, t.computed, t.error "
+               "FROM traverses t JOIN files f ON f.id = t.file_id")
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY t.accuracy IS NULL, t.accuracy, f.path"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.connection.execute(sql, params).fetchall()
+    
+    def unreadable_files(self):
+        """(path, error) of files that could not be read as traverse files"""
+        return [(row["path"], row["error"]) for row in
+                self.connection.execute("SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path")]
+    
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+def format_accuracy(accuracy, closed=True, error=None, computed=0):
+    """
+    Catalog accuracy value as shown in reports: "1:N", "Perfect" or blank.
+    A closure used up by computed measurements is no check, shown as "Computed".
+    """
+    if error or not closed:
+        return ""
+    if accuracy is None:
+        return "Computed" if computed else "Perfect"
+    return f"1:{int(accuracy)}"
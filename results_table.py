@@ -0,0 +1,289 @@
+"""
+Results Table for Traverse Calculator
+A sortable, filterable table of the per-leg values of an adjustment, read
+directly from the solver's result lists. The Treeview only holds the rows that
+fit on screen: scrolling refills those few items from the data, so a 100,000-leg
+traverse scrolls, sorts and filters as quickly as a 4-sided one.
+"""
+
+import operator
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+import traverse_solver
+
+# key, heading, TraverseAdjustment attribute (None = derived), value format, unit label shown
+COLUMNS = (
+    ("side", "Side", None, "{:d}", False),
+    ("bearing", "Bearing", "bearings", "{:.6f}°", False),
+    ("angle", "Interior Angle", "angles", "{:.6f}°", False),
+    ("adjusted_angle", "Adjusted Angle", "adjusted_angles", "{:.6f}°", False),
+    ("azimuth", "Azimuth", "azimuths", "{:.6f}°", False),
+    ("distance", "Distance", "distances", "{:.3f}", True),
+    ("latitude", "Latitude", "latitudes", "{:.6f}", True),
+    ("departure", "Departure", "departures", "{:.6f}", True),
+    ("lat_correction", "Lat Corr", "lat_corrections", "{:.6f}", True),
+    ("dep_correction", "Dep Corr", "dep_corrections", "{:.6f}", True),
+    ("adjusted_lat", "Adjusted Lat", "adjusted_lats", "{:.6f}", True),
+    ("adjusted_dep", "Adjusted Dep", "adjusted_deps", "{:.6f}", True),
+    ("corrected_bearing", "Corrected Bearing", "corrected_azimuths", None, False),
+    ("corrected_distance", "Corrected Distance", "corrected_distances", "{:.3f}", True),
+    ("northing", "Northing", None, "{:.3f}", True),
+    ("easting", "Easting", None, "{:.3f}", True),
+)
+
+COLUMN_KEYS = tuple(column[0] for column in COLUMNS)
+
+# Filter operators offered in the toolbar
+FILTER_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "|x| >": lambda value, limit: abs(value) > limit,
+    "|x| <": lambda value, limit: abs(value) < limit,
+}
+
+# Row height used until the Treeview style reports one
+DEFAULT_ROW_HEIGHT = 20
+
+
+class ResultRows:
+    """The legs of an adjustment in display order, after filtering and sorting"""
+    
+    def __init__(self, adjustment, bearing_precision=0):
+        self.adjustment = adjustment
+        self.bearing_precision = bearing_precision
+        self.sort_key = None
+        self.sort_descending = False
+        self.filter = None
+        self._coordinates = None
+        self._legs = range(adjustment.n)
+        self.order = self._legs
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def column(self, key):
+        """Values of a column indexed by leg (corrected bearings as azimuths)"""
+        adj = self.adjustment
+        if key == "side":
+            return range(1, adj.n + 1)
+        if key in ("northing", "easting"):
+            if self._coordinates is None:
+                # Station coordinates are only summed up once a view needs them
+                points = adj.coordinates()
+                self._coordinates = ([p[0] for p in points], [p[1] for p in points])
+            return self._coordinates[key == "easting"]
+        return getattr(adj, COLUMNS[COLUMN_KEYS.index(key)][2])
+    
+    def row(self, leg):
+        """Formatted values of one leg, in COLUMNS order"""
+        values = []
+        for key, _, _, fmt, _ in COLUMNS:
+            value = self.column(key)[leg]
+            if fmt is None:
+                values.append(traverse_solver.azimuth_to_bearing(value, self.bearing_precision))
+            else:
+                values.append(fmt.format(value))
+        return values
+    
+    def sort(self, key, descending=False):
+        """Order rows by a column (None restores leg order)"""
+        self.sort_key = key
+        self.sort_descending = descending
+        self._update()
+    
+    def set_filter(self, key, op, limit):
+        """Keep legs whose column value satisfies op (a FILTER_OPERATORS key) against limit"""
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unknown filter operator: {op}")
+        self.filter = (key, op, limit)
+        values, test = self.column(key), FILTER_OPERATORS[op]
+        self._legs = [leg for leg in range(self.adjustment.n) if test(values[leg], limit)]
+        self._update()
+    
+    def clear_filter(self):
+        self.filter = None
+        self._legs = range(self.adjustment.n)
+        self._update()
+    
+    def _update(self):
+        if self.sort_key is None:
+            self.order = self._legs[::-1] if self.sort_descending else self._legs
+        else:
+            values = self.column(self.sort_key)
+            self.order = sorted(self._legs, key=values.__getitem__, reverse=self.sort_descending)
+
+
+def parse_filter_value(key, text):
+    """Filter limit typed for a column: a bearing for Corrected Bearing, otherwise a number"""
+    if key == "corrected_bearing":
+        return traverse_solver.bearing_to_azimuth(text)
+    return float(text)
+
+
+class ResultsTable(ttk.Frame):
+    """Virtual Treeview over a ResultRows: only the visible rows exist as items"""
+    
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.rows = None
+        self.unit_label = "m"
+        self.first = 0
+        self.page_size = 1
+        self._items = []
+        
+        # Filter toolbar
+        toolbar = ttk.Frame(self)
+        toolbar.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+        ttk.Label(toolbar, text="Filter:").pack(side=tk.LEFT, padx=(0, 5))
+        self.filter_column = ttk.Combobox(toolbar, state="readonly", width=20,
+                                          values=[column[1] for column in COLUMNS])
+        self.filter_column.current(COLUMN_KEYS.index("lat_correction"))
+        self.filter_column.pack(side=tk.LEFT)
+        self.filter_operator = ttk.Combobox(toolbar, state="readonly", width=6, values=list(FILTER_OPERATORS))
+        self.filter_operator.current(list(FILTER_OPERATORS).index("|x| >"))
+        self.filter_operator.pack(side=tk.LEFT, padx=5)
+        self.filter_value = tk.StringVar()
+        filter_entry = ttk.Entry(toolbar, textvariable=self.filter_value, width=18)
+        filter_entry.pack(side=tk.LEFT)
+        filter_entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Button(toolbar, text="Apply", command=self.apply_filter).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Clear", command=self.clear_filter).pack(side=tk.LEFT)
+        self.count_label = ttk.Label(toolbar, text="")
+        self.count_label.pack(side=tk.RIGHT)
+        
+        # Table; the vertical scrollbar is driven by the row offset, not by the Treeview
+        table = ttk.Frame(self)
+        table.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table, columns=COLUMN_KEYS, show="headings", selectmode="browse")
+        for key, heading, _, fmt, _ in COLUMNS:
+            self.tree.heading(key, text=heading, command=lambda key=key: self.sort_by(key))
+            self.tree.column(key, width=60 if key == "side" else 130, stretch=False,
+                             anchor=tk.W if fmt is None else tk.E)
+        self.scrollbar = ttk.Scrollbar(table, orient="vertical", command=self.yview)
+        xscrollbar = ttk.Scrollbar(table, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=xscrollbar.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        xscrollbar.grid(row=1, column=0, sticky="ew")
+        table.rowconfigure(0, weight=1)
+        table.columnconfigure(0, weight=1)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units", 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units", 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units", 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        self.tree.bind("<Home>", lambda e: self.scroll_to(0) or "break")
+        self.tree.bind("<End>", lambda e: self.scroll_to(len(self.rows or ())) or "break")
+        self.tree.bind("<Up>", lambda e: self.step_selection(-1))
+        self.tree.bind("<Down>", lambda e: self.step_selection(1))
+    
+    # Data
+    def set_adjustment(self, adjustment, unit_label="m", bearing_precision=0):
+        """Show an adjustment, keeping the current sort order and filter where possible"""
+        previous = self.rows
+        self.rows = ResultRows(adjustment, bearing_precision)
+        self.unit_label = unit_label
+        if previous is not None:
+            if previous.filter is not None:
+                self.rows.set_filter(*previous.filter)
+            self.rows.sort(previous.sort_key, previous.sort_descending)
+        self.update_headings()
+        self.scroll_to(0)
+    
+    def clear(self):
+        self.rows = None
+        self.scroll_to(0)
+    
+    # Sorting and filtering
+    def sort_by(self, key):
+        """Sort by a column; clicking the same heading again reverses the order"""
+        if self.rows is None:
+            return
+        descending = self.rows.sort_key == key and not self.rows.sort_descending
+        self.rows.sort(key, descending)
+        self.update_headings()
+        self.scroll_to(0)
+    
+    def apply_filter(self):
+        if self.rows is None:
+            return
+        key = COLUMN_KEYS[self.filter_column.current()]
+        try:
+            limit = parse_filter_value(key, self.filter_value.get())
+        except ValueError:
+            messagebox.showerror("Error", f"Invalid filter value: {self.filter_value.get()}")
+            return
+        self.rows.set_filter(key, self.filter_operator.get(), limit)
+        self.scroll_to(0)
+    
+    def clear_filter(self):
+        self.filter_value.set("")
+        if self.rows is not None:
+            self.rows.clear_filter()
+            self.scroll_to(0)
+    
+    def update_headings(self):
+        for key, heading, _, _, with_unit in COLUMNS:
+            text = f"{heading} ({self.unit_label})" if with_unit else heading
+            if self.rows is not None and self.rows.sort_key == key:
+                text += " ▼" if self.rows.sort_descending else " ▲"
+            self.tree.heading(key, text=text)
+    
+    # Virtual scrolling
+    def on_resize(self, event):
+        row_height = ttk.Style(self).lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT
+        # One row's worth of height is taken by the headings
+        page_size = max(1, event.height // int(row_height) - 1)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.scroll_to(self.first)
+    
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, "units"/"pages")"""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.rows or ())))
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+    
+    def scroll(self, amount, what="units", step=1):
+        self.scroll_to(self.first + amount * (self.page_size if what == "pages" else step))
+        return "break"
+    
+    def scroll_to(self, first):
+        """Show the rows from first on, reusing the existing Treeview items"""
+        total = len(self.rows) if self.rows is not None else 0
+        self.first = max(0, min(first, total - self.page_size))
+        legs = self.rows.order[self.first:self.first + self.page_size] if total else ()
+        
+        while len(self._items) > len(legs):
+            self.tree.delete(self._items.pop())
+        for i, leg in enumerate(legs):
+            values = self.rows.row(leg)
+            if i < len(self._items):
+                self.tree.item(self._items[i], values=values)
+            else:
+                self._items.append(self.tree.insert("", tk.END, values=values))
+        
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + len(legs)) / total))
+            self.count_label.config(text=f"{total} of {self.rows.adjustment.n} legs")
+        else:
+            self.scrollbar.set(0.0, 1.0)
+            self.count_label.config(text="")
+    
+    def step_selection(self, step):
+        """Arrow keys: move the selection, scrolling the data when it reaches an edge"""
+        selected = self.tree.selection()
+        if not selected or not self._items:
+            return None
+        position = self._items.index(selected[0]) + step
+        if 0 <= position < len(self._items):
+            return None
+        # Scroll one row and keep the selection on the edge item
+        self.scroll(step)
+        return "break"
@@ -0,0 +1,213 @@
+"""
+Spatial Index for Traverse Calculator
+A uniform grid hash over computed station coordinates for radius searches,
+nearest-neighbour lookups and duplicate-point detection. Points are added
+incrementally as traverses are adjusted, and a traverse's points can be
+replaced without rebuilding the rest of the index.
+"""
+
+import math
+from array import array
+
+# Default grid cell size in project units (m or ft)
+DEFAULT_CELL_SIZE = 10.0
+
+
+class StationGrid:
+    """
+    Grid hash of (northing, easting) points. Each point has a key (e.g. a station ID)
+    and belongs to a group (e.g. a traverse name) so whole groups can be replaced.
+    Coordinates are kept in flat arrays; cells map to lists of point numbers.
+    """
+    
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        if cell_size <= 0:
+            raise ValueError("Cell size must be positive")
+        self.cell_size = float(cell_size)
+        self.northings = array('d')
+        self.eastings = array('d')
+        self.keys = []
+        self._cells = {}
+        self._groups = {}
+        self._free = []
+        self._count = 0
+        # Bounding box of cells ever occupied (only grows), limits the nearest-neighbour search
+        self._bounds = None
+    
+    def __len__(self):
+        return self._count
+    
+    def _cell(self, northing, easting):
+        return (math.floor(northing / self.cell_size), math.floor(easting / self.cell_size))
+    
+    # Building
+    def insert(self, key, northing, easting, group=None):
+        """Add one point and return its point number"""
+        if self._free:
+            i = self._free.pop()
+            self.northings[i] = northing
+            self.eastings[i] = easting
+            self.keys[i] = key
+        else:
+            i = len(self.keys)
+            self.northings.append(northing)
+            self.eastings.append(easting)
+            self.keys.append(key)
+        cell = self._cell(northing, easting)
+        self._cells.setdefault(cell, []).append(i)
+        if self._bounds is None:
+            self._bounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            bounds = self._bounds
+            if cell[0] < bounds[0]:
+                bounds[0] = cell[0]
+            elif cell[0] > bounds[1]:
+                bounds[1] = cell[0]
+            if cell[1] < bounds[2]:
+                bounds[2] = cell[1]
+            elif cell[1] > bounds[3]:
+                bounds[3] = cell[1]
+        self._groups.setdefault(group, []).append(i)
+        self._count += 1
+        return i
+    
+    def insert_many(self, points, group=None):
+        """Add (key, northing, easting) tuples"""
+        for key, northing, easting in points:
+            self.insert(key, northing, easting, group)
+    
+    def remove_group(self, group):
+        """Remove every point added under a group; the slots are reused by later inserts"""
+        for i in self._groups.pop(group, ()):
+            cell = self._cell(self.northings[i], self.eastings[i])
+            members = self._cells.get(cell)
+            if members is not None:
+                members.remove(i)
+                if not members:
+                    del self._cells[cell]
+            self.keys[i] = None
+            self._free.append(i)
+            self._count -= 1
+    
+    def replace_group(self, group, points):
+        """Swap in new (key, northing, easting) points for a group, e.g. after re-adjusting a traverse"""
+        self.remove_group(group)
+        self.insert_many(points, group)
+    
+    def add_adjustment(self, adjustment, group=None, start_northing=0.0, start_easting=0.0, station_ids=None):
+        """Index the adjusted stations of a traverse_solver.TraverseAdjustment"""
+        points = adjustment.coordinates(start_northing, start_easting)
+        if station_ids is None:
+            station_ids = [str(i + 1) for i in range(len(points))]
+        self.replace_group(group, [(sid, n, e) for sid, (n, e) in zip(station_ids, points)])
+    
+    # Queries
+    def _candidate_cells(self, northing, easting, radius):
+        """Cells that may hold points within radius, scanning only occupied cells when that is cheaper"""
+        cn, ce = self._cell(northing, easting)
+        reach = int(math.ceil(radius / self.cell_size))
+        if (2 * reach + 1) ** 2 > len(self._cells):
+            lo_n, hi_n, lo_e, hi_e = cn - reach, cn + reach, ce - reach, ce + reach
+            return [members for (n, e), members in self._cells.items()
+                    if lo_n <= n <= hi_n and lo_e <= e <= hi_e]
+        cells = self._cells
+        return [cells[(n, e)]
+                for n in range(cn - reach, cn + reach + 1)
+                for e in range(ce - reach, ce + reach + 1)
+                if (n, e) in cells]
+    
+    def within(self, northing, easting, radius):
+        """Keys of the points within radius, as (distance, key) sorted by distance"""
+        radius_sq = radius * radius
+        northings, eastings, keys = self.northings, self.eastings, self.keys
+        found = []
+        for members in self._candidate_cells(northing, easting, radius):
+            for i in members:
+                dn = northings[i] - northing
+                de = eastings[i] - easting
+                d_sq = dn * dn + de * de
+                if d_sq <= radius_sq:
+                    found.append((math.sqrt(d_sq), keys[i]))
+        found.sort(key=lambda item: item[0])
+        return found
+    
+    def nearest(self, northing, easting, k=1):
+        """The k closest points as (distance, key), searching outward ring by ring"""
+        if self._count == 0:
+            return []
+        k = min(k, self._count)
+        cn, ce = self._cell(northing, easting)
+        northings, eastings, keys = self.northings, self.eastings, self.keys
+        best = []
+        ring, max_ring = self._ring_range(cn, ce)
+        while ring <= max_ring:
+            for cell in self._ring_cells(cn, ce, ring):
+                for i in self._cells.get(cell, ()):
+                    dn = northings[i] - northing
+                    de = eastings[i] - easting
+                    best.append((dn * dn + de * de, keys[i]))
+            if len(best) >= k:
+                best.sort(key=lambda item: item[0])
+                del best[k:]
+                # Anything outside this ring is at least ring * cell_size away
+                if best[-1][0] <= (ring * self.cell_size) ** 2:
+                    break
+            ring += 1
+        return [(math.sqrt(d_sq), key) for d_sq, key in best]
+    
+    def _ring_range(self, cn, ce):
+        """First ring that can touch an occupied cell, and the ring that covers them all"""
+        min_n, max_n, min_e, max_e = self._bounds
+        first = max(min_n - cn, cn - max_n, min_e - ce, ce - max_e, 0)
+        last = max(abs(min_n - cn), abs(max_n - cn), abs(min_e - ce), abs(max_e - ce))
+        return first, last
+    
+    def _ring_cells(self, cn, ce, ring):
+        if ring == 0:
+            return [(cn, ce)]
+        cells = []
+        for e in range(ce - ring, ce + ring + 1):
+            cells.append((cn - ring, e))
+            cells.append((cn + ring, e))
+        for n in range(cn - ring + 1, cn + ring):
+            cells.append((n, ce - ring))
+            cells.append((n, ce + ring))
+        return cells
+    
+    def within_many(self, points, radius):
+        """Bulk radius search: one result list per (northing, easting) query point"""
+        return [self.within(northing, easting, radius) for northing, easting in points]
+    
+    def nearest_many(self, points, k=1):
+        """Bulk nearest-neighbour search: one result list per (northing, easting) query point"""
+        return [self.nearest(northing, easting, k) for northing, easting in points]
+    
+    def duplicates(self, tolerance):
+        """
+        Pairs of points closer than tolerance, as (distance, key_a, key_b).
+        Each point is only compared with its own and neighbouring cells.
+        """
+        tol_sq = tolerance * tolerance
+        reach = max(1, int(math.ceil(tolerance / self.cell_size)))
+        northings, eastings, keys = self.northings, self.eastings, self.keys
+        cells = self._cells
+        pairs = []
+        for (cn, ce), members in cells.items():
+            for n in range(cn - reach, cn + reach + 1):
+                for e in range(ce - reach, ce + reach + 1):
+                    # Visit each pair of cells once
+                    if (n, e) < (cn, ce):
+                        continue
+                    others = cells.get((n, e))
+                    if not others:
+                        continue
+                    same = (n, e) == (cn, ce)
+                    for a_pos, a in enumerate(members):
+                        for b in (members[a_pos + 1:] if same else others):
+                            dn = northings[a] - northings[b]
+                            de = eastings[a] - eastings[b]
+                            d_sq = dn * dn + de * de
+                            if d_sq <= tol_sq:
+                                pairs.append((math.sqrt(d_sq), keys[a], keys[b]))
+        pairs.sort(key=lambda item: item[0])
+        return pairs
@@ -0,0 +1,207 @@
+"""
+Streaming Adjustment for Traverse Calculator
+Bowditch adjustment of a closed traverse read from a re-iterable source of
+(azimuth, distance) legs, e.g. a memory-mapped leg file, with constant working
+memory. Nothing per leg is kept between passes:
+
+    pass 1  counts legs and accumulates the angle sum, the perimeter and the
+            latitude/departure sums
+    pass 2  re-reads the legs and sends each corrected row to a sink
+
+The angle-sum correction c rotates leg i's azimuth by -i*c, so pass 1 also
+accumulates the first-order terms of that rotation. The closure sums then
+differ from the rotated sums by at most P*(n*c)**2/2 for perimeter P, i.e.
+P*5e-9 at MAX_LINEAR_ROTATION (5 mm on a 1000 km traverse), which covers
+clockwise input. For larger rotations (counter-clockwise input, where the
+computed angles are exterior angles) an extra summing pass is made between the
+two.
+
+Results match traverse_solver.adjust_traverse row for row, within the bound
+above. traverse_batch.py stream runs it over a leg file from the command line.
+"""
+
+import math
+import mmap
+import struct
+
+import traverse_solver
+
+# Leg file record: azimuth (decimal degrees), distance, as little-endian doubles
+LEG_RECORD = struct.Struct("<dd")
+
+# Above this total rotation (radians) the first-order closure sums are not trusted
+MAX_LINEAR_ROTATION = 1e-4
+
+# Fields of each row passed to the sink
+ROW_FIELDS = ("leg", "azimuth", "distance", "latitude", "departure", "lat_correction",
+              "dep_correction", "adjusted_lat", "adjusted_dep", "corrected_distance",
+              "corrected_azimuth", "northing", "easting")
+
+
+class LegFile:
+    """
+    Re-iterable (azimuth, distance) legs stored as packed doubles and read through mmap,
+    so a traverse larger than memory can be adjusted.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def __len__(self):
+        with open(self.path, 'rb') as f:
+            f.seek(0, 2)
+            return f.tell() // LEG_RECORD.size
+    
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            f.seek(0, 2)
+            if f.tell() == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                usable = len(data) - len(data) % LEG_RECORD.size
+                yield from LEG_RECORD.iter_unpack(memoryview(data)[:usable])
+    
+    @staticmethod
+    def write(path, legs):
+        """Write (azimuth, distance) legs to a leg file and return how many were written"""
+        count = 0
+        with open(path, 'wb') as f:
+            for azimuth, distance in legs:
+                f.write(LEG_RECORD.pack(azimuth, distance))
+                count += 1
+        return count
+
+
+class StreamingResult:
+    """Scalar results of a streaming adjustment (the per-leg rows go to the sink)"""
+    
+    def __init__(self):
+        self.n = 0
+        self.theoretical_sum = 0.0
+        self.actual_sum = 0.0
+        self.angular_misclosure = 0.0
+        self.angular_correction = 0.0
+        self.sum_lat = 0.0
+        self.sum_dep = 0.0
+        self.total_perimeter = 0.0
+        self.linear_misclosure = 0.0
+        self.relative_accuracy = ""
+        self.area = 0.0
+        self.passes = 0
+
+
+def _interior_angle(bearing, next_bearing):
+    # Same arithmetic as traverse_solver.calculate_interior_angles
+    return ((bearing + 180) % 360 - next_bearing) % 360
+
+
+def _first_pass(legs):
+    """n, angle sum, perimeter, raw lat/dep sums and their first-order rotation terms"""
+    n = 0
+    angle_sum = perimeter = 0.0
+    lat0 = dep0 = lat1 = dep1 = 0.0
+    first = previous = None
+    for azimuth, distance in legs:
+        if first is None:
+            first = azimuth
+        else:
+            angle_sum += _interior_angle(previous, azimuth)
+        rad = math.radians(azimuth)
+        lat, dep = distance * math.cos(rad), distance * math.sin(rad)
+        lat0 += lat
+        dep0 += dep
+        # d/dc of the leg's lat/dep when its azimuth is rotated by -n*c
+        lat1 += n * dep
+        dep1 -= n * lat
+        perimeter += distance
+        previous = azimuth
+        n += 1
+    if n:
+        angle_sum += _interior_angle(previous, first)
+    return n, angle_sum, perimeter, (lat0, dep0, lat1, dep1)
+
+
+def _azimuths(legs, correction):
+    """Yield (adjusted azimuth, distance) with the same recurrence as adjust_traverse"""
+    azimuth = previous = None
+    for bearing, distance in legs:
+        if azimuth is None:
+            azimuth = bearing
+        else:
+            adjusted_angle = _interior_angle(previous, bearing) + correction
+            azimuth = (azimuth + 180 - adjusted_angle) % 360
+        previous = bearing
+        yield azimuth, distance
+
+
+def stream_adjust(legs, sink=None, start_northing=0.0, start_easting=0.0):
+    """
+    Adjust a closed traverse from legs, a re-iterable of (azimuth, distance) such as a
+    list or LegFile. sink(row) receives one tuple per leg in ROW_FIELDS order.
+    Returns a StreamingResult.
+    """
+    result = StreamingResult()
+    
+    # Pass 1: sums
+    n, angle_sum, perimeter, (lat0, dep0, lat1, dep1) = _first_pass(legs)
+    result.passes = 1
+    if n < 3:
+        raise ValueError("A closed traverse needs at least 3 legs")
+    if perimeter <= 0:
+        raise ValueError("Total distance must be positive")
+    result.n = n
+    result.theoretical_sum = (n - 2) * 180
+    result.actual_sum = angle_sum
+    result.angular_misclosure = angle_sum - result.theoretical_sum
+    result.angular_correction = correction = -result.angular_misclosure / n
+    result.total_perimeter = perimeter
+    
+    rotation = math.radians(correction)
+    if abs(rotation) * n <= MAX_LINEAR_ROTATION:
+        sum_lat = lat0 + rotation * lat1
+        sum_dep = dep0 + rotation * dep1
+    else:
+        # Too much rotation for the first-order terms: sum the adjusted legs directly
+        sum_lat = sum_dep = 0.0
+        for azimuth, distance in _azimuths(legs, correction):
+            sum_lat += distance * math.cos(math.radians(azimuth))
+            sum_dep += distance * math.sin(math.radians(azimuth))
+        result.passes += 1
+    result.sum_lat, result.sum_dep = sum_lat, sum_dep
+    result.linear_misclosure = math.sqrt(sum_lat**2 + sum_dep**2)
+    result.relative_accuracy = (f"1:{int(perimeter/result.linear_misclosure)}"
+                                if result.linear_misclosure > 0 else "Perfect")
+    
+    # Pass 2: corrected rows
+    northing, easting = start_northing, start_easting
+    twice_area = 0.0
+    for i, (azimuth, distance) in enumerate(_azimuths(legs, correction)):
+        rad = math.radians(azimuth)
+        lat, dep = distance * math.cos(rad), distance * math.sin(rad)
+        lat_corr = -(sum_lat * distance) / perimeter
+        dep_corr = -(sum_dep * distance) / perimeter
+        adjusted_lat, adjusted_dep = lat + lat_corr, dep + dep_corr
+        corrected_distance = math.sqrt(adjusted_lat**2 + adjusted_dep**2)
+        corrected = traverse_solver.corrected_azimuth(adjusted_lat, adjusted_dep)
+        if sink is not None:
+            sink((i, azimuth, distance, lat, dep, lat_corr, dep_corr, adjusted_lat, adjusted_dep,
+                  corrected_distance, corrected, northing, easting))
+        # Shoelace term relative to the start point keeps the area exact for large coordinates
+        rel_n, rel_e = northing - start_northing, easting - start_easting
+        twice_area += rel_e * (rel_n + adjusted_lat) - (rel_e + adjusted_dep) * rel_n
+        northing += adjusted_lat
+        easting += adjusted_dep
+    result.passes += 1
+    result.area = abs(twice_area) / 2
+    return result
+
+
+def csv_sink(f, precision=6):
+    """Sink that writes each corrected row as a CSV line to a text file"""
+    f.write(",".join(ROW_FIELDS) + "\n")
+    template = "%d," + ",".join([f"%.{precision}f"] * (len(ROW_FIELDS) - 1)) + "\n"
+    
+    def write(row):
+        f.write(template % row)
+    
+    return write
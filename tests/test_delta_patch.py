@@ -0,0 +1,75 @@
+"""
+Tests for delta_patch.py
+Run with: python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import delta_patch
+
+
+def rebuild(source, operations):
+    """Apply diff_bytes operations in memory"""
+    parts = []
+    for op in operations:
+        if op[0] == 'C':
+            parts.append(source[op[1]:op[1] + op[2]])
+        else:
+            parts.append(op[1])
+    return b''.join(parts)
+
+
+class DiffBytesTest(unittest.TestCase):
+    
+    def diff_with_timeout(self, source, target, timeout=10):
+        result = []
+        worker = threading.Thread(target=lambda: result.append(delta_patch.diff_bytes(source, target)),
+                                  daemon=True)
+        worker.start()
+        worker.join(timeout)
+        self.assertFalse(worker.is_alive(), "diff_bytes did not finish")
+        return result[0]
+    
+    def test_short_match_after_backward_extension_terminates(self):
+        # A zero run shorter than MIN_COPY_LENGTH once extended used to be found and rewound forever
+        rng = random.Random(28)
+        random_bytes = lambda n: bytes(rng.randrange(256) for _ in range(n))
+        source = random_bytes(20) + bytes(200) + random_bytes(100)
+        target = random_bytes(50) + bytes(50) + random_bytes(50)
+        operations = self.diff_with_timeout(source, target)
+        self.assertEqual(rebuild(source, operations), target)
+    
+    def test_round_trip_with_repeated_runs(self):
+        rng = random.Random(1028)
+        for _ in range(20):
+            blocks = [bytes([rng.randrange(4)]) * rng.randrange(1, 300) if rng.random() < 0.4
+                      else bytes(rng.randrange(256) for _ in range(rng.randrange(1, 300)))
+                      for _ in range(30)]
+            source = b''.join(blocks)
+            rng.shuffle(blocks)
+            target = b''.join(blocks[:25]) + bytes(rng.randrange(256) for _ in range(100))
+            operations = self.diff_with_timeout(source, target)
+            self.assertEqual(rebuild(source, operations), target)
+            
+            with tempfile.TemporaryDirectory() as folder:
+                old_path, new_path, patch_path, out_path = (os.path.join(folder, name) for name in
+                                                            ("old.exe", "new.exe", "update.patch", "out.exe"))
+                with open(old_path, 'wb') as f:
+                    f.write(source)
+                with open(new_path, 'wb') as f:
+                    f.write(target)
+                delta_patch.create_patch(old_path, new_path, patch_path)
+                delta_patch.apply_patch(old_path, patch_path, out_path)
+                with open(out_path, 'rb') as f:
+                    self.assertEqual(f.read(), target)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Tests for missing_measurements.py
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import missing_measurements
+
+
+class TangentTest(unittest.TestCase):
+    
+    # A square lot: side 2 is perpendicular to side 3, so the circle touches the line
+    BEARINGS = ["N0E", "", "S0E", "S90W"]
+    
+    def test_bearing_and_distance_tangent_is_one_solution(self):
+        completion = missing_measurements.complete_legs(self.BEARINGS, ["100", "100", "", "100"])
+        self.assertEqual(completion.alternatives, [])
+        self.assertAlmostEqual(completion.bearings[1], 90.0, places=6)
+        self.assertAlmostEqual(completion.distances[2], 100.0, places=6)
+        self.assertEqual(completion.residual, 0.0)
+        self.assertTrue(any("perpendicular" in warning for warning in completion.warnings))
+    
+    def test_bearing_and_distance_slightly_short_leaves_misclosure(self):
+        completion = missing_measurements.complete_legs(self.BEARINGS, ["100", "99.999", "", "100"])
+        self.assertEqual(completion.alternatives, [])
+        self.assertAlmostEqual(completion.distances[2], 100.0, places=6)
+        self.assertAlmostEqual(completion.residual, 0.001, places=6)
+    
+    def test_bearing_and_distance_too_short(self):
+        with self.assertRaises(ValueError):
+            missing_measurements.complete_legs(self.BEARINGS, ["100", "99.9", "", "100"])
+    
+    def test_two_bearings_collinear_is_one_solution(self):
+        half = 100 * 2 ** 0.5 / 2
+        completion = missing_measurements.complete_legs(["N0E", "", "", "S90W"],
+                                                        ["100", f"{half:.9f}", f"{half:.9f}", "100"])
+        self.assertEqual(completion.alternatives, [])
+        self.assertAlmostEqual(completion.bearings[1], 135.0, places=4)
+        self.assertAlmostEqual(completion.bearings[2], 135.0, places=4)
+        self.assertTrue(any("parallel" in warning for warning in completion.warnings))
+    
+    def test_two_distinct_solutions_stay_ambiguous(self):
+        with self.assertRaises(missing_measurements.AmbiguousCompletion) as raised:
+            missing_measurements.complete_legs(self.BEARINGS, ["100", "101", "", "100"])
+        self.assertEqual(len(raised.exception.solutions), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Tests for parcel_subdivision.py
+Run with: python -m unittest discover tests
+"""
+
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parcel_subdivision
+
+
+class PointCutTest(unittest.TestCase):
+    
+    def test_every_sampled_area_is_reached(self):
+        # Convex parcels with a point inside: the lot area can peak or dip between station turns
+        rng = random.Random(50)
+        for _ in range(200):
+            angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randrange(3, 8)))
+            radius = rng.uniform(30, 80)
+            points = [(radius * math.cos(a), radius * math.sin(a)) for a in angles]
+            parcel = parcel_subdivision.Parcel(points)
+            weights = [rng.random() for _ in points]
+            point = tuple(sum(p[axis] * w for p, w in zip(points, weights)) / sum(weights) for axis in (0, 1))
+            cut = parcel_subdivision.PointCut(parcel, rng.randrange(len(points)), point)
+            sampled = [cut.area(180 * k / 1000) for k in range(1001)]
+            target = rng.uniform(min(sampled), max(sampled))
+            with self.subTest(points=points, point=point, target=target):
+                self.assertAlmostEqual(cut.area(cut.turn(target)), target, delta=1e-6 * parcel.area)
+    
+    def test_unreachable_area_is_refused(self):
+        # Every line through the centre of a square halves it
+        cut = parcel_subdivision.PointCut(parcel_subdivision.Parcel([(0, 0), (0, 10), (10, 10), (10, 0)]),
+                                          0, (5, 5))
+        with self.assertRaises(ValueError):
+            cut.turn(10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for streaming_adjust.py
+Run with: python -m unittest discover tests
+"""
+
+import math
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streaming_adjust
+import traverse_solver
+
+
+def noisy_polygon(rng, n, clockwise=True):
+    """Legs of a regular polygon with small bearing and distance errors"""
+    step = 360 / n if clockwise else -360 / n
+    azimuths = [(90 + i * step + rng.gauss(0, 0.002)) % 360 for i in range(n)]
+    distances = [100 + rng.gauss(0, 0.01) for _ in range(n)]
+    return azimuths, distances
+
+
+class StreamAdjustTest(unittest.TestCase):
+    
+    def check_against_adjust_traverse(self, azimuths, distances, passes):
+        expected = traverse_solver.adjust_traverse(azimuths, distances)
+        rows = []
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "legs.bin")
+            streaming_adjust.LegFile.write(path, zip(azimuths, distances))
+            result = streaming_adjust.stream_adjust(streaming_adjust.LegFile(path), rows.append, 1000.0, 2000.0)
+        self.assertEqual(result.passes, passes)
+        self.assertEqual(result.n, expected.n)
+        self.assertAlmostEqual(result.angular_misclosure, expected.angular_misclosure, places=9)
+        # The first-order closure sums are within P*(n*c)**2/2 of the exact ones
+        bound = result.total_perimeter * (result.n * math.radians(result.angular_correction)) ** 2 / 2 + 1e-9
+        self.assertAlmostEqual(result.linear_misclosure, expected.linear_misclosure, delta=bound)
+        points = expected.coordinates(1000.0, 2000.0)
+        self.assertAlmostEqual(result.area, traverse_solver.polygon_area(points), delta=1e-6 * result.area)
+        for row, lat, dep, distance, azimuth, point in zip(rows, expected.adjusted_lats, expected.adjusted_deps,
+                                                           expected.corrected_distances,
+                                                           expected.corrected_azimuths, points):
+            fields = dict(zip(streaming_adjust.ROW_FIELDS, row))
+            self.assertAlmostEqual(fields["adjusted_lat"], lat, delta=bound)
+            self.assertAlmostEqual(fields["adjusted_dep"], dep, delta=bound)
+            self.assertAlmostEqual(fields["corrected_distance"], distance, delta=bound)
+            self.assertAlmostEqual(fields["corrected_azimuth"], azimuth, places=6)
+            self.assertAlmostEqual(fields["northing"], point[0], delta=result.n * bound)
+            self.assertAlmostEqual(fields["easting"], point[1], delta=result.n * bound)
+        self.assertEqual(len(rows), expected.n)
+    
+    def test_clockwise_uses_first_order_sums(self):
+        azimuths, distances = noisy_polygon(random.Random(40), 50)
+        self.check_against_adjust_traverse(azimuths, distances, passes=2)
+    
+    def test_counter_clockwise_sums_directly(self):
+        azimuths, distances = noisy_polygon(random.Random(41), 50, clockwise=False)
+        self.check_against_adjust_traverse(azimuths, distances, passes=3)
+    
+    def test_too_few_legs(self):
+        with self.assertRaises(ValueError):
+            streaming_adjust.stream_adjust([(0.0, 1.0), (180.0, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
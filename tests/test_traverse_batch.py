@@ -0,0 +1,71 @@
+"""
+Tests for traverse_batch.py
+Run with: python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streaming_adjust
+import traverse_batch
+
+TRAVERSE = {
+    "project_info": {"project_name": "Test", "traverse_id": "T1"},
+    "settings": {"units": "metric"},
+    "num_sides": 4,
+    "data": [{"bearing": "N45.3015E", "distance": "100.00"}, {"bearing": "S44.2930E", "distance": "100.05"},
+             {"bearing": "S45.3000W", "distance": "99.98"}, {"bearing": "N44.3020W", "distance": "100.02"}],
+}
+
+
+class CommandTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "a.trv")
+        with open(self.path, 'w') as f:
+            json.dump(TRAVERSE, f)
+        targets = os.path.join(self.folder.name, "targets.csv")
+        with open(targets, 'w') as f:
+            f.write("p1,10,10\n")
+        self.commands = [
+            ["report", self.path],
+            ["coordinates", self.path],
+            ["stakeout", self.path, "--station", "1", "--backsight", "2", "--targets", targets],
+        ]
+    
+    def tearDown(self):
+        self.folder.cleanup()
+    
+    def test_console_output_leaves_stdout_open(self):
+        for argv in self.commands:
+            with self.subTest(command=argv[0]):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    traverse_batch.main(argv)
+                    traverse_batch.main(argv)
+                self.assertFalse(output.closed)
+                self.assertTrue(output.getvalue())
+    
+    
+    def test_stream_writes_every_leg(self):
+        legs = os.path.join(self.folder.name, "legs.bin")
+        rows = os.path.join(self.folder.name, "legs.csv")
+        streaming_adjust.LegFile.write(legs, [(45.5, 100), (134.5, 100.05), (225.5, 99.98), (315.5, 100.02)])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            traverse_batch.main(["stream", legs, "--output", rows])
+        self.assertIn("Legs: 4", output.getvalue())
+        with open(rows) as f:
+            self.assertEqual(len(f.read().splitlines()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
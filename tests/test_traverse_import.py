@@ -0,0 +1,36 @@
+"""
+Tests for traverse_import.py
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import traverse_import
+import traverse_model
+
+
+class ImportTest(unittest.TestCase):
+    
+    def test_entries_round_trip_through_the_calculator(self):
+        lines = ["bearing,distance", "45.301525,100.0125", "N44.29305W,99.98", "180.000007,12.3456789"]
+        imported = traverse_import.read_csv(lines)
+        self.assertEqual(imported.error_count, 0)
+        azimuths, distances = traverse_model.TraverseModel(traverse_import.azimuth_entries(imported)).legs()
+        for parsed, original in zip(azimuths, imported.azimuths):
+            self.assertAlmostEqual(parsed, original, delta=1e-6 / 3600)
+        self.assertEqual(distances, list(imported.distances))
+    
+    def test_minutes_and_seconds_over_59_are_rejected(self):
+        for text in ("10.7575", "10.0560", "10.6000"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    traverse_import.parse_dms(text)
+        self.assertAlmostEqual(traverse_import.parse_dms("10.595999"), 10 + 59 / 60 + 59.99 / 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
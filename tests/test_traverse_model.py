@@ -0,0 +1,33 @@
+"""
+Tests for traverse_model.py
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import traverse_model
+
+
+class ModelTest(unittest.TestCase):
+    
+    def test_non_finite_values_are_invalid(self):
+        for bearing, distance in (("N45E", "nan"), ("N45E", "inf"), ("N45E", "-Infinity"), ("nan", "100"),
+                                  ("inf", "100")):
+            with self.subTest(bearing=bearing, distance=distance):
+                model = traverse_model.TraverseModel([("N0E", "100"), (bearing, distance), ("S90W", "100")])
+                self.assertEqual(model.first_invalid(), 1)
+                with self.assertRaises(ValueError):
+                    model.legs()
+    
+    def test_valid_legs(self):
+        model = traverse_model.TraverseModel([("N0E", "100"), ("S45.3015E", "100.5"), ("270", "1e2")])
+        self.assertIsNone(model.first_invalid())
+        self.assertEqual(model.legs()[1], [100.0, 100.5, 100.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Tests for traverse_project.py
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import traverse_project
+
+
+class StaleResultTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.project = traverse_project.TraverseProject()
+        self.project.add_traverse(traverse_project.Traverse(
+            "Lot", ["1", "2", "3", "4"], ["N0E", "N90E", "S0E", "S90W"], ["100", "100", "100", "100"]))
+    
+    def stations_near(self, northing, easting):
+        return {key for _, key in self.project.spatial_index.within(northing, easting, 1.0)}
+    
+    def test_moving_the_start_station_discards_a_running_adjustment(self):
+        snapshot, (northing, easting) = self.project._snapshot("Lot")
+        result = traverse_project.compute_traverse(snapshot, northing, easting)
+        self.project.set_station_coordinates("1", 5000.0, 2000.0)
+        self.project._store(result)
+        self.assertTrue(self.project.is_dirty("Lot"))
+        self.assertFalse(self.stations_near(0.0, 0.0))
+        
+        self.project.adjust("Lot")
+        self.assertFalse(self.project.is_dirty("Lot"))
+        self.assertIn(("Lot", "1"), self.stations_near(5000.0, 2000.0))
+    
+    def test_edits_drop_indexed_coordinates(self):
+        self.project.adjust("Lot")
+        self.assertIn(("Lot", "3"), self.stations_near(100.0, 100.0))
+        self.project.update_leg("Lot", 1, distance="50")
+        self.assertFalse(self.stations_near(100.0, 100.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Tests for traverse_service.py
+Run with: python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import traverse_service
+
+
+class ServiceTest(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+        cls.service = traverse_service.TraverseService(workers=1)
+        cls.port = asyncio.run_coroutine_threadsafe(cls.service.start(port=0), cls.loop).result(60)
+    
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.service.close(), cls.loop).result(60)
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join(10)
+        cls.loop.close()
+    
+    def setUp(self):
+        self.client = traverse_service.ServiceClient(port=self.port, timeout=30)
+    
+    def tearDown(self):
+        self.client.close()
+    
+    def test_adjust(self):
+        status, result = self.client.adjust(["N 0 E", "S 60 E", "S 60 W"], [100, 100, 100])
+        self.assertEqual(status, 200)
+        self.assertEqual(result["legs"], 3)
+    
+    def test_malformed_bodies_get_400(self):
+        bodies = [
+            {"bearings": 5, "distances": [1]},
+            {"bearings": [0, 120, 240], "distances": None},
+            {"bearings": [0, [1], 240], "distances": [1, 1, 1]},
+            {"bearings": [0, 120, 240], "distances": [1, True, 1]},
+            [1, 2, 3],
+            "text",
+            {"traverses": 5},
+            {"traverses": [{"bearings": [0, 120, 240], "distances": [1, 1, 1]}, {"bearings": {}}]},
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                status, result = self.client.request("POST", "/adjust", body)
+                self.assertEqual(status, 400)
+                self.assertIn("error", result)
+        # The connection is still usable afterwards
+        self.assertEqual(self.client.request("GET", "/health")[0], 200)
+    
+    def test_unexpected_error_gets_500(self):
+        async def broken_dispatch(method, path, body):
+            raise TypeError("broken")
+        
+        self.service._dispatch = broken_dispatch
+        try:
+            status, result = self.client.request("GET", "/health")
+        finally:
+            del self.service._dispatch
+        self.assertEqual(status, 500)
+        self.assertIn("broken", result["error"])
+    
+    def test_batch_reports_failures_per_traverse(self):
+        status, result = self.client.adjust_batch([
+            {"bearings": [0, 120, 240], "distances": [1, 1, 1]},
+            {"bearings": [0, 120], "distances": [1, 1]},
+        ])
+        self.assertEqual(status, 200)
+        self.assertNotIn("error", result["results"][0])
+        self.assertIn("error", result["results"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
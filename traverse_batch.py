@@ -0,0 +1,500 @@
+"""
+Batch Tool for Traverse Calculator
+Command-line processing of many .trv files at once, backed by the project
+catalog (project_catalog.py).
+
+    python traverse_batch.py index FOLDER... [--catalog PATH] [--workers N]
+    python traverse_batch.py query [--project-name X] [--user-name X] [--address X]
+                                   [--traverse-id X] [--worse-than N] [--csv FILE]
+    python traverse_batch.py report FILE... [--summary | --sections NAME...] [--output FILE]
+    python traverse_batch.py watch FOLDER --output DIR [--summary] [--interval S] [--workers N]
+    python traverse_batch.py stakeout FILE --station ID --backsight ID --targets CSV
+                                      [--output CSV] [grid options]
+    python traverse_batch.py coordinates FILE... [--output CSV] [grid options]
+    python traverse_batch.py complete FILE... [--in-place]
+    python traverse_batch.py subdivide FILE --side K (--areas A... | --lots N)
+                                       [--through ID | --through-point N E]
+                                       [--traverse NAME] [--output CSV]
+    python traverse_batch.py stream LEGFILE [--start N E] [--output CSV]
+
+index adds folders to the catalog and brings it up to date; running it with no
+folders rescans everything already indexed, re-reading only changed files.
+query lists the catalogued traverses that match every filter, worst closure first.
+report writes the calculation report of every closed traverse in the files;
+--summary keeps only the misclosures and relative accuracy, which skips
+distributing the corrections and formatting the per-leg tables.
+watch keeps polling a drop folder and reports each new or changed .trv file
+as it arrives (see folder_watch.py).
+stakeout adjusts the traverses of a .trv file and computes the angle right,
+bearing and distance from an occupied station to every target point at once.
+coordinates writes the adjusted station coordinates of the files.
+complete solves blank bearings and distances from the closure and saves the
+completed files (as NAME_completed.trv unless --in-place). report, watch,
+stakeout and coordinates complete such legs on the fly.
+subdivide splits lots of the given areas off a closed traverse, cut parallel to
+side K or through a station or point (see parcel_subdivision.py).
+stream adjusts a closed traverse too large for memory from a binary leg file
+(see streaming_adjust.LegFile), printing the closure and writing the corrected
+legs to --output without holding them all at once.
+
+Grid options (--scale-factor, --rotation, --offset, --origin, --elevation-factors)
+convert the adjusted ground coordinates to grid coordinates in memory before
+stakeout or coordinates use them (see grid_transform.py).
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+
+import cogo
+import folder_watch
+import grid_transform
+import missing_measurements
+import parcel_subdivision
+import project_catalog
+import streaming_adjust
+import traverse_file
+import traverse_project
+import traverse_report
+import traverse_solver
+
+# Errors reported for one input file instead of stopping with a traceback
+FILE_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError)
+
+# Columns of query output
+QUERY_COLUMNS = ("path", "traverse_id", "project_name", "project_address", "legs",
+                 "perimeter", "linear_misclosure", "relative_accuracy")
+
+
+def query_rows(rows):
+    """Catalog rows as dictionaries of QUERY_COLUMNS"""
+    for row in rows:
+        values = {column: row[column] for column in QUERY_COLUMNS if column in row.keys()}
+        values["relative_accuracy"] = row["error"] or project_catalog.format_accuracy(
+            row["accuracy"], row["closed"], computed=row["computed"])
+        yield values
+
+
+def index(catalog, folders, workers=None):
+    """Add folders to the catalog (or rescan the indexed ones) and return the ScanResult"""
+    for folder in folders:
+        catalog.add_folder(folder)
+    return catalog.scan(workers=workers)
+
+
+def file_reports(path, sections=traverse_report.SECTIONS):
+    """Yield (traverse name, TraverseReport or error text) for each traverse of a .trv file"""
+    try:
+        with open(path, 'r') as f:
+            project = traverse_project.TraverseProject.from_dict(json.load(f))
+    except FILE_ERRORS as e:
+        yield None, str(e)
+        return
+    yield from traverse_report.project_reports(project, sections)
+
+
+def complete_file(path, output):
+    """
+    Solve the missing measurements of every traverse in a .trv file and save the
+    result to output, keeping the file's layout. Returns {traverse name: Completion
+    or error text} for the traverses that had blanks.
+    """
+    data = traverse_file.read_project(path)
+    project = traverse_project.TraverseProject.from_dict(data)
+    outcomes = missing_measurements.complete_project(project)
+    if any(not isinstance(outcome, str) for outcome in outcomes.values()):
+        if traverse_project.is_project_data(data):
+            data = project.to_dict()
+        else:
+            data = traverse_project.traverse_to_legacy_data(project, next(iter(project.traverses)))
+        traverse_file.write_project(output, data)
+    return outcomes
+
+
+def write_reports(paths, sections, out):
+    """Write the reports of every file, a line at a time; returns the number of failures"""
+    failures = 0
+    for path in paths:
+        for name, report in file_reports(path, sections):
+            out.write(f"\n{path}" + (f" [{name}]" if name else "") + "\n")
+            if isinstance(report, str):
+                failures += 1
+                out.write(f"Error: {report}\n")
+                continue
+            for line in report.lines():
+                out.write(line + "\n")
+    return failures
+
+
+def adjusted_project(path):
+    """(TraverseProject, {traverse name: TraverseResult}) of a .trv file with every traverse adjusted"""
+    with open(path, 'r') as f:
+        project = traverse_project.TraverseProject.from_dict(json.load(f))
+    for name, outcome in missing_measurements.complete_project(project).items():
+        if isinstance(outcome, str):
+            raise ValueError(f"Traverse '{name}': {outcome}")
+    results = project.adjust_all()
+    for name, outcome in results.items():
+        if isinstance(outcome, Exception):
+            raise ValueError(f"Traverse '{name}': {outcome}")
+    return project, results
+
+
+def station_coordinates(path):
+    """Adjusted station ID -> (northing, easting) over every traverse of a .trv file"""
+    coordinates = {}
+    for result in adjusted_project(path)[1].values():
+        for station_id, point in result.coordinates.items():
+            coordinates.setdefault(station_id, point)
+    return coordinates
+
+
+def parcel_coordinates(path, traverse_name=None):
+    """
+    Adjusted station ID -> (northing, easting) of one closed traverse of a .trv
+    file, in station order; the name may be left out when it has only one.
+    """
+    project, results = adjusted_project(path)
+    closed = [name for name, traverse in project.traverses.items() if traverse.closed]
+    if traverse_name is None:
+        if len(closed) != 1:
+            raise ValueError(f"{len(closed)} closed traverses; choose one with --traverse")
+        traverse_name = closed[0]
+    if traverse_name not in closed:
+        raise ValueError(f"No closed traverse '{traverse_name}'")
+    return results[traverse_name].coordinates
+
+
+def subdivide(coordinates, side, areas=None, lots=None, through=None):
+    """
+    Lots split off a parcel (station ID -> point, in order) next to its side
+    number side (from 1): cut parallel to it, or fanned out from through, a
+    station ID or (northing, easting) point on that side.
+    """
+    points = list(coordinates.values())
+    if through is None:
+        return parcel_subdivision.subdivide_parallel(points, side - 1, areas, lots)
+    if isinstance(through, str):
+        if through not in coordinates:
+            raise ValueError(f"Unknown station: {through}")
+        through = coordinates[through]
+    return parcel_subdivision.subdivide_through_point(points, side - 1, through, areas, lots)
+
+
+def transform_from_args(args):
+    """GridTransform from the grid options, or None when none were given"""
+    if (args.scale_factor, args.rotation, args.offset, args.elevation_factors) == (1.0, 0.0, None, None):
+        return None
+    northing_offset, easting_offset = args.offset or args.origin or (0.0, 0.0)
+    return grid_transform.GridTransform(args.scale_factor, args.rotation, northing_offset, easting_offset,
+                                        args.origin or (0.0, 0.0))
+
+
+def to_grid(coordinates, transform, elevation_factors=None):
+    """Station ID -> grid point for every station in one call; elevation_factors maps station ID -> factor"""
+    station_ids = list(coordinates)
+    factors = None
+    if elevation_factors:
+        factors = [elevation_factors.get(station_id, 1.0) for station_id in station_ids]
+    points = transform.apply([coordinates[station_id] for station_id in station_ids], factors)
+    return dict(zip(station_ids, points))
+
+
+def read_factors(path):
+    """Station ID -> elevation factor from CSV rows of station, factor; a header row is skipped"""
+    factors = {}
+    with open(path, 'r', newline='') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or not "".join(row).strip():
+                continue
+            try:
+                factors[row[0].strip()] = float(row[1])
+            except (IndexError, ValueError):
+                if line == 1:
+                    continue
+                raise ValueError(f"{path} line {line}: expected station, factor")
+    return factors
+
+
+def read_points(path):
+    """(names, points) from CSV rows of name, northing, easting; a header row is skipped"""
+    names, points = [], []
+    with open(path, 'r', newline='') as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or not "".join(row).strip():
+                continue
+            try:
+                point = (float(row[1]), float(row[2]))
+            except (IndexError, ValueError):
+                if line == 1:
+                    continue
+                raise ValueError(f"{path} line {line}: expected name, northing, easting")
+            names.append(row[0].strip())
+            points.append(point)
+    return names, points
+
+
+def stakeout_rows(coordinates, station, backsight, names, targets, precision=0):
+    """Stakeout rows (point, angle right DDD.MMSS, bearing, distance) for every target in one call"""
+    for station_id in (station, backsight):
+        if station_id not in coordinates:
+            raise ValueError(f"Unknown station: {station_id}")
+    angles, azimuths, distances = cogo.stakeout(coordinates[station], coordinates[backsight], targets)
+    bearings = traverse_solver.format_bearings(azimuths, precision)
+    for name, angle, bearing, distance in zip(names, angles, bearings, distances):
+        yield name, traverse_solver.decimal_to_dms(angle), bearing, f"{distance:.3f}"
+
+
+def print_watch_rows(rows):
+    """One console line per traverse reported by the watcher"""
+    for row in rows:
+        status = row.get("error") or f"{row['relative_accuracy']} ({row['legs']} legs)"
+        name = f" [{row['traverse_id']}]" if row.get("traverse_id") else ""
+        print(f"{row['path']}{name}: {status}", flush=True)
+
+
+def write_table(rows, out):
+    """Fixed-width listing of query rows"""
+    out.write(f"{'Traverse':<20} {'Project':<25} {'Address':<30} {'Legs':>6} {'Accuracy':>12}  File\n")
+    for row in rows:
+        out.write(f"{str(row['traverse_id'])[:20]:<20} {str(row['project_name'])[:25]:<25} "
+                  f"{str(row['project_address'])[:30]:<30} {row['legs'] or 0:>6} "
+                  f"{row['relative_accuracy']:>12}  {row['path']}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traverse Calculator batch tool")
+    parser.add_argument("--catalog", default=project_catalog.DEFAULT_CATALOG,
+                        help="catalog database (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index_parser = commands.add_parser("index", help="index folders of .trv files")
+    index_parser.add_argument("folders", nargs="*")
+    index_parser.add_argument("--workers", type=int, default=None)
+    query_parser = commands.add_parser("query", help="list catalogued traverses")
+    query_parser.add_argument("--project-name")
+    query_parser.add_argument("--user-name")
+    query_parser.add_argument("--address", dest="project_address")
+    query_parser.add_argument("--traverse-id")
+    query_parser.add_argument("--worse-than", type=float, metavar="N",
+                              help="relative accuracy worse than 1:N")
+    query_parser.add_argument("--limit", type=int)
+    query_parser.add_argument("--csv", metavar="FILE", help="write the rows to a CSV file")
+    report_parser = commands.add_parser("report", help="calculation reports of .trv files")
+    report_parser.add_argument("files", nargs="+")
+    report_sections = report_parser.add_mutually_exclusive_group()
+    report_sections.add_argument("--summary", action="store_true", help="closure summary only")
+    report_sections.add_argument("--sections", nargs="+", choices=traverse_report.SECTIONS, metavar="NAME",
+                                 help="sections to include: %(choices)s")
+    report_parser.add_argument("--output", metavar="FILE", help="write here instead of the console")
+    complete_parser = commands.add_parser("complete", help="solve blank bearings and distances")
+    complete_parser.add_argument("files", nargs="+")
+    complete_parser.add_argument("--in-place", action="store_true", help="overwrite the files")
+    subdivide_parser = commands.add_parser("subdivide", help="split lots off a closed traverse by area")
+    subdivide_parser.add_argument("file")
+    subdivide_parser.add_argument("--traverse", metavar="NAME", help="closed traverse to subdivide")
+    subdivide_parser.add_argument("--side", type=int, required=True, metavar="K",
+                                  help="side the lots start from (side K runs from station K to K+1)")
+    lot_sizes = subdivide_parser.add_mutually_exclusive_group(required=True)
+    lot_sizes.add_argument("--areas", type=float, nargs="+", metavar="A", help="lot areas; the rest is the last lot")
+    lot_sizes.add_argument("--lots", type=int, metavar="N", help="N lots of equal area")
+    cut_through = subdivide_parser.add_mutually_exclusive_group()
+    cut_through.add_argument("--through", metavar="ID", help="fan the cuts out from this station on side K")
+    cut_through.add_argument("--through-point", type=float, nargs=2, metavar=("N", "E"),
+                             help="fan the cuts out from this point on side K")
+    subdivide_parser.add_argument("--output", metavar="CSV", help="write lot corners here")
+    stream_parser = commands.add_parser("stream", help="adjust a closed traverse from a binary leg file")
+    stream_parser.add_argument("file", help="packed (azimuth, distance) doubles, see streaming_adjust.LegFile")
+    stream_parser.add_argument("--start", type=float, nargs=2, default=(0.0, 0.0), metavar=("N", "E"),
+                               help="coordinates of the first station (default: 0 0)")
+    stream_parser.add_argument("--output", metavar="CSV", help="write the corrected legs here")
+    watch_parser = commands.add_parser("watch", help="report .trv files as they arrive in a folder")
+    watch_parser.add_argument("folder")
+    watch_parser.add_argument("--output", required=True, metavar="DIR", help="folder for reports and summary.csv")
+    watch_parser.add_argument("--summary", action="store_true", help="closure summary reports only")
+    watch_parser.add_argument("--interval", type=float, default=folder_watch.POLL_INTERVAL,
+                              help="seconds between polls (default: %(default)s)")
+    watch_parser.add_argument("--workers", type=int, default=None)
+    watch_parser.add_argument("--once", action="store_true", help="report what is there now and exit")
+    grid_options = argparse.ArgumentParser(add_help=False)
+    grid = grid_options.add_argument_group("grid options")
+    grid.add_argument("--scale-factor", type=float, default=1.0, metavar="K",
+                      help="combined grid scale factor")
+    grid.add_argument("--rotation", type=float, default=0.0, metavar="DEG",
+                      help="degrees clockwise added to ground azimuths")
+    grid.add_argument("--offset", type=float, nargs=2, metavar=("N", "E"),
+                      help="grid coordinates of the origin (default: the origin itself)")
+    grid.add_argument("--origin", type=float, nargs=2, metavar=("N", "E"),
+                      help="ground point scaled and rotated about (default: 0 0)")
+    grid.add_argument("--elevation-factors", metavar="CSV", help="station, elevation factor rows")
+    stakeout_parser = commands.add_parser("stakeout", parents=[grid_options],
+                                          help="angles and distances to set out target points")
+    stakeout_parser.add_argument("file", help=".trv file with the control traverse")
+    stakeout_parser.add_argument("--station", required=True, help="occupied station ID")
+    stakeout_parser.add_argument("--backsight", required=True, help="backsight station ID")
+    stakeout_parser.add_argument("--targets", required=True, metavar="CSV", help="name, northing, easting rows")
+    stakeout_parser.add_argument("--output", metavar="CSV", help="write here instead of the console")
+    coordinates_parser = commands.add_parser("coordinates", parents=[grid_options],
+                                             help="adjusted station coordinates of .trv files")
+    coordinates_parser.add_argument("files", nargs="+")
+    coordinates_parser.add_argument("--output", metavar="CSV", help="write here instead of the console")
+    args = parser.parse_args(argv)
+    
+    if args.command == "report":
+        sections = args.sections or (traverse_report.SUMMARY_SECTIONS if args.summary else traverse_report.SECTIONS)
+        with (open(args.output, 'w') if args.output else contextlib.nullcontext(sys.stdout)) as out:
+            failures = write_reports(args.files, sections, out)
+        if failures:
+            print(f"{failures} reports failed", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    if args.command == "stream":
+        try:
+            with (open(args.output, 'w', newline='') if args.output else contextlib.nullcontext()) as out:
+                sink = streaming_adjust.csv_sink(out) if out is not None else None
+                result = streaming_adjust.stream_adjust(streaming_adjust.LegFile(args.file), sink, *args.start)
+        except FILE_ERRORS as e:
+            print(f"{args.file}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Legs: {result.n}")
+        print(f"Angular misclosure: {result.angular_misclosure:.6f}°")
+        print(f"Linear misclosure: {result.linear_misclosure:.6f}")
+        print(f"Relative accuracy: {result.relative_accuracy}")
+        print(f"Perimeter: {result.total_perimeter:.4f}")
+        print(f"Area: {result.area:.4f}")
+        return
+    
+    if args.command == "complete":
+        failures = 0
+        for path in args.files:
+            root, extension = os.path.splitext(path)
+            output = path if args.in_place else f"{root}_completed{extension}"
+            try:
+                outcomes = complete_file(path, output)
+            except FILE_ERRORS as e:
+                outcomes = {None: str(e)}
+            if not outcomes:
+                print(f"{path}: complete")
+            for name, outcome in outcomes.items():
+                label = f"{path} [{name}]" if name else path
+                if isinstance(outcome, str):
+                    failures += 1
+                    print(f"{label}: {outcome}", file=sys.stderr)
+                else:
+                    print(f"{label}: {missing_measurements.describe_solution(outcome.filled)} -> {output}")
+                    for warning in outcome.warnings:
+                        print(f"    {warning}")
+                    for alternative in outcome.alternatives:
+                        print(f"    Other solution: {missing_measurements.describe_solution(alternative)}")
+        if failures:
+            print(f"{failures} traverses could not be completed", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    if args.command == "subdivide":
+        try:
+            coordinates = parcel_coordinates(args.file, args.traverse)
+            lots = subdivide(coordinates, args.side, args.areas, args.lots, args.through or args.through_point)
+        except FILE_ERRORS as e:
+            print(f"{args.file}: {e}", file=sys.stderr)
+            sys.exit(1)
+        for lot in lots:
+            cut = " to ".join(f"({n:.4f}, {e:.4f})" for n, e in lot.cut) if lot.cut else "remainder"
+            print(f"Lot {lot.number}: {lot.area:.4f}  {cut}")
+        if args.output:
+            with open(args.output, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(("lot", "area", "corner", "northing", "easting"))
+                for lot in lots:
+                    writer.writerows((lot.number, f"{lot.area:.4f}", corner, f"{n:.4f}", f"{e:.4f}")
+                                     for corner, (n, e) in enumerate(lot.vertices, 1))
+        return
+    
+    if args.command == "watch":
+        watcher = folder_watch.FolderWatcher(
+            args.folder, args.output, workers=args.workers,
+            sections=traverse_report.SUMMARY_SECTIONS if args.summary else traverse_report.SECTIONS)
+        print(f"Watching {watcher.folder} (Ctrl+C to stop)")
+        try:
+            watcher.run(args.interval, on_rows=print_watch_rows, once=args.once)
+        except KeyboardInterrupt:
+            pass
+        return
+    
+    if args.command == "stakeout":
+        # Each input in turn, so an error names the file it came from
+        path = args.file
+        try:
+            transform = transform_from_args(args)
+            coordinates = station_coordinates(path)
+            if transform is not None:
+                path = args.elevation_factors
+                factors = read_factors(path) if path else None
+                coordinates = to_grid(coordinates, transform, factors)
+            path = args.targets
+            names, targets = read_points(path)
+            path = args.file
+            rows = list(stakeout_rows(coordinates, args.station, args.backsight, names, targets))
+        except FILE_ERRORS as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        with (open(args.output, 'w', newline='') if args.output else contextlib.nullcontext(sys.stdout)) as out:
+            writer = csv.writer(out)
+            writer.writerow(("point", "angle_right", "bearing", "distance"))
+            writer.writerows(rows)
+        return
+    
+    if args.command == "coordinates":
+        try:
+            transform = transform_from_args(args)
+            factors = read_factors(args.elevation_factors) if args.elevation_factors else None
+        except FILE_ERRORS as e:
+            print(f"{args.elevation_factors}: {e}", file=sys.stderr)
+            sys.exit(1)
+        failures = 0
+        with (open(args.output, 'w', newline='') if args.output else contextlib.nullcontext(sys.stdout)) as out:
+            writer = csv.writer(out)
+            writer.writerow(("file", "station", "northing", "easting"))
+            for path in args.files:
+                try:
+                    coordinates = station_coordinates(path)
+                    if transform is not None:
+                        coordinates = to_grid(coordinates, transform, factors)
+                except FILE_ERRORS as e:
+                    failures += 1
+                    print(f"{path}: {e}", file=sys.stderr)
+                    continue
+                writer.writerows((path, station_id, f"{n:.4f}", f"{e:.4f}")
+                                 for station_id, (n, e) in coordinates.items())
+        if failures:
+            print(f"{failures} files failed", file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    with project_catalog.ProjectCatalog(args.catalog) as catalog:
+        if args.command == "index":
+            result = index(catalog, args.folders, args.workers)
+            print(f"{len(catalog)} files in catalog ({result})")
+            for path, error in catalog.unreadable_files():
+                print(f"Unreadable: {path}: {error}", file=sys.stderr)
+            return
+        
+        rows = list(query_rows(catalog.query(
+            worse_than=args.worse_than, limit=args.limit, project_name=args.project_name,
+            user_name=args.user_name, project_address=args.project_address,
+            traverse_id=args.traverse_id)))
+        if args.csv:
+            with open(args.csv, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=QUERY_COLUMNS)
+                writer.writeheader()
+                writer.writerows(rows)
+            print(f"{len(rows)} traverses written to {args.csv}")
+        else:
+            write_table(rows, sys.stdout)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,191 @@
+"""
+Coordinate Export for Traverse Calculator
+Writes adjusted station coordinates and corrected bearings/distances as
+LandXML, DXF (R12 ASCII) or GeoJSON. Writers walk the solver's result lists
+leg by leg and flush in small batches, so only a few lines of output are
+held in memory regardless of the number of legs.
+"""
+
+import json
+import os
+from xml.sax.saxutils import quoteattr
+
+import traverse_solver
+
+# Output lines buffered before each write
+WRITE_BATCH = 1000
+
+# File extension -> format name used by export_traverse()
+EXPORT_EXTENSIONS = {
+    ".xml": "landxml",
+    ".landxml": "landxml",
+    ".dxf": "dxf",
+    ".geojson": "geojson",
+    ".json": "geojson",
+}
+
+# LandXML unit element and attributes per calculator unit setting
+LANDXML_UNITS = {
+    "metric": ("Metric", "meter", "squareMeter", "cubicMeter"),
+    "english": ("Imperial", "USSurveyFoot", "squareFoot", "cubicYard"),
+}
+
+# DXF layer names
+STATION_LAYER = "STATIONS"
+LEG_LAYER = "TRAVERSE"
+LABEL_LAYER = "LABELS"
+
+
+class _BatchWriter:
+    """Collects output lines and writes them WRITE_BATCH at a time"""
+    
+    def __init__(self, f):
+        self.f = f
+        self.lines = []
+    
+    def add(self, line):
+        self.lines.append(line)
+        if len(self.lines) >= WRITE_BATCH:
+            self.flush()
+    
+    def flush(self):
+        self.f.writelines(self.lines)
+        self.lines.clear()
+
+
+def _station_names(adjustment, station_ids):
+    if station_ids is None:
+        return (str(i + 1) for i in range(adjustment.n))
+    return iter(station_ids)
+
+
+def iter_legs(adjustment, start_northing=0.0, start_easting=0.0, station_ids=None):
+    """
+    Yield (from_id, to_id, start, end, corrected_azimuth, corrected_distance) per leg,
+    with start/end as (northing, easting). Only the current and first station are held.
+    """
+    names = _station_names(adjustment, station_ids)
+    points = adjustment.iter_coordinates(start_northing, start_easting)
+    first_name, first_point = next(names), next(points)
+    from_name, from_point = first_name, first_point
+    for i in range(adjustment.n):
+        if i + 1 < adjustment.n:
+            to_name, to_point = next(names), next(points)
+        else:
+            # The last leg closes back on the first station
+            to_name, to_point = first_name, first_point
+        yield (from_name, to_name, from_point, to_point,
+               adjustment.corrected_azimuths[i], adjustment.corrected_distances[i])
+        from_name, from_point = to_name, to_point
+
+
+def streamed_area(adjustment):
+    """Shoelace area of the adjusted polygon without materialising the coordinate list"""
+    total = 0.0
+    first = previous = None
+    for point in adjustment.iter_coordinates():
+        if previous is None:
+            first = point
+        else:
+            total += previous[1] * point[0] - point[1] * previous[0]
+        previous = point
+    if previous is not None:
+        total += previous[1] * first[0] - first[1] * previous[0]
+    return abs(total) / 2
+
+
+# LandXML
+def write_landxml(f, adjustment, name="Traverse", units="metric", start_northing=0.0,
+                  start_easting=0.0, station_ids=None):
+    """Write CgPoints for the stations and a Parcel whose CoordGeom holds one Line per leg"""
+    unit_tag, linear, area, volume = LANDXML_UNITS.get(units, LANDXML_UNITS["metric"])
+    out = _BatchWriter(f)
+    out.add('<?xml version="1.0" encoding="UTF-8"?>\n')
+    out.add('<LandXML xmlns="http://www.landxml.org/schema/LandXML-1.2" version="1.2">\n')
+    out.add(f'  <Units><{unit_tag} linearUnit="{linear}" areaUnit="{area}" volumeUnit="{volume}" '
+            f'angularUnit="decimal degrees" directionUnit="decimal degrees"/></Units>\n')
+    
+    out.add('  <CgPoints>\n')
+    names = _station_names(adjustment, station_ids)
+    for station, (northing, easting) in zip(names, adjustment.iter_coordinates(start_northing, start_easting)):
+        out.add(f'    <CgPoint name={quoteattr(station)}>{northing:.4f} {easting:.4f}</CgPoint>\n')
+    out.add('  </CgPoints>\n')
+    
+    out.add(f'  <Parcels><Parcel name={quoteattr(name)} area="{streamed_area(adjustment):.4f}">\n')
+    out.add('    <CoordGeom>\n')
+    for from_id, to_id, _, _, azimuth, distance in iter_legs(adjustment, start_northing, start_easting,
+                                                             station_ids):
+        out.add(f'      <Line dir="{azimuth:.8f}" length="{distance:.4f}">'
+                f'<Start pntRef={quoteattr(from_id)}/><End pntRef={quoteattr(to_id)}/></Line>\n')
+    out.add('    </CoordGeom>\n')
+    out.add('  </Parcel></Parcels>\n')
+    out.add('</LandXML>\n')
+    out.flush()
+
+
+# DXF
+def write_dxf(f, adjustment, start_northing=0.0, start_easting=0.0, station_ids=None, text_height=None):
+    """Write an R12 ASCII DXF with a POINT and label per station and a LINE per leg (x = easting)"""
+    if text_height is None:
+        mean_leg = adjustment.total_perimeter / adjustment.n if adjustment.n else 1.0
+        text_height = max(mean_leg * 0.02, 0.01)
+    out = _BatchWriter(f)
+    out.add("0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n")
+    out.add("0\nSECTION\n2\nENTITIES\n")
+    for from_id, _, start, end, _, _ in iter_legs(adjustment, start_northing, start_easting, station_ids):
+        (n1, e1), (n2, e2) = start, end
+        out.add(f"0\nPOINT\n8\n{STATION_LAYER}\n10\n{e1:.4f}\n20\n{n1:.4f}\n30\n0.0\n")
+        out.add(f"0\nTEXT\n8\n{LABEL_LAYER}\n10\n{e1 + text_height:.4f}\n20\n{n1 + text_height:.4f}\n30\n0.0\n"
+                f"40\n{text_height:.4f}\n1\n{from_id}\n")
+        out.add(f"0\nLINE\n8\n{LEG_LAYER}\n10\n{e1:.4f}\n20\n{n1:.4f}\n30\n0.0\n"
+                f"11\n{e2:.4f}\n21\n{n2:.4f}\n31\n0.0\n")
+    out.add("0\nENDSEC\n0\nEOF\n")
+    out.flush()
+
+
+# GeoJSON
+def write_geojson(f, adjustment, name="Traverse", start_northing=0.0, start_easting=0.0, station_ids=None):
+    """
+    Write a FeatureCollection with a Point per station and a LineString per leg.
+    Coordinates are [easting, northing] in the project's grid, not WGS84.
+    """
+    out = _BatchWriter(f)
+    out.add('{"type": "FeatureCollection", "name": %s, "features": [\n' % json.dumps(name))
+    separator = ""
+    for i, (from_id, to_id, start, end, azimuth, distance) in enumerate(
+            iter_legs(adjustment, start_northing, start_easting, station_ids)):
+        (n1, e1), (n2, e2) = start, end
+        out.add(f'{separator}{{"type": "Feature", "geometry": {{"type": "Point", '
+                f'"coordinates": [{e1:.4f}, {n1:.4f}]}}, '
+                f'"properties": {{"station": {json.dumps(from_id)}, '
+                f'"northing": {n1:.4f}, "easting": {e1:.4f}}}}}')
+        separator = ",\n"
+        out.add(f'{separator}{{"type": "Feature", "geometry": {{"type": "LineString", '
+                f'"coordinates": [[{e1:.4f}, {n1:.4f}], [{e2:.4f}, {n2:.4f}]]}}, '
+                f'"properties": {{"leg": {i + 1}, "from": {json.dumps(from_id)}, "to": {json.dumps(to_id)}, '
+                f'"bearing": {json.dumps(traverse_solver.azimuth_to_bearing(azimuth))}, '
+                f'"azimuth": {azimuth:.8f}, "distance": {distance:.4f}}}}}')
+    out.add('\n]}\n')
+    out.flush()
+
+
+def detect_format(filename):
+    """Format name for a file from its extension, or None"""
+    return EXPORT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def export_traverse(filename, adjustment, file_format=None, name="Traverse", units="metric",
+                    start_northing=0.0, start_easting=0.0, station_ids=None):
+    """Write an adjusted traverse to a file, choosing the writer from the extension"""
+    file_format = file_format or detect_format(filename)
+    if file_format not in ("landxml", "dxf", "geojson"):
+        raise ValueError(f"Unsupported export type: {os.path.basename(filename)}")
+    if adjustment.n == 0:
+        raise ValueError("Nothing to export")
+    with open(filename, 'w', encoding='utf-8') as f:
+        if file_format == "landxml":
+            write_landxml(f, adjustment, name, units, start_northing, start_easting, station_ids)
+        elif file_format == "dxf":
+            write_dxf(f, adjustment, start_northing, start_easting, station_ids)
+        else:
+            write_geojson(f, adjustment, name, start_northing, start_easting, station_ids)
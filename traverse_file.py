@@ -0,0 +1,141 @@
+"""
+Traverse File Layout for Traverse Calculator
+Saved .trv files start with a one-line header: the project information,
+settings, closure statistics and a small outline of every traverse. The header
+can be read without parsing the leg data, so a list of hundreds of projects
+opens instantly however long their traverses are:
+
+    {"header": {"format": 1, "project_info": {...}, "settings": {...}, "traverses": [...]},
+      "project_info": {...},
+      ...the usual project or legacy layout...
+    }
+
+The whole file is still one JSON object, so older versions open it and ignore
+the header. The header is a cache written on every save; the legs below it are
+what gets loaded and calculated. Files without a header (saved by older
+versions or edited by hand) are summarized from their legs instead.
+"""
+
+import json
+
+import missing_measurements
+import traverse_project
+import traverse_solver
+
+HEADER_KEY = "header"
+# Headers of an older format are rebuilt from the legs when read
+HEADER_FORMAT = 2
+
+# The header line is never read past this many characters
+MAX_HEADER_CHARS = 1 << 20
+
+# Outline preview: at most this many stations per traverse, rounded to OUTLINE_DECIMALS
+OUTLINE_POINTS = 48
+OUTLINE_DECIMALS = 3
+
+# Closure statistics kept for each traverse
+SUMMARY_KEYS = ("traverse_id", "closed", "legs", "perimeter", "angular_misclosure",
+                "linear_misclosure", "accuracy", "area", "computed", "error")
+
+
+def _outline(points):
+    step = max(1, -(-len(points) // OUTLINE_POINTS))
+    return [[round(n, OUTLINE_DECIMALS), round(e, OUTLINE_DECIMALS)] for n, e in points[::step]]
+
+
+def traverse_summary(traverse):
+    """
+    Closure statistics and outline of one traverse_project.Traverse, from a single
+    adjustment. accuracy is the N of 1:N, None for a perfect closure; closure
+    figures are only given for closed traverses. Blank measurements of a closed
+    traverse are solved from the closure first, as the report does; computed is
+    how many there were.
+    """
+    summary = dict.fromkeys(SUMMARY_KEYS)
+    summary.update(traverse_id=traverse.name, closed=int(traverse.closed), legs=traverse.num_legs,
+                   computed=0, outline=[])
+    # Computed values that absorb the whole misclosure leave the closure with nothing to check
+    closure_used = False
+    try:
+        bearing_text, distance_text = traverse.bearings, traverse.distances
+        if traverse.closed and missing_measurements.has_missing(bearing_text, distance_text):
+            completion = missing_measurements.complete_legs(bearing_text, distance_text)
+            bearing_text, distance_text = zip(*completion.rows(bearing_text, distance_text))
+            summary["computed"] = len(completion)
+            closure_used = not completion.residual
+        bearings, distances = traverse_solver.parse_legs(bearing_text, distance_text)
+        summary["perimeter"] = sum(distances)
+        if traverse.closed:
+            adj = traverse_solver.adjust_traverse(bearings, distances)
+            points = adj.coordinates()
+            summary["angular_misclosure"] = adj.angular_misclosure
+            summary["linear_misclosure"] = adj.linear_misclosure
+            # Left None for a perfect closure so it never counts as "worse than"
+            if adj.linear_misclosure > 0 and not closure_used:
+                summary["accuracy"] = adj.total_perimeter / adj.linear_misclosure
+            summary["area"] = traverse_solver.polygon_area(points)
+        else:
+            points = traverse_solver.open_traverse_coordinates(bearings, distances)
+        summary["outline"] = _outline(points)
+    except (ValueError, ZeroDivisionError) as e:
+        summary["error"] = str(e)
+    return summary
+
+
+def project_header(data):
+    """Header for a loaded .trv dictionary (project or legacy layout)"""
+    project = traverse_project.TraverseProject.from_dict(data)
+    return {
+        "format": HEADER_FORMAT,
+        "project_info": data.get("project_info", {}),
+        "settings": data.get("settings", {}),
+        "traverses": [traverse_summary(traverse) for traverse in project.traverses.values()],
+    }
+
+
+def write_project(filename, data):
+    """Save a .trv dictionary with its header on the first line"""
+    data = {key: value for key, value in data.items() if key != HEADER_KEY}
+    if not data:
+        raise ValueError("Nothing to save")
+    header = json.dumps(project_header(data), separators=(",", ":"))
+    body = json.dumps(data, indent=2)
+    with open(filename, 'w') as f:
+        f.write(f'{{"{HEADER_KEY}": {header},\n')
+        # The body's own opening brace is replaced by the header line
+        f.write(body[1:].lstrip("\n"))
+
+
+def read_project(filename):
+    """Load a .trv file as a dictionary, without its header"""
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("Not a traverse file")
+    data.pop(HEADER_KEY, None)
+    return data
+
+
+def read_header(filename):
+    """The header of a .trv file from its first line only, or None if it has none"""
+    prefix = f'{{"{HEADER_KEY}": '
+    with open(filename, 'r') as f:
+        line = f.readline(MAX_HEADER_CHARS)
+    line = line.rstrip()
+    if not line.startswith(prefix) or not line.endswith(","):
+        return None
+    try:
+        header = json.loads(line[:-1] + "}")[HEADER_KEY]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(header, dict) or header.get("format") != HEADER_FORMAT:
+        return None
+    return header
+
+
+def file_header(filename):
+    """The header of a .trv file, built from its legs when it was saved without one"""
+    header = read_header(filename)
+    if header is None:
+        header = project_header(read_project(filename))
+    return header
@@ -0,0 +1,310 @@
+"""
+Field Data Import for Traverse Calculator
+Streaming readers for CSV, LandXML and raw data-collector (RW5-style) files.
+Each reader walks its input once and appends legs to compact azimuth/distance
+arrays, so memory depends on the number of legs rather than the file size.
+Bad lines are skipped and reported with their line number.
+"""
+
+import csv
+import math
+import os
+import xml.etree.ElementTree as ET
+from array import array
+
+import traverse_solver
+
+# Only the first errors are kept for display; the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+# Decimals of a second kept when imported azimuths are written as DDD.MMSS text
+SECOND_PLACES = 6
+
+# Header names recognised in CSV files (lower case)
+BEARING_COLUMNS = ("bearing", "azimuth", "az", "direction", "dir")
+DISTANCE_COLUMNS = ("distance", "dist", "length", "hd", "horizontal distance")
+
+# File extension -> format name used by import_traverse()
+FORMAT_EXTENSIONS = {
+    ".csv": "csv",
+    ".txt": "csv",
+    ".xml": "landxml",
+    ".landxml": "landxml",
+    ".rw5": "raw",
+    ".raw": "raw",
+}
+
+
+class ImportIssue:
+    """A line that could not be imported"""
+    
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+    
+    def __str__(self):
+        return f"Line {self.line}: {self.message}" if self.line else self.message
+
+
+class ImportedTraverse:
+    """Legs read from a field file: azimuths (decimal degrees) and horizontal distances"""
+    
+    def __init__(self, source_format):
+        self.source_format = source_format
+        self.azimuths = array('d')
+        self.distances = array('d')
+        self.errors = []
+        self.error_count = 0
+    
+    def __len__(self):
+        return len(self.azimuths)
+    
+    def add_leg(self, azimuth, distance):
+        self.azimuths.append(azimuth % 360)
+        self.distances.append(distance)
+    
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportIssue(line, message))
+    
+    def error_summary(self, limit=10):
+        """Text listing the first few errors, for message boxes"""
+        lines = [str(issue) for issue in self.errors[:limit]]
+        if self.error_count > len(lines):
+            lines.append(f"... and {self.error_count - len(lines)} more")
+        return "\n".join(lines)
+
+
+def parse_dms(value):
+    """
+    DDD.MMSS[s...] to decimal degrees, keeping fractional seconds
+    (traverse_solver.dms_to_decimal stops at whole seconds).
+    """
+    text = value.strip()
+    negative = text.startswith('-')
+    if negative:
+        text = text[1:]
+    degrees, _, fraction = text.partition('.')
+    if not degrees.isdigit() or (fraction and not fraction.isdigit()):
+        raise ValueError(f"Invalid angle: {value}")
+    fraction = fraction.ljust(4, '0')
+    minutes = int(fraction[:2])
+    seconds = float(fraction[2:4] + '.' + fraction[4:]) if len(fraction) > 4 else float(fraction[2:4])
+    if minutes >= 60 or seconds >= 60:
+        raise ValueError(f"Invalid angle (minutes and seconds must be under 60): {value}")
+    decimal = int(degrees) + minutes / 60 + seconds / 3600
+    return -decimal if negative else decimal
+
+
+def parse_direction(value):
+    """Azimuth (DDD.MMSS) or quadrant bearing (N45.3015E) text to an azimuth in decimal degrees"""
+    text = value.strip().upper().replace(' ', '')
+    if not text:
+        raise ValueError("Missing bearing")
+    try:
+        if text[0] in "NS" and text[-1] in "EW":
+            angle = parse_dms(text[1:-1])
+        else:
+            return parse_dms(text)
+    except ValueError:
+        raise ValueError(f"Invalid bearing: {value.strip()}")
+    if not 0 <= angle <= 90:
+        raise ValueError(f"Quadrant bearing out of range: {value.strip()}")
+    if text[0] == 'N':
+        return angle if text[-1] == 'E' else (360 - angle) % 360
+    return 180 - angle if text[-1] == 'E' else 180 + angle
+
+
+def parse_distance(value):
+    distance = float(value)
+    if not math.isfinite(distance) or distance < 0:
+        raise ValueError(f"Invalid distance: {value}")
+    return distance
+
+
+# CSV
+def read_csv(lines, result=None):
+    """
+    Read bearing/distance rows from an iterable of text lines.
+    A header row naming the columns is optional; without one the last two
+    columns are taken as bearing and distance.
+    """
+    result = result or ImportedTraverse("csv")
+    bearing_col = distance_col = None
+    for line_no, row in enumerate(csv.reader(lines), 1):
+        if not row or not any(cell.strip() for cell in row) or row[0].lstrip().startswith('#'):
+            continue
+        if bearing_col is None:
+            names = [cell.strip().lower() for cell in row]
+            header_bearing = next((i for i, name in enumerate(names) if name in BEARING_COLUMNS), None)
+            header_distance = next((i for i, name in enumerate(names) if name in DISTANCE_COLUMNS), None)
+            if header_bearing is not None and header_distance is not None:
+                bearing_col, distance_col = header_bearing, header_distance
+                continue
+            if len(row) < 2:
+                result.add_error(line_no, "Expected bearing and distance columns")
+                continue
+            bearing_col, distance_col = len(row) - 2, len(row) - 1
+        try:
+            result.add_leg(parse_direction(row[bearing_col]), parse_distance(row[distance_col]))
+        except IndexError:
+            result.add_error(line_no, f"Expected at least {max(bearing_col, distance_col) + 1} columns")
+        except ValueError as e:
+            result.add_error(line_no, str(e))
+    return result
+
+
+# LandXML
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _angle_to_degrees(value, unit):
+    angle = float(value)
+    if unit == "radians":
+        return math.degrees(angle)
+    if unit == "grads":
+        return angle * 0.9
+    if unit == "decimal dd.mm.ss":
+        return parse_dms(value)
+    return angle
+
+
+def read_landxml(source, result=None):
+    """
+    Read CoordGeom <Line> elements from a LandXML file (path or binary file object).
+    Each line uses its dir/length attributes, or its Start and End points when those
+    are missing. Elements are cleared as soon as they are read.
+    """
+    result = result or ImportedTraverse("landxml")
+    angular_unit = "decimal degrees"
+    parser = ET.iterparse(source, events=("start", "end"))
+    try:
+        for event, elem in parser:
+            name = _local_name(elem.tag)
+            if event == "start":
+                if name in ("Metric", "Imperial"):
+                    angular_unit = elem.get("directionUnit") or elem.get("angularUnit") or angular_unit
+                continue
+            if name != "Line":
+                if name in ("CoordGeom", "Alignment", "Parcel"):
+                    elem.clear()
+                continue
+            
+            # iterparse does not report line numbers, so number legs instead
+            leg_no = len(result) + result.error_count + 1
+            try:
+                direction, length = elem.get("dir"), elem.get("length")
+                if direction is not None and length is not None:
+                    result.add_leg(_angle_to_degrees(direction, angular_unit), parse_distance(length))
+                else:
+                    points = {}
+                    for child in elem:
+                        if _local_name(child.tag) in ("Start", "End") and child.text:
+                            points[_local_name(child.tag)] = [float(v) for v in child.text.split()[:2]]
+                    if len(points) != 2:
+                        raise ValueError("Line needs dir/length or Start and End points")
+                    # LandXML points are "northing easting"
+                    d_north = points["End"][0] - points["Start"][0]
+                    d_east = points["End"][1] - points["Start"][1]
+                    result.add_leg(math.degrees(math.atan2(d_east, d_north)), math.hypot(d_north, d_east))
+            except ValueError as e:
+                result.add_error(None, f"<Line> element {leg_no}: {e}")
+            elem.clear()
+    except ET.ParseError as e:
+        result.add_error(e.position[0], f"XML error: {e}")
+    return result
+
+
+# Raw data-collector logs
+def _record_fields(line):
+    """Split an RW5-style record ("TR,OP1,FP2,AZ45.3015,HD100.000") into its type and 2-letter fields"""
+    parts = [part.strip() for part in line.split(',')]
+    fields = {}
+    for part in parts[1:]:
+        if len(part) >= 2:
+            fields[part[:2].upper()] = part[2:]
+    return parts[0].upper(), fields
+
+
+def read_raw(lines, result=None):
+    """
+    Read traverse legs from an RW5-style raw data-collector log.
+    TR records are legs; their direction is AZ (azimuth), BR (quadrant bearing),
+    AR/AL (angle right/left from the backsight) and their distance HD, or SD with ZE.
+    BK records set the backsight azimuth (BS) for the first turned angle. After each
+    leg the backsight becomes the reverse of that leg. Other records are ignored.
+    """
+    result = result or ImportedTraverse("raw")
+    backsight = None
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("--"):
+            continue
+        record, fields = _record_fields(line)
+        try:
+            if record == "BK":
+                if "BS" in fields:
+                    backsight = parse_dms(fields["BS"])
+                continue
+            if record != "TR":
+                continue
+            
+            if "AZ" in fields:
+                azimuth = parse_dms(fields["AZ"])
+            elif "BR" in fields:
+                azimuth = parse_direction(fields["BR"])
+            elif "AR" in fields or "AL" in fields:
+                if backsight is None:
+                    raise ValueError("Turned angle before any backsight (BK record with BS)")
+                if "AR" in fields:
+                    azimuth = backsight + parse_dms(fields["AR"])
+                else:
+                    azimuth = backsight - parse_dms(fields["AL"])
+            else:
+                raise ValueError("TR record has no AZ, BR, AR or AL field")
+            
+            if "HD" in fields:
+                distance = parse_distance(fields["HD"])
+            elif "SD" in fields and "ZE" in fields:
+                distance = parse_distance(fields["SD"]) * abs(math.sin(math.radians(parse_dms(fields["ZE"]))))
+            else:
+                raise ValueError("TR record has no HD, or SD with ZE")
+        except ValueError as e:
+            result.add_error(line_no, str(e))
+            continue
+        
+        result.add_leg(azimuth, distance)
+        backsight = (azimuth + 180) % 360
+    return result
+
+
+def detect_format(filename):
+    """Format name for a file from its extension, or None"""
+    return FORMAT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+
+def import_traverse(filename, file_format=None):
+    """Read a field file into an ImportedTraverse, choosing the reader from the extension"""
+    file_format = file_format or detect_format(filename)
+    if file_format == "landxml":
+        with open(filename, 'rb') as f:
+            return read_landxml(f)
+    if file_format not in ("csv", "raw"):
+        raise ValueError(f"Unsupported file type: {os.path.basename(filename)}")
+    reader = read_csv if file_format == "csv" else read_raw
+    with open(filename, 'r', newline='', encoding='utf-8-sig', errors='replace') as f:
+        return reader(f)
+
+
+def azimuth_entries(imported):
+    """
+    Yield (bearing_text, distance_text) pairs in the calculator's DD.MMSS input
+    format, with the fractional seconds and distance digits the file held
+    """
+    for azimuth, distance in zip(imported.azimuths, imported.distances):
+        distance_text = f"{distance:.3f}"
+        if float(distance_text) != distance:
+            distance_text = repr(distance)
+        yield traverse_solver.decimal_to_dms(azimuth, SECOND_PLACES), distance_text
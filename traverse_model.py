@@ -0,0 +1,125 @@
+"""
+Traverse Model for Traverse Calculator
+The leg data of the traverse being edited. The window's entry widgets only
+display it: every edit is written here as it is committed, and calculating,
+saving and exporting read these columns instead of querying each widget.
+
+Each leg keeps the text exactly as typed and its parsed value. Parsed
+azimuths and distances live in array('d') columns, with NaN marking text that
+does not parse, so a bad row is found without re-parsing the whole traverse.
+"""
+
+import math
+from array import array
+
+import traverse_solver
+
+BEARING = 0
+DISTANCE = 1
+
+
+def _parse_bearing(text):
+    try:
+        return traverse_solver.bearing_to_azimuth(text)
+    except ValueError:
+        return math.nan
+
+
+def _parse_distance(text):
+    try:
+        return traverse_solver.parse_distance(text)
+    except ValueError:
+        return math.nan
+
+
+def _first_nan(column):
+    for i, value in enumerate(column):
+        if value != value:
+            return i
+    return len(column)
+
+
+class TraverseModel:
+    """Raw text and parsed azimuth/distance columns for every leg"""
+    
+    __slots__ = ("bearing_text", "distance_text", "azimuths", "distances", "revision")
+    
+    def __init__(self, rows=()):
+        self.bearing_text = []
+        self.distance_text = []
+        self.azimuths = array('d')
+        self.distances = array('d')
+        # Bumped on every change, so views and caches can tell when they are stale
+        self.revision = 0
+        self.extend(rows)
+    
+    def __len__(self):
+        return len(self.bearing_text)
+    
+    # Editing
+    def extend(self, rows):
+        """Append (bearing, distance) text rows"""
+        for bearing, distance in rows:
+            self.bearing_text.append(bearing)
+            self.distance_text.append(distance)
+            self.azimuths.append(_parse_bearing(bearing))
+            self.distances.append(_parse_distance(distance))
+        self.revision += 1
+    
+    def set_text(self, i, field, text):
+        """Change the bearing (field 0) or distance (field 1) text of leg i"""
+        if field == BEARING:
+            self.bearing_text[i] = text
+            self.azimuths[i] = _parse_bearing(text)
+        else:
+            self.distance_text[i] = text
+            self.distances[i] = _parse_distance(text)
+        self.revision += 1
+    
+    def text(self, i, field):
+        return self.bearing_text[i] if field == BEARING else self.distance_text[i]
+    
+    def resize(self, count, rows=()):
+        """Keep the first count legs (adding blank ones if needed), then fill the new ones from rows"""
+        old_count = len(self)
+        if count < old_count:
+            del self.bearing_text[count:]
+            del self.distance_text[count:]
+            del self.azimuths[count:]
+            del self.distances[count:]
+            self.revision += 1
+        else:
+            rows = list(rows)[:count - old_count]
+            rows += [("", "")] * (count - old_count - len(rows))
+            self.extend(rows)
+    
+    def replace(self, rows):
+        """Replace every leg"""
+        self.resize(0)
+        self.extend(rows)
+    
+    # Reading
+    def rows(self, start=0, stop=None):
+        """(bearing, distance) text pairs"""
+        return list(zip(self.bearing_text[start:stop], self.distance_text[start:stop]))
+    
+    def first_invalid(self):
+        """Index of the first leg whose bearing or distance does not parse, or None"""
+        bad = min(_first_nan(self.azimuths), _first_nan(self.distances))
+        return None if bad == len(self) else bad
+    
+    def legs(self):
+        """
+        (azimuths, distances) lists for the solver. Raises the same ValueError
+        as traverse_solver.parse_legs for the first leg that does not parse.
+        """
+        bad = self.first_invalid()
+        if bad is not None:
+            # Re-parse the bad leg to raise the solver's own error message
+            traverse_solver.bearing_to_azimuth(self.bearing_text[bad])
+            traverse_solver.parse_distance(self.distance_text[bad])
+        return self.azimuths.tolist(), self.distances.tolist()
+    
+    def to_data(self):
+        """Leg list in the .trv "data" layout"""
+        return [{"bearing": b, "distance": d} for b, d in zip(self.bearing_text, self.distance_text)]
@@ -0,0 +1,255 @@
+"""
+Traverse Plot for Traverse Calculator
+A pan/zoom canvas that draws the adjusted and unadjusted traverse polygons.
+
+Each polyline is stored at several levels of detail (LOD). Level 0 is every station;
+each further level drops vertices closer than twice the previous tolerance to the last
+kept one. Every level is split into fixed-size segments with bounding boxes. A redraw
+picks the coarsest level whose tolerance is under a pixel, skips segments outside the
+view, and draws each run of visible segments as a single canvas line item. Redraw cost
+therefore depends on the screen size rather than the number of legs.
+"""
+
+import math
+import tkinter as tk
+from array import array
+from tkinter import ttk
+
+# Vertices per segment in the segment index
+SEGMENT_SIZE = 256
+
+# Stop building coarser levels once a level has this few vertices
+MIN_LOD_POINTS = 512
+
+# Station markers are only drawn when this few stations are visible
+MAX_MARKERS = 300
+
+ZOOM_STEP = 1.2
+REDRAW_DELAY_MS = 30
+
+
+class PolylineLOD:
+    """Multi-resolution copy of a polyline with a segment bounding-box index per level"""
+    
+    def __init__(self, points, closed=False):
+        # points are (northing, easting); the plot uses x = easting, y = northing
+        xs = array('d', (p[1] for p in points))
+        ys = array('d', (p[0] for p in points))
+        if closed and points:
+            xs.append(xs[0])
+            ys.append(ys[0])
+        self.count = len(points)
+        self.levels = []
+        if not xs:
+            return
+        
+        self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        extent = max(self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1]) or 1.0
+        self._add_level(0.0, xs, ys)
+        
+        # Nothing is dropped below half the mean leg length, so start there
+        step = sum(math.hypot(xs[i + 1] - xs[i], ys[i + 1] - ys[i]) for i in range(len(xs) - 1))
+        tolerance = step / max(len(xs) - 1, 1) / 2
+        while len(xs) > MIN_LOD_POINTS and tolerance < extent:
+            coarse_x, coarse_y = _decimate(xs, ys, tolerance)
+            # Only keep levels that are meaningfully smaller than the one before
+            if len(coarse_x) < 0.75 * len(xs):
+                xs, ys = coarse_x, coarse_y
+                self._add_level(tolerance, xs, ys)
+            tolerance *= 2
+    
+    def _add_level(self, tolerance, xs, ys):
+        segments = []
+        last = len(xs) - 1
+        for start in range(0, max(last, 1), SEGMENT_SIZE):
+            # Segments share their end vertex with the next segment's start
+            end = min(start + SEGMENT_SIZE, last)
+            seg_x = xs[start:end + 1]
+            seg_y = ys[start:end + 1]
+            segments.append((start, end, min(seg_x), min(seg_y), max(seg_x), max(seg_y)))
+        self.levels.append((tolerance, xs, ys, segments))
+    
+    def level_for(self, world_per_pixel):
+        """Coarsest level whose tolerance is still under one pixel"""
+        chosen = self.levels[0]
+        for level in self.levels:
+            if level[0] <= world_per_pixel:
+                chosen = level
+        return chosen
+    
+    def visible_runs(self, view, world_per_pixel):
+        """
+        Lists of (x, y) world coordinates to draw, one per run of consecutive
+        segments that intersect view = (min_x, min_y, max_x, max_y).
+        """
+        if not self.levels:
+            return []
+        _, xs, ys, segments = self.level_for(world_per_pixel)
+        min_x, min_y, max_x, max_y = view
+        runs = []
+        run_start = run_end = None
+        for start, end, sx0, sy0, sx1, sy1 in segments:
+            if sx1 < min_x or sx0 > max_x or sy1 < min_y or sy0 > max_y:
+                if run_start is not None:
+                    runs.append((run_start, run_end))
+                    run_start = None
+                continue
+            if run_start is None:
+                run_start = start
+            run_end = end
+        if run_start is not None:
+            runs.append((run_start, run_end))
+        return [(xs[a:b + 1], ys[a:b + 1]) for a, b in runs]
+
+
+def _decimate(xs, ys, tolerance):
+    """Radial-distance simplification: keep a vertex once it is tolerance away from the last kept one"""
+    out_x = array('d', [xs[0]])
+    out_y = array('d', [ys[0]])
+    tol_sq = tolerance * tolerance
+    last_x, last_y = xs[0], ys[0]
+    for x, y in zip(xs, ys):
+        dx = x - last_x
+        dy = y - last_y
+        if dx * dx + dy * dy >= tol_sq:
+            out_x.append(x)
+            out_y.append(y)
+            last_x, last_y = x, y
+    # Always keep the final vertex so closed figures still close
+    if out_x[-1] != xs[-1] or out_y[-1] != ys[-1]:
+        out_x.append(xs[-1])
+        out_y.append(ys[-1])
+    return out_x, out_y
+
+
+class TraversePlot(ttk.Frame):
+    """Canvas panel showing the adjusted and unadjusted traverse with pan and zoom"""
+    
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.canvas = tk.Canvas(self, bg="white", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=tk.X)
+        ttk.Button(toolbar, text="Fit", command=self.fit).pack(side=tk.LEFT, padx=5, pady=2)
+        ttk.Label(toolbar, text="Drag to pan, mouse wheel to zoom.  "
+                                "Blue: adjusted   Grey dashed: unadjusted").pack(side=tk.LEFT, padx=5)
+        
+        self.layers = []
+        self.scale = 1.0
+        self.origin = (0.0, 0.0)
+        self._drag = None
+        self._redraw_job = None
+        
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom_at(e.x, e.y, ZOOM_STEP if e.delta > 0 else 1 / ZOOM_STEP))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom_at(e.x, e.y, ZOOM_STEP))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom_at(e.x, e.y, 1 / ZOOM_STEP))
+    
+    def set_traverse(self, adjusted_points, unadjusted_points=None):
+        """Show a traverse: adjusted (northing, easting) stations and the unadjusted, unclosed path"""
+        self.layers = []
+        if unadjusted_points:
+            self.layers.append((PolylineLOD(unadjusted_points), {"fill": "#95A5A6", "dash": (4, 3)}, False))
+        if adjusted_points:
+            self.layers.append((PolylineLOD(adjusted_points, closed=True), {"fill": "#2980B9", "width": 2}, True))
+        self.fit()
+    
+    def clear(self):
+        self.layers = []
+        self.canvas.delete("all")
+    
+    # View transform
+    def fit(self):
+        """Zoom to show the whole traverse"""
+        if not self.layers:
+            return
+        bounds = [layer.bounds for layer, _, _ in self.layers if layer.levels]
+        min_x = min(b[0] for b in bounds)
+        min_y = min(b[1] for b in bounds)
+        max_x = max(b[2] for b in bounds)
+        max_y = max(b[3] for b in bounds)
+        width = max(self.canvas.winfo_width(), 100)
+        height = max(self.canvas.winfo_height(), 100)
+        span = max(max_x - min_x, max_y - min_y) or 1.0
+        self.scale = 0.9 * min(width, height) / span
+        centre_x, centre_y = (min_x + max_x) / 2, (min_y + max_y) / 2
+        self.origin = (centre_x - width / 2 / self.scale, centre_y + height / 2 / self.scale)
+        self.redraw()
+    
+    def to_world(self, sx, sy):
+        return self.origin[0] + sx / self.scale, self.origin[1] - sy / self.scale
+    
+    def zoom_at(self, sx, sy, factor):
+        """Zoom about a screen point, keeping it fixed under the cursor"""
+        wx, wy = self.to_world(sx, sy)
+        self.scale *= factor
+        self.origin = (wx - sx / self.scale, wy + sy / self.scale)
+        self.schedule_redraw()
+    
+    def _on_press(self, event):
+        self._drag = (event.x, event.y)
+    
+    def _on_drag(self, event):
+        if self._drag is None:
+            return
+        dx, dy = event.x - self._drag[0], event.y - self._drag[1]
+        self._drag = (event.x, event.y)
+        # Move the existing items now; rebuild the visible set when the drag ends
+        self.canvas.move("all", dx, dy)
+        self.origin = (self.origin[0] - dx / self.scale, self.origin[1] + dy / self.scale)
+    
+    def _on_release(self, event):
+        self._drag = None
+        self.schedule_redraw()
+    
+    # Drawing
+    def schedule_redraw(self):
+        """Coalesce bursts of zoom/resize events into one redraw"""
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+        self._redraw_job = self.after(REDRAW_DELAY_MS, self.redraw)
+    
+    def redraw(self):
+        self._redraw_job = None
+        self.canvas.delete("all")
+        if not self.layers:
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        world_per_pixel = 1 / self.scale
+        min_x, max_y = self.to_world(0, 0)
+        max_x, min_y = self.to_world(width, height)
+        view = (min_x, min_y, max_x, max_y)
+        ox, oy, scale = self.origin[0], self.origin[1], self.scale
+        
+        for layer, style, markers in self.layers:
+            runs = layer.visible_runs(view, world_per_pixel)
+            for xs, ys in runs:
+                coords = []
+                for x, y in zip(xs, ys):
+                    coords.append((x - ox) * scale)
+                    coords.append((oy - y) * scale)
+                if len(coords) >= 4:
+                    self.canvas.create_line(coords, **style)
+            
+            # Station markers only at full detail and when few are on screen
+            if markers and layer.level_for(world_per_pixel) is layer.levels[0]:
+                visible = sum(len(xs) for xs, _ in runs)
+                if visible <= MAX_MARKERS:
+                    self._draw_markers(layer, view)
+    
+    def _draw_markers(self, layer, view):
+        _, xs, ys, _ = layer.levels[0]
+        min_x, min_y, max_x, max_y = view
+        ox, oy, scale = self.origin[0], self.origin[1], self.scale
+        for i in range(layer.count):
+            x, y = xs[i], ys[i]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                sx, sy = (x - ox) * scale, (oy - y) * scale
+                self.canvas.create_oval(sx - 3, sy - 3, sx + 3, sy + 3, fill="#E74C3C", outline="")
+                self.canvas.create_text(sx + 6, sy - 6, text=str(i + 1), anchor=tk.SW,
+                                        font=("Arial", 8), fill="#2C3E50")
@@ -0,0 +1,373 @@
+"""
+Multi-Traverse Projects for Traverse Calculator
+A project holds many named traverses (closed loops and open spurs) that share
+control points through a single station index. Each traverse is adjusted on its
+own, so recomputing one loop never touches the others.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import traverse_solver
+from spatial_index import StationGrid
+
+# Version written to the "format" key of multi-traverse .trv files
+PROJECT_FORMAT_VERSION = 2
+
+
+class Station:
+    """A named point; shared stations are stored once in the project's StationIndex"""
+    
+    def __init__(self, station_id, description="", northing=None, easting=None):
+        self.station_id = station_id
+        self.description = description
+        # Known (fixed) coordinates, used as the start point of traverses beginning here
+        self.northing = northing
+        self.easting = easting
+    
+    @property
+    def is_fixed(self):
+        return self.northing is not None and self.easting is not None
+    
+    def to_dict(self):
+        data = {"description": self.description}
+        if self.is_fixed:
+            data["northing"] = self.northing
+            data["easting"] = self.easting
+        return data
+
+
+class StationIndex:
+    """Station ID -> Station lookup plus a reverse index of which traverses use each station"""
+    
+    def __init__(self):
+        self._stations = {}
+        self._usage = {}
+        self._lock = threading.Lock()
+    
+    def __contains__(self, station_id):
+        return station_id in self._stations
+    
+    def __getitem__(self, station_id):
+        return self._stations[station_id]
+    
+    def __iter__(self):
+        return iter(self._stations.values())
+    
+    def __len__(self):
+        return len(self._stations)
+    
+    def get_or_create(self, station_id):
+        """Return the station with this ID, creating an unfixed one if needed"""
+        with self._lock:
+            station = self._stations.get(station_id)
+            if station is None:
+                station = self._stations[station_id] = Station(station_id)
+            return station
+    
+    def add(self, station):
+        with self._lock:
+            self._stations[station.station_id] = station
+    
+    def link(self, station_ids, traverse_name):
+        with self._lock:
+            for station_id in station_ids:
+                self._usage.setdefault(station_id, set()).add(traverse_name)
+    
+    def unlink(self, station_ids, traverse_name):
+        with self._lock:
+            for station_id in station_ids:
+                users = self._usage.get(station_id)
+                if users:
+                    users.discard(traverse_name)
+    
+    def traverses_using(self, station_id):
+        """Names of the traverses that pass through a station"""
+        with self._lock:
+            return set(self._usage.get(station_id, ()))
+    
+    def shared_stations(self):
+        """Station IDs used by more than one traverse"""
+        with self._lock:
+            return sorted(sid for sid, users in self._usage.items() if len(users) > 1)
+
+
+class Traverse:
+    """
+    One traverse in a project: station IDs plus the raw bearing/distance text of each leg.
+    Closed traverses have one leg per station (the last leg returns to the first station);
+    open traverses (spurs) have one leg fewer than stations.
+    """
+    
+    def __init__(self, name, station_ids, bearings, distances, closed=True):
+        self.name = name
+        self.station_ids = list(station_ids)
+        self.bearings = list(bearings)
+        self.distances = list(distances)
+        self.closed = closed
+        # Bumped on every edit so stale concurrent results can be detected
+        self.revision = 0
+        self.check_legs()
+    
+    @property
+    def num_legs(self):
+        return len(self.bearings)
+    
+    def check_legs(self):
+        expected = len(self.station_ids) if self.closed else len(self.station_ids) - 1
+        if len(self.bearings) != expected or len(self.distances) != expected:
+            raise ValueError(
+                f"Traverse '{self.name}' has {len(self.station_ids)} stations and "
+                f"{len(self.bearings)} legs; a {'closed' if self.closed else 'open'} "
+                f"traverse needs {expected}")
+    
+    def leg_stations(self, i):
+        """(from_station_id, to_station_id) of leg i"""
+        return self.station_ids[i], self.station_ids[(i + 1) % len(self.station_ids)]
+    
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "closed": self.closed,
+            "stations": self.station_ids,
+            "data": [{"bearing": b, "distance": d} for b, d in zip(self.bearings, self.distances)]
+        }
+
+
+class TraverseResult:
+    """Output of adjusting one traverse: the solver result and station coordinates by ID"""
+    
+    def __init__(self, traverse_name, revision, adjustment, coordinates):
+        self.traverse_name = traverse_name
+        self.revision = revision
+        # TraverseAdjustment for closed traverses, None for open ones
+        self.adjustment = adjustment
+        # station_id -> (northing, easting)
+        self.coordinates = coordinates
+
+
+def compute_traverse(traverse, start_northing=0.0, start_easting=0.0):
+    """Adjust a single traverse. Pure function of its inputs, safe to run in any worker."""
+    bearings, distances = traverse_solver.parse_legs(traverse.bearings, traverse.distances)
+    if traverse.closed:
+        adjustment = traverse_solver.adjust_traverse(bearings, distances)
+        points = adjustment.coordinates(start_northing, start_easting)
+    else:
+        adjustment = None
+        points = traverse_solver.open_traverse_coordinates(bearings, distances,
+                                                           start_northing, start_easting)
+    coordinates = dict(zip(traverse.station_ids, points))
+    return TraverseResult(traverse.name, traverse.revision, adjustment, coordinates)
+
+
+class TraverseProject:
+    """A set of named traverses sharing one station index"""
+    
+    def __init__(self, project_info=None, settings=None):
+        self.project_info = dict(project_info or {})
+        self.settings = dict(settings or {"traverse_type": "closed", "units": "metric"})
+        self.stations = StationIndex()
+        self.traverses = {}
+        self.results = {}
+        # Computed station coordinates keyed by (traverse name, station ID), updated per traverse
+        self.spatial_index = StationGrid()
+        self._lock = threading.Lock()
+    
+    # Editing
+    def add_traverse(self, traverse):
+        """Add (or replace) a traverse, registering its stations in the index"""
+        with self._lock:
+            old = self.traverses.get(traverse.name)
+            if old is not None:
+                self.stations.unlink(old.station_ids, old.name)
+                traverse.revision = old.revision + 1
+            self.traverses[traverse.name] = traverse
+            self.results.pop(traverse.name, None)
+            # Its stations are indexed again when it is next adjusted
+            self.spatial_index.remove_group(traverse.name)
+        for station_id in traverse.station_ids:
+            self.stations.get_or_create(station_id)
+        self.stations.link(traverse.station_ids, traverse.name)
+        return traverse
+    
+    def remove_traverse(self, name):
+        with self._lock:
+            traverse = self.traverses.pop(name)
+            self.results.pop(name, None)
+            self.spatial_index.remove_group(name)
+        self.stations.unlink(traverse.station_ids, name)
+    
+    def update_leg(self, name, i, bearing=None, distance=None):
+        """Edit one leg; only this traverse's result is invalidated"""
+        with self._lock:
+            traverse = self.traverses[name]
+            if bearing is not None:
+                traverse.bearings[i] = bearing
+            if distance is not None:
+                traverse.distances[i] = distance
+            traverse.revision += 1
+            self.results.pop(name, None)
+            self.spatial_index.remove_group(name)
+    
+    def set_station_coordinates(self, station_id, northing, easting):
+        """Fix a station; traverses starting there are invalidated"""
+        self.stations.get_or_create(station_id)
+        station = self.stations[station_id]
+        with self._lock:
+            station.northing, station.easting = northing, easting
+            for name, traverse in self.traverses.items():
+                if traverse.station_ids and traverse.station_ids[0] == station_id:
+                    # An adjustment already running from the old start point must not be stored
+                    traverse.revision += 1
+                    self.results.pop(name, None)
+                    self.spatial_index.remove_group(name)
+    
+    # Adjustment
+    def is_dirty(self, name):
+        result = self.results.get(name)
+        return result is None or result.revision != self.traverses[name].revision
+    
+    def _start_point(self, traverse):
+        if traverse.station_ids and traverse.station_ids[0] in self.stations:
+            start = self.stations[traverse.station_ids[0]]
+            if start.is_fixed:
+                return start.northing, start.easting
+        return 0.0, 0.0
+    
+    def _snapshot(self, name):
+        """Copy a traverse's inputs so it can be computed without holding the lock"""
+        with self._lock:
+            traverse = self.traverses[name]
+            snapshot = Traverse(traverse.name, traverse.station_ids, traverse.bearings,
+                                traverse.distances, traverse.closed)
+            snapshot.revision = traverse.revision
+            start = self._start_point(snapshot)
+        return snapshot, start
+    
+    def _store(self, result):
+        """Keep a result unless the traverse was edited while it was being computed"""
+        with self._lock:
+            traverse = self.traverses.get(result.traverse_name)
+            if traverse is not None and traverse.revision == result.revision:
+                self.results[result.traverse_name] = result
+                self.spatial_index.replace_group(
+                    result.traverse_name,
+                    [((result.traverse_name, sid), n, e) for sid, (n, e) in result.coordinates.items()])
+    
+    def adjust(self, name):
+        """Adjust one traverse and return its TraverseResult"""
+        snapshot, (northing, easting) = self._snapshot(name)
+        result = compute_traverse(snapshot, northing, easting)
+        self._store(result)
+        return result
+    
+    def adjust_all(self, names=None, executor=None, max_workers=None, force=False):
+        """
+        Adjust several traverses concurrently; by default only those edited since their last adjustment.
+        Returns {name: TraverseResult or Exception}.
+        """
+        if names is None:
+            names = list(self.traverses)
+        if not force:
+            names = [name for name in names if self.is_dirty(name)]
+        if not names:
+            return {}
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {}
+            for name in names:
+                snapshot, (northing, easting) = self._snapshot(name)
+                futures[name] = executor.submit(compute_traverse, snapshot, northing, easting)
+            
+            outcomes = {}
+            for name, future in futures.items():
+                try:
+                    result = future.result()
+                except Exception as e:
+                    outcomes[name] = e
+                    continue
+                self._store(result)
+                outcomes[name] = result
+            return outcomes
+        finally:
+            if own_executor:
+                executor.shutdown()
+    
+    # Spatial queries over adjusted coordinates (call adjust_all() first to bring them up to date)
+    def stations_within(self, northing, easting, radius):
+        """(distance, (traverse name, station ID)) for computed stations within radius"""
+        with self._lock:
+            return self.spatial_index.within(northing, easting, radius)
+    
+    def nearest_stations(self, northing, easting, k=1):
+        """The k closest computed stations as (distance, (traverse name, station ID))"""
+        with self._lock:
+            return self.spatial_index.nearest(northing, easting, k)
+    
+    def duplicate_stations(self, tolerance):
+        """
+        Pairs of different station IDs whose computed positions are within tolerance.
+        The same shared station reached by two traverses is not reported.
+        """
+        with self._lock:
+            pairs = self.spatial_index.duplicates(tolerance)
+        return [(d, a, b) for d, a, b in pairs if a[1] != b[1]]
+    
+    # Serialization
+    def to_dict(self):
+        return {
+            "format": PROJECT_FORMAT_VERSION,
+            "project_info": self.project_info,
+            "settings": self.settings,
+            "stations": {station.station_id: station.to_dict() for station in self.stations},
+            "traverses": [traverse.to_dict() for traverse in self.traverses.values()]
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Load a project, accepting both multi-traverse files and legacy single-traverse .trv files"""
+        project = cls(data.get("project_info", {}), data.get("settings", {}))
+        
+        for station_id, info in data.get("stations", {}).items():
+            project.stations.add(Station(station_id, info.get("description", ""),
+                                         info.get("northing"), info.get("easting")))
+        
+        if "traverses" in data:
+            for item in data["traverses"]:
+                legs = item.get("data", [])
+                project.add_traverse(Traverse(
+                    item["name"], item["stations"],
+                    [leg.get("bearing", "") for leg in legs],
+                    [leg.get("distance", "") for leg in legs],
+                    item.get("closed", True)))
+        else:
+            # Legacy file: one closed traverse, stations numbered 1..n
+            legs = data.get("data", [])[:data.get("num_sides", len(data.get("data", [])))]
+            name = data.get("project_info", {}).get("traverse_id") or "Traverse 1"
+            project.add_traverse(Traverse(
+                name, [str(i + 1) for i in range(len(legs))],
+                [leg.get("bearing", "") for leg in legs],
+                [leg.get("distance", "") for leg in legs]))
+        
+        return project
+
+
+def is_project_data(data):
+    """True if a loaded .trv dictionary is a multi-traverse project"""
+    return "traverses" in data
+
+
+def traverse_to_legacy_data(project, name):
+    """Single-traverse dictionary in the original .trv layout, for loading into the calculator window"""
+    traverse = project.traverses[name]
+    project_info = dict(project.project_info)
+    project_info["traverse_id"] = traverse.name
+    return {
+        "project_info": project_info,
+        "settings": project.settings,
+        "num_sides": traverse.num_legs,
+        "data": [{"bearing": b, "distance": d} for b, d in zip(traverse.bearings, traverse.distances)]
+    }
@@ -0,0 +1,288 @@
+"""
+Calculation Report for Traverse Calculator
+Runs the Bowditch adjustment and blunder check for one traverse and builds the
+text report shown in the Report tab. Everything here works on plain values,
+not widgets, so a tab can hand the whole calculation to a background worker.
+
+The report is made of sections that can be chosen individually. A section is
+only formatted when the report is read, and sections that were not chosen are
+never formatted. When neither the corrections nor the final bearings are
+wanted, the adjustment stops at the misclosure, so a summary-only report costs
+little more than the closure check itself.
+
+Legs with a blank bearing or distance are completed from the closure
+(missing_measurements.py) and the computed values are listed first.
+"""
+
+import math
+from datetime import datetime
+
+import traverse_solver
+import blunder_detection
+import missing_measurements
+
+# Report sections in the order they appear
+SECTIONS = ("computed_legs", "interior_angles", "angular_misclosure", "azimuths", "latitudes",
+            "linear_misclosure", "blunders", "corrections", "final_bearings")
+
+# Closure summary: misclosures and relative accuracy only
+SUMMARY_SECTIONS = ("computed_legs", "angular_misclosure", "linear_misclosure")
+
+# Sections that need the Bowditch corrections distributed
+CORRECTION_SECTIONS = ("corrections", "final_bearings")
+
+RULE = "-" * 120
+DOUBLE_RULE = "=" * 120
+
+
+class TraverseReport:
+    """The text report of one adjustment, formatted section by section as it is read"""
+    
+    def __init__(self, adjustment, project_info=None, units="metric", bearing_precision=0,
+                 sections=SECTIONS, completion=None):
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown report section: {', '.join(sorted(unknown))}")
+        self.adjustment = adjustment
+        self.project_info = project_info or {}
+        self.units = units
+        self.unit_label = "ft" if units == "english" else "m"
+        self.bearing_precision = bearing_precision
+        self.sections = tuple(key for key in SECTIONS if key in sections)
+        self.date = datetime.now()
+        # missing_measurements.Completion when some measurements were computed
+        self.completion = completion
+        self._suspects = None
+    
+    def __str__(self):
+        return "\n".join(self.lines())
+    
+    def lines(self):
+        """Yield the report lines; each section is formatted only when reached"""
+        yield from self._header()
+        for key in self.sections:
+            yield from self.section_lines(key)
+        yield "\n" + DOUBLE_RULE
+        yield "CALCULATION COMPLETED SUCCESSFULLY"
+        yield DOUBLE_RULE
+    
+    def section_lines(self, key):
+        """Yield the lines of one section (a SECTIONS key)"""
+        if key not in SECTIONS:
+            raise ValueError(f"Unknown report section: {key}")
+        return getattr(self, "_" + key)()
+    
+    def section(self, key):
+        """Text of one section"""
+        return "\n".join(self.section_lines(key))
+    
+    def suspects(self):
+        """Blunder suspects, or an empty list when the closure is good enough not to look"""
+        if self._suspects is None:
+            adj = self.adjustment
+            self._suspects = []
+            if blunder_detection.needs_blunder_check(adj):
+                self._suspects = blunder_detection.locate_blunders(adj.bearings, adj.distances, max_suspects=5)
+        return self._suspects
+    
+    def _header(self):
+        yield DOUBLE_RULE
+        yield "POLYGON TRAVERSE CALCULATION RESULTS"
+        yield DOUBLE_RULE
+        yield ""
+        
+        project_name = self.project_info.get("project_name", "")
+        user_name = self.project_info.get("user_name", "")
+        project_address = self.project_info.get("project_address", "")
+        traverse_id = self.project_info.get("traverse_id", "")
+        if project_name or user_name or project_address or traverse_id:
+            unit_name = "feet" if self.units == "english" else "meters"
+            yield "PROJECT INFORMATION"
+            yield RULE
+            if project_name:
+                yield f"Project Name: {project_name}"
+            if user_name:
+                yield f"User Name: {user_name}"
+            if project_address:
+                yield f"Project Address: {project_address}"
+            if traverse_id:
+                yield f"Traverse ID: {traverse_id}"
+            yield f"Units: {unit_name.title()}"
+            yield f"Date: {self.date.strftime('%m/%d/%Y %I:%M %p')}"
+            yield ""
+    
+    def _computed_legs(self):
+        completion = self.completion
+        if not completion:
+            return
+        yield "COMPUTED MEASUREMENTS (solved from the closure condition)"
+        yield RULE
+        for value in completion.filled:
+            yield value.describe(self.unit_label, self.bearing_precision)
+        if completion.residual:
+            yield f"Misclosure left after the computed value: {completion.residual:.6f} {self.unit_label}"
+        else:
+            yield "The computed values absorb the misclosure: the closure below is not an independent check."
+        for warning in completion.warnings:
+            yield f"Warning: {warning}"
+        for alternative in completion.alternatives:
+            yield "Other solution: " + "; ".join(
+                value.describe(self.unit_label, self.bearing_precision) for value in alternative)
+        yield ""
+    
+    def _interior_angles(self):
+        adj = self.adjustment
+        yield "COMPUTED INTERIOR ANGLES FROM BEARINGS"
+        yield RULE
+        yield f"{'Side':<6} {'Bearing':<20} {'Interior Angle':<20}"
+        yield RULE
+        for i in range(adj.n):
+            yield f"{i+1:<6} {adj.bearings[i]:>15.6f}°   {adj.angles[i]:>15.6f}°"
+        yield ""
+    
+    def _angular_misclosure(self):
+        adj = self.adjustment
+        yield "1. ANGULAR MISCLOSURE CHECK"
+        yield RULE
+        yield f"Number of sides: {adj.n}"
+        yield f"Theoretical sum of interior angles: {adj.theoretical_sum:.4f}°"
+        yield f"Actual sum of interior angles: {adj.actual_sum:.4f}°"
+        yield f"Angular misclosure: {adj.angular_misclosure:.4f}°"
+        yield f"Allowable error (±√n minutes): ±{math.sqrt(adj.n):.2f}'"
+        yield f"\nCorrection per angle: {adj.angular_correction:.6f}°\n"
+    
+    def _azimuths(self):
+        adj = self.adjustment
+        yield "2. ADJUSTED ANGLES AND AZIMUTHS"
+        yield RULE
+        yield f"{'Side':<6} {'Original Angle':<20} {'Correction':<20} {'Adjusted Angle':<20} {'Azimuth':<20}"
+        yield RULE
+        for i in range(adj.n):
+            yield (f"{i+1:<6} {adj.angles[i]:>15.6f}°   {adj.angular_correction:>15.6f}°   "
+                   f"{adj.adjusted_angles[i]:>15.6f}°   {adj.azimuths[i]:>15.6f}°")
+    
+    def _latitudes(self):
+        adj = self.adjustment
+        unit_label = self.unit_label
+        yield f"\n3. LATITUDES AND DEPARTURES"
+        yield RULE
+        yield f"{'Side':<6} {'Distance':<15} {'Azimuth':<20} {'Latitude':<20} {'Departure':<20}"
+        yield RULE
+        for i in range(adj.n):
+            yield (f"{i+1:<6} {adj.distances[i]:>12.3f} {unit_label}   {adj.azimuths[i]:>15.6f}°   "
+                   f"{adj.latitudes[i]:>15.6f} {unit_label}   {adj.departures[i]:>15.6f} {unit_label}")
+        yield RULE
+        yield (f"{'TOTAL':<6} {adj.total_perimeter:>12.3f} {unit_label}   {'':<19} "
+               f"{adj.sum_lat:>15.6f} {unit_label}   {adj.sum_dep:>15.6f} {unit_label}")
+    
+    def _linear_misclosure(self):
+        adj = self.adjustment
+        unit_label = self.unit_label
+        yield f"\n4. LINEAR MISCLOSURE"
+        yield RULE
+        yield f"Error in latitude (ΣL): {adj.sum_lat:.6f} {unit_label}"
+        yield f"Error in departure (ΣD): {adj.sum_dep:.6f} {unit_label}"
+        yield f"Total linear misclosure: {adj.linear_misclosure:.6f} {unit_label}"
+        yield f"Relative accuracy: {adj.relative_accuracy}\n"
+    
+    def _blunders(self):
+        # Poor closure: look for a single blunder before distributing the error
+        if not blunder_detection.needs_blunder_check(self.adjustment):
+            return
+        yield f"BLUNDER ANALYSIS (closure worse than 1:{blunder_detection.BLUNDER_ACCURACY_THRESHOLD})"
+        yield RULE
+        yield f"{'Rank':<6} {'Suspect':<70} {'Unexplained':<15} {'Plausible':<10}"
+        yield RULE
+        for rank, suspect in enumerate(self.suspects(), 1):
+            yield (f"{rank:<6} {suspect.describe(self.unit_label):<70} "
+                   f"{suspect.residual:>10.4f} {self.unit_label}   {'Yes' if suspect.plausible else 'No':<10}")
+        yield ""
+    
+    def _corrections(self):
+        adj = self.adjustment
+        unit_label = self.unit_label
+        yield "5. CORRECTIONS AND ADJUSTED VALUES (Bowditch Method)"
+        yield RULE
+        yield f"{'Side':<6} {'Lat Corr':<15} {'Dep Corr':<15} {'Adjusted Lat':<20} {'Adjusted Dep':<20}"
+        yield RULE
+        for i in range(adj.n):
+            yield (f"{i+1:<6} {adj.lat_corrections[i]:>12.6f} {unit_label}  {adj.dep_corrections[i]:>12.6f} {unit_label}  "
+                   f"{adj.adjusted_lats[i]:>15.6f} {unit_label}   {adj.adjusted_deps[i]:>15.6f} {unit_label}")
+        yield RULE
+        yield (f"{'TOTAL':<6} {'':<15} {'':<15} "
+               f"{sum(adj.adjusted_lats):>15.6f} {unit_label}   {sum(adj.adjusted_deps):>15.6f} {unit_label}")
+    
+    def _final_bearings(self):
+        adj = self.adjustment
+        unit_label = self.unit_label
+        yield "\n" + DOUBLE_RULE
+        yield "6. FINAL CORRECTED BEARINGS AND DISTANCES"
+        yield DOUBLE_RULE
+        yield f"{'Side':<6} {'Corrected Bearing':<25} {'Corrected Distance':<20}"
+        yield RULE
+        corr_bearings = traverse_solver.format_bearings(adj.corrected_azimuths, self.bearing_precision)
+        for i in range(adj.n):
+            yield f"{i+1:<6} {corr_bearings[i]:<25} {adj.corrected_distances[i]:>15.3f} {unit_label}"
+        yield RULE
+        yield f"{'TOTAL':<6} {'':<25} {sum(adj.corrected_distances):>15.3f} {unit_label}"
+
+
+class CalculationResult:
+    """Adjustment, report text and blunder suspects returned by calculate_traverse()"""
+    
+    def __init__(self, adjustment, report, suspect_legs):
+        self.adjustment = adjustment
+        self.report = report
+        # Legs to highlight in the input table (plausible blunder suspects)
+        self.suspect_legs = suspect_legs
+
+
+def traverse_report(bearings, distances, project_info=None, units="metric", bearing_precision=0,
+                    sections=SECTIONS, completion=None):
+    """
+    Adjust a closed traverse and return its TraverseReport, still unformatted.
+    Unless corrections or final_bearings are among the sections, only the
+    misclosure is computed. completion lists measurements that were computed.
+    """
+    closure_only = not any(key in sections for key in CORRECTION_SECTIONS)
+    adj = traverse_solver.adjust_traverse(bearings, distances, closure_only=closure_only)
+    return TraverseReport(adj, project_info, units, bearing_precision, sections, completion)
+
+
+def project_reports(project, sections=SECTIONS):
+    """
+    Yield (traverse name, TraverseReport or error text) for every traverse of a
+    traverse_project.TraverseProject, using its project information and settings.
+    Missing bearings and distances are solved from the closure where possible.
+    """
+    project_info = dict(project.project_info)
+    units = project.settings.get("units", "metric")
+    bearing_precision = project.settings.get("bearing_precision", 0)
+    for traverse in project.traverses.values():
+        if not traverse.closed:
+            yield traverse.name, "open traverse: no closure to report"
+            continue
+        project_info["traverse_id"] = traverse.name
+        try:
+            completion = missing_measurements.complete_legs(traverse.bearings, traverse.distances)
+            yield traverse.name, traverse_report(completion.bearings, completion.distances, dict(project_info),
+                                                 units, bearing_precision, sections, completion)
+        except (ValueError, ZeroDivisionError) as e:
+            yield traverse.name, str(e)
+
+
+def calculate_traverse(bearings, distances, project_info=None, units="metric", bearing_precision=0,
+                       sections=SECTIONS, completion=None):
+    """
+    Adjust a closed traverse and build its report.
+    bearings are azimuths in decimal degrees; project_info holds the project_name,
+    user_name, project_address and traverse_id shown in the report header;
+    sections picks the report sections (SUMMARY_SECTIONS for the closure only);
+    completion lists measurements that were computed from the closure.
+    Returns a CalculationResult.
+    """
+    report = traverse_report(bearings, distances, project_info, units, bearing_precision, sections, completion)
+    suspect_legs = []
+    if "blunders" in report.sections:
+        suspect_legs = [s.leg for s in report.suspects() if s.plausible]
+    return CalculationResult(report.adjustment, str(report), suspect_legs)
@@ -0,0 +1,428 @@
+"""
+Traverse Service for Traverse Calculator
+Headless JSON-over-HTTP service exposing the traverse adjustment to other systems.
+
+    python traverse_service.py serve [--host 127.0.0.1] [--port 8765] [--workers N]
+    python traverse_service.py bench [--port 8765] [--requests 500] [--clients 8] [--legs 20]
+
+Endpoints:
+    POST /adjust    {"bearings": [...], "distances": [...]} for one traverse, or
+                    {"traverses": [{...}, ...]} for a batch. Bearings are quadrant
+                    bearing / DD.MMSS strings as typed in the calculator, or numbers
+                    in decimal degrees. Optional "start": [northing, easting] and
+                    "legs": false to return only the closure summary.
+    GET  /metrics   request, batching and latency statistics
+    GET  /health
+
+Small traverses arriving within a few milliseconds of each other are coalesced
+into one batch and solved in a single worker call; large ones go to the worker
+pool on their own. The pool is started and warmed before the first request.
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import traverse_solver
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Traverses with at most this many legs are coalesced into batches
+SMALL_JOB_LEGS = 2000
+
+# How long a batch waits for more small jobs, and the size that flushes it early
+BATCH_WINDOW = 0.005
+BATCH_MAX_LEGS = 50000
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Latencies kept for the percentile figures in /metrics
+LATENCY_SAMPLES = 4096
+
+
+# Work done in the pool processes
+def _parse_bearing(value):
+    if isinstance(value, (int, float)):
+        return float(value) % 360
+    return traverse_solver.bearing_to_azimuth(str(value))
+
+
+def check_traverse(item):
+    """Raise ValueError unless item has the shape of one traverse request"""
+    if not isinstance(item, dict):
+        raise ValueError("A traverse must be a JSON object")
+    for key in ("bearings", "distances"):
+        values = item.get(key)
+        if not isinstance(values, list):
+            raise ValueError(f"'{key}' must be a list")
+        for value in values:
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                raise ValueError(f"'{key}' must hold strings or numbers, not {json.dumps(value)}")
+
+
+def solve_traverse(item):
+    """Adjust one traverse request and return its JSON-ready result"""
+    check_traverse(item)
+    bearings = item["bearings"]
+    distances = item["distances"]
+    if len(bearings) != len(distances):
+        raise ValueError(f"{len(bearings)} bearings but {len(distances)} distances")
+    if len(bearings) < 3:
+        raise ValueError("A closed traverse needs at least 3 legs")
+    azimuths = [_parse_bearing(b) for b in bearings]
+    lengths = [traverse_solver.parse_distance(d) for d in distances]
+    start_northing, start_easting = item.get("start", (0.0, 0.0))
+    
+    adj = traverse_solver.adjust_traverse(azimuths, lengths)
+    points = adj.coordinates(float(start_northing), float(start_easting))
+    result = {
+        "legs": adj.n,
+        "angular_misclosure": adj.angular_misclosure,
+        "linear_misclosure": adj.linear_misclosure,
+        "relative_accuracy": adj.relative_accuracy,
+        "perimeter": adj.total_perimeter,
+        "area": traverse_solver.polygon_area(points),
+    }
+    if item.get("legs", True):
+        result["corrected_azimuths"] = adj.corrected_azimuths
+        result["corrected_distances"] = adj.corrected_distances
+        result["coordinates"] = points
+    return result
+
+
+def solve_batch(items):
+    """Solve several traverses in one worker call; failures become {"error": ...} entries"""
+    results = []
+    for item in items:
+        try:
+            results.append(solve_traverse(item))
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def _warm_worker():
+    """Runs once per worker at startup so the first request does not pay for process start-up"""
+    solve_traverse({"bearings": [0, 120, 240], "distances": [1, 1, 1]})
+    return os.getpid()
+
+
+class ServiceMetrics:
+    """Counters and a rolling window of request latencies"""
+    
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.traverses = 0
+        self.legs = 0
+        self.batches = 0
+        self.batched_traverses = 0
+        self.offloaded = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+    
+    def record_request(self, seconds, traverses, legs, error=False):
+        self.requests += 1
+        self.traverses += traverses
+        self.legs += legs
+        if error:
+            self.errors += 1
+        self.latencies.append(seconds)
+    
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_traverses += size
+    
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+        
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "traverses": self.traverses,
+            "legs": self.legs,
+            "throughput": {
+                "requests_per_second": round(self.requests / uptime, 3) if uptime else 0.0,
+                "traverses_per_second": round(self.traverses / uptime, 3) if uptime else 0.0,
+                "legs_per_second": round(self.legs / uptime, 3) if uptime else 0.0,
+            },
+            "batches": self.batches,
+            "mean_batch_size": round(self.batched_traverses / self.batches, 3) if self.batches else 0.0,
+            "offloaded_large_jobs": self.offloaded,
+            "latency_ms": {
+                "p50": round(percentile(0.50), 3),
+                "p90": round(percentile(0.90), 3),
+                "p99": round(percentile(0.99), 3),
+                "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+                "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            },
+        }
+
+
+class TraverseService:
+    """asyncio HTTP front end with request coalescing in front of a warm process pool"""
+    
+    def __init__(self, workers=None, batch_window=BATCH_WINDOW, small_job_legs=SMALL_JOB_LEGS):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_window = batch_window
+        self.small_job_legs = small_job_legs
+        self.metrics = ServiceMetrics()
+        self.executor = None
+        self.server = None
+        self._pending = []
+        self._pending_legs = 0
+        self._flush_handle = None
+    
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Start every worker process now rather than on the first requests
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _warm_worker)
+                               for _ in range(self.workers)))
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+    
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown()
+    
+    # Scheduling
+    async def submit(self, item):
+        """Solve one traverse, coalescing small ones into shared batches"""
+        loop = asyncio.get_running_loop()
+        legs = len(item["bearings"])
+        if legs > self.small_job_legs:
+            self.metrics.offloaded += 1
+            results = await loop.run_in_executor(self.executor, solve_batch, [item])
+            return results[0]
+        
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self._pending_legs += legs
+        if self._pending_legs >= BATCH_MAX_LEGS:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return await future
+    
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_legs = self._pending, [], 0
+        if not batch:
+            return
+        self.metrics.record_batch(len(batch))
+        task = asyncio.get_running_loop().run_in_executor(
+            self.executor, solve_batch, [item for item, _ in batch])
+        
+        def distribute(done):
+            try:
+                results = done.result()
+            except Exception as e:
+                results = [{"error": f"Worker failed: {e}"}] * len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        
+        task.add_done_callback(distribute)
+    
+    # HTTP
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                
+                try:
+                    status, payload = await self._dispatch(method, path.split('?', 1)[0], body)
+                except Exception as e:
+                    # Answer rather than drop the connection, then start afresh
+                    status, payload, keep_alive = 500, {"error": f"Internal error: {e}"}, False
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode('utf-8')
+        reason = http.client.responses.get(status, "")
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+    
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "workers": self.workers}
+        if path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if path != "/adjust":
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": "Use POST for /adjust"}
+        
+        started = time.perf_counter()
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            self.metrics.record_request(time.perf_counter() - started, 0, 0, error=True)
+            return 400, {"error": f"Invalid JSON: {e}"}
+        
+        is_batch = isinstance(request, dict) and "traverses" in request
+        items = request["traverses"] if is_batch else [request]
+        try:
+            if not isinstance(items, list):
+                raise ValueError("'traverses' must be a list")
+            for i, item in enumerate(items):
+                try:
+                    check_traverse(item)
+                except ValueError as e:
+                    raise ValueError(f"traverses[{i}]: {e}" if is_batch else str(e))
+        except ValueError as e:
+            self.metrics.record_request(time.perf_counter() - started, 0, 0, error=True)
+            return 400, {"error": str(e)}
+        results = await asyncio.gather(*(self.submit(item) for item in items))
+        
+        legs = sum(result.get("legs", 0) for result in results)
+        failed = any("error" in result for result in results)
+        self.metrics.record_request(time.perf_counter() - started, len(items), legs, error=failed)
+        if is_batch:
+            return 200, {"results": results}
+        return (422 if failed else 200), results[0]
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    service = TraverseService(workers)
+    port = await service.start(host, port)
+    print(f"Traverse service listening on http://{host}:{port} ({service.workers} workers)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+class ServiceClient:
+    """Small blocking client for the service, reusing one keep-alive connection"""
+    
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=60):
+        self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    
+    def request(self, method, path, payload=None):
+        """Send a request and return (status, decoded JSON body)"""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    
+    def adjust(self, bearings, distances, legs=True):
+        return self.request("POST", "/adjust", {"bearings": bearings, "distances": distances, "legs": legs})
+    
+    def adjust_batch(self, traverses):
+        return self.request("POST", "/adjust", {"traverses": traverses})
+    
+    def metrics(self):
+        return self.request("GET", "/metrics")[1]
+    
+    def close(self):
+        self.connection.close()
+
+
+def bench(host=DEFAULT_HOST, port=DEFAULT_PORT, requests=500, clients=8, legs=20):
+    """Fire many small concurrent requests from client threads and print the service metrics"""
+    bearings = [(i * 360 / legs + 0.001 * (i % 3)) % 360 for i in range(legs)]
+    bearings = [(90 + b) % 360 for b in bearings]
+    distances = [100.0 + 0.01 * (i % 5) for i in range(legs)]
+    failures = []
+    
+    def worker(count):
+        client = ServiceClient(host, port)
+        try:
+            for _ in range(count):
+                status, _ = client.adjust(bearings, distances, legs=False)
+                if status != 200:
+                    failures.append(status)
+        finally:
+            client.close()
+    
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(requests // clients,)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    sent = requests // clients * clients
+    print(f"{sent} requests from {clients} clients in {elapsed:.2f} s "
+          f"({sent / elapsed:.0f} req/s, {len(failures)} failed)")
+    client = ServiceClient(host, port)
+    print(json.dumps(client.metrics(), indent=2))
+    client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traverse Calculator HTTP service")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the service")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--workers", type=int, default=None)
+    bench_parser = commands.add_parser("bench", help="load-test a running service")
+    bench_parser.add_argument("--host", default=DEFAULT_HOST)
+    bench_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    bench_parser.add_argument("--requests", type=int, default=500)
+    bench_parser.add_argument("--clients", type=int, default=8)
+    bench_parser.add_argument("--legs", type=int, default=20)
+    args = parser.parse_args(argv)
+    
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.workers))
+        except KeyboardInterrupt:
+            pass
+    else:
+        bench(args.host, args.port, args.requests, args.clients, args.legs)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,311 @@
+"""
+Traverse Solver for Traverse Calculator
+Bearing parsing/formatting and the closed-traverse Bowditch adjustment,
+independent of the Tk user interface so it can be reused by projects and batch tools.
+"""
+
+import math
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Below this many azimuths the plain-Python formatter is faster than building numpy arrays
+NUMPY_MIN_BEARINGS = 64
+
+
+def dms_to_decimal(dms_str):
+    """Convert DD.MMSS[s...] to decimal degrees; digits after MMSS are fractions of a second"""
+    try:
+        parts = dms_str.split('.')
+        degrees = float(parts[0])
+        if len(parts) > 1:
+            mmss = parts[1].ljust(4, '0')
+            minutes = float(mmss[:2])
+            seconds = float(mmss[2:4] + '.' + mmss[4:])
+            decimal = abs(degrees) + minutes/60 + seconds/3600
+            return decimal if degrees >= 0 else -decimal
+        return degrees
+    except:
+        return float(dms_str)
+
+
+def decimal_to_dms(azimuth, places=0):
+    """
+    Convert a decimal azimuth to DDD.MMSS text, rounded to the nearest second or,
+    with places, to that many decimals of a second written after MMSS (trailing
+    zeros dropped)
+    """
+    scale = 10 ** places
+    total = round((azimuth % 360) * 3600 * scale) % (360 * 3600 * scale)
+    degrees, remainder = divmod(total, 3600 * scale)
+    minutes, remainder = divmod(remainder, 60 * scale)
+    seconds, fraction = divmod(remainder, scale)
+    text = f"{degrees}.{minutes:02d}{seconds:02d}"
+    if places:
+        text += f"{fraction:0{places}d}".rstrip('0')
+    return text
+
+
+def bearing_to_azimuth(bearing_str):
+    """Convert bearing to azimuth (0-360 from North)"""
+    bearing_str = bearing_str.strip().upper()
+    
+    try:
+        # Check if it's already azimuth (just numbers)
+        if bearing_str.replace('.', '').replace('-', '').isdigit():
+            azimuth = dms_to_decimal(bearing_str)
+        # Parse quadrant bearing (e.g., N45.30E)
+        elif 'N' in bearing_str and 'E' in bearing_str:
+            azimuth = dms_to_decimal(bearing_str.replace('N', '').replace('E', ''))
+        elif 'S' in bearing_str and 'E' in bearing_str:
+            angle = dms_to_decimal(bearing_str.replace('S', '').replace('E', ''))
+            azimuth = 180 - angle
+        elif 'S' in bearing_str and 'W' in bearing_str:
+            angle = dms_to_decimal(bearing_str.replace('S', '').replace('W', ''))
+            azimuth = 180 + angle
+        elif 'N' in bearing_str and 'W' in bearing_str:
+            angle = dms_to_decimal(bearing_str.replace('N', '').replace('W', ''))
+            azimuth = 360 - angle
+        else:
+            azimuth = dms_to_decimal(bearing_str)
+    except Exception as e:
+        raise ValueError(f"Invalid bearing format: {bearing_str}")
+    # float() also reads "nan" and "inf"
+    if not math.isfinite(azimuth):
+        raise ValueError(f"Invalid bearing format: {bearing_str}")
+    return azimuth
+
+
+def azimuth_to_bearing(azimuth, precision=0):
+    """Convert azimuth to quadrant bearing string (e.g., N 45°30'15" E), rounded to the nearest second"""
+    return format_bearings((azimuth,), precision)[0]
+
+
+def _bearing_template(precision):
+    if precision > 0:
+        return "%s %02d°%02d'%02d.%0" + str(precision) + "d\" %s"
+    return "%s %02d°%02d'%02d\" %s"
+
+
+def format_bearings(azimuths, precision=0):
+    """
+    Format many azimuths (decimal degrees) as quadrant bearings in one pass.
+    Seconds are rounded to precision decimal places and carried into minutes
+    and degrees, so 59.9996" shows as the next whole minute rather than 59".
+    """
+    scale = 10 ** precision
+    # Work in integer units of 10^-precision seconds: rounding happens once, then carries are exact
+    per_second = scale
+    per_minute = 60 * scale
+    per_degree = 3600 * scale
+    quarter = 90 * per_degree
+    template = _bearing_template(precision)
+    
+    if NUMPY_AVAILABLE and len(azimuths) >= NUMPY_MIN_BEARINGS:
+        units = np.rint(np.mod(np.asarray(azimuths, dtype=float), 360) * per_degree).astype(np.int64)
+        units %= 4 * quarter
+        north = (units <= quarter) | (units > 3 * quarter)
+        east = units <= 2 * quarter
+        angle = np.where(units <= quarter, units,
+                         np.where(units <= 2 * quarter, 2 * quarter - units,
+                                  np.where(units <= 3 * quarter, units - 2 * quarter, 4 * quarter - units)))
+        degrees, remainder = np.divmod(angle, per_degree)
+        minutes, remainder = np.divmod(remainder, per_minute)
+        seconds, fraction = np.divmod(remainder, per_second)
+        ns = np.where(north, "N", "S").tolist()
+        ew = np.where(east, "E", "W").tolist()
+        if precision > 0:
+            return [template % row for row in zip(ns, degrees.tolist(), minutes.tolist(),
+                                                  seconds.tolist(), fraction.tolist(), ew)]
+        return [template % row for row in zip(ns, degrees.tolist(), minutes.tolist(), seconds.tolist(), ew)]
+    
+    bearings = []
+    for azimuth in azimuths:
+        units = round((azimuth % 360) * per_degree) % (4 * quarter)
+        if units <= quarter:
+            quadrant, angle = ("N", "E"), units
+        elif units <= 2 * quarter:
+            quadrant, angle = ("S", "E"), 2 * quarter - units
+        elif units <= 3 * quarter:
+            quadrant, angle = ("S", "W"), units - 2 * quarter
+        else:
+            quadrant, angle = ("N", "W"), 4 * quarter - units
+        degrees, remainder = divmod(angle, per_degree)
+        minutes, remainder = divmod(remainder, per_minute)
+        seconds, fraction = divmod(remainder, per_second)
+        if precision > 0:
+            bearings.append(template % (quadrant[0], degrees, minutes, seconds, fraction, quadrant[1]))
+        else:
+            bearings.append(template % (quadrant[0], degrees, minutes, seconds, quadrant[1]))
+    return bearings
+
+
+def calculate_interior_angles(bearings):
+    """Calculate interior angles from consecutive bearings"""
+    n = len(bearings)
+    angles = []
+    
+    for i in range(n):
+        current_bearing = bearings[i]
+        next_bearing = bearings[(i + 1) % n]
+        
+        back_azimuth = (current_bearing + 180) % 360
+        interior_angle = (back_azimuth - next_bearing) % 360
+        
+        angles.append(interior_angle)
+    
+    return angles
+
+
+def parse_distance(distance_str):
+    """Distance text to a float, rejecting "nan" and "inf", which float() accepts"""
+    distance = float(distance_str)
+    if not math.isfinite(distance):
+        raise ValueError(f"Invalid distance: {distance_str}")
+    return distance
+
+
+def parse_legs(bearing_strs, distance_strs):
+    """Parse raw bearing and distance text into (azimuths, distances) lists"""
+    bearings = []
+    distances = []
+    for bearing_str, distance_str in zip(bearing_strs, distance_strs):
+        bearings.append(bearing_to_azimuth(bearing_str))
+        distances.append(parse_distance(distance_str))
+    return bearings, distances
+
+
+def corrected_azimuth(adjusted_lat, adjusted_dep):
+    """Azimuth (0-360) of an adjusted latitude/departure pair"""
+    if adjusted_lat == 0:
+        if adjusted_dep > 0:
+            return 90
+        else:
+            return 270
+    azimuth = math.degrees(math.atan2(adjusted_dep, adjusted_lat))
+    if azimuth < 0:
+        azimuth += 360
+    return azimuth
+
+
+def polygon_area(points):
+    """Area of a closed polygon from its (northing, easting) vertices (shoelace formula)"""
+    total = 0.0
+    n = len(points)
+    for i in range(n):
+        n1, e1 = points[i]
+        n2, e2 = points[(i + 1) % n]
+        total += e1 * n2 - e2 * n1
+    return abs(total) / 2
+
+
+class TraverseAdjustment:
+    """Every intermediate and final value of a closed-traverse Bowditch adjustment"""
+    
+    def __init__(self, bearings, distances):
+        self.bearings = bearings
+        self.distances = distances
+        self.n = len(bearings)
+    
+    def iter_coordinates(self, start_northing=0.0, start_easting=0.0):
+        """Yield the adjusted (northing, easting) of each station without building a list"""
+        northing, easting = start_northing, start_easting
+        for lat, dep in zip(self.adjusted_lats, self.adjusted_deps):
+            yield northing, easting
+            northing += lat
+            easting += dep
+    
+    def coordinates(self, start_northing=0.0, start_easting=0.0):
+        """Adjusted (northing, easting) of each station, starting from the first one"""
+        return list(self.iter_coordinates(start_northing, start_easting))
+    
+    def area(self):
+        """Enclosed area of the adjusted polygon (square project units)"""
+        return polygon_area(self.coordinates())
+
+
+def adjust_traverse(bearings, distances, closure_only=False):
+    """
+    Run the Bowditch adjustment of a closed traverse.
+    bearings are azimuths in decimal degrees, distances are in the project units.
+    closure_only stops after the linear misclosure: the corrections, adjusted and
+    corrected values (and so coordinates and area) are left out.
+    Returns a TraverseAdjustment.
+    """
+    n = len(bearings)
+    result = TraverseAdjustment(bearings, distances)
+    
+    # 1. Check sum of interior angles
+    result.angles = angles = calculate_interior_angles(bearings)
+    result.theoretical_sum = (n - 2) * 180
+    result.actual_sum = sum(angles)
+    result.angular_misclosure = result.actual_sum - result.theoretical_sum
+    
+    # 2. Distribute angular error
+    result.angular_correction = -result.angular_misclosure / n
+    result.adjusted_angles = adjusted_angles = [angle + result.angular_correction for angle in angles]
+    
+    # 3. Compute azimuths
+    azimuths = []
+    azimuth = bearings[0]
+    azimuths.append(azimuth)
+    for i in range(1, n):
+        azimuth = (azimuth + 180 - adjusted_angles[i-1]) % 360
+        azimuths.append(azimuth)
+    result.azimuths = azimuths
+    
+    # 4. Calculate latitudes and departures
+    result.latitudes = latitudes = []
+    result.departures = departures = []
+    for i in range(n):
+        latitudes.append(distances[i] * math.cos(math.radians(azimuths[i])))
+        departures.append(distances[i] * math.sin(math.radians(azimuths[i])))
+    
+    result.sum_lat = sum_lat = sum(latitudes)
+    result.sum_dep = sum_dep = sum(departures)
+    result.total_perimeter = total_perimeter = sum(distances)
+    
+    # 5. Linear misclosure
+    result.linear_misclosure = math.sqrt(sum_lat**2 + sum_dep**2)
+    result.relative_accuracy = (f"1:{int(total_perimeter/result.linear_misclosure)}"
+                                if result.linear_misclosure > 0 else "Perfect")
+    if closure_only:
+        return result
+    
+    # 6. Apply Bowditch corrections
+    result.lat_corrections = []
+    result.dep_corrections = []
+    result.adjusted_lats = []
+    result.adjusted_deps = []
+    for i in range(n):
+        lat_corr = -(sum_lat * distances[i]) / total_perimeter
+        dep_corr = -(sum_dep * distances[i]) / total_perimeter
+        result.lat_corrections.append(lat_corr)
+        result.dep_corrections.append(dep_corr)
+        result.adjusted_lats.append(latitudes[i] + lat_corr)
+        result.adjusted_deps.append(departures[i] + dep_corr)
+    
+    # 7. Corrected distances and azimuths from the adjusted lat/dep
+    result.corrected_distances = [math.sqrt(lat**2 + dep**2)
+                                  for lat, dep in zip(result.adjusted_lats, result.adjusted_deps)]
+    result.corrected_azimuths = [corrected_azimuth(lat, dep)
+                                 for lat, dep in zip(result.adjusted_lats, result.adjusted_deps)]
+    
+    return result
+
+
+def open_traverse_coordinates(bearings, distances, start_northing=0.0, start_easting=0.0):
+    """
+    Unadjusted (northing, easting) of every station along an open traverse (spur).
+    Returns n + 1 points: the start station followed by the end of each leg.
+    """
+    northing, easting = start_northing, start_easting
+    points = [(northing, easting)]
+    for azimuth, distance in zip(bearings, distances):
+        northing += distance * math.cos(math.radians(azimuth))
+        easting += distance * math.sin(math.radians(azimuth))
+        points.append((northing, easting))
+    return points
@@ -3,7 +3,10 @@ Auto-Update Module for Traverse Calculator
 Downloads and installs updates automatically from GitHub.
 """
 
+import http.client
+import urllib.parse
 import urllib.request
+import base64
 import json
 import tkinter as tk
 from tkinter import messagebox, ttk
@@ -13,6 +16,10 @@ import os
 import sys
 import tempfile
 import subprocess
+import hashlib
+import time
+import delta_patch
+from concurrent.futures import ThreadPoolExecutor
 
 # Current application version
 CURRENT_VERSION = "1.0.1"
@@ -25,6 +32,26 @@ RELEASES_URL = "https://github.com/Av1Sharma/-TraverseCalculator/releases/latest
 # This will be constructed from the version tag
 DOWNLOAD_URL_TEMPLATE = "https://github.com/Av1Sharma/-TraverseCalculator/releases/download/v{version}/TraverseCalculator.exe"
 
+# Delta patch from an older release, used when version.json lists one under "patches"
+PATCH_URL_TEMPLATE = "https://github.com/Av1Sharma/-TraverseCalculator/releases/download/v{version}/TraverseCalculator_{from_version}.patch"
+
+# Download tuning: block size grows on fast links and shrinks on slow ones
+MIN_BLOCK_SIZE = 8 * 1024
+MAX_BLOCK_SIZE = 1024 * 1024
+TARGET_BLOCK_SECONDS = 0.25
+
+# Number of attempts before giving up; each retry resumes from the partial file
+MAX_DOWNLOAD_ATTEMPTS = 3
+
+
+# Parallel segmented downloads: large assets are fetched as several byte ranges at once
+DOWNLOAD_SEGMENTS = 4
+SEGMENTED_MIN_SIZE = 4 * 1024 * 1024
+
+# Maximum idle keep-alive connections kept per host
+MAX_POOL_CONNECTIONS_PER_HOST = 4
+MAX_REDIRECTS = 5
+
 
 def get_version_tuple(version_str):
     """Convert version string to tuple for comparison"""
@@ -39,25 +66,198 @@ def is_newer_version(remote_version, local_version=CURRENT_VERSION):
     return get_version_tuple(remote_version) > get_version_tuple(local_version)
 
 
+_ssl_context = None
+_ssl_context_lock = threading.Lock()
+
+
 def get_ssl_context():
-    """Get SSL context, with fallback for systems with SSL issues"""
-    try:
-        return ssl.create_default_context()
-    except:
-        return ssl._create_unverified_context()
+    """Get SSL context, with fallback for systems with SSL issues (built once and cached)"""
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            try:
+                _ssl_context = ssl.create_default_context()
+            except:
+                _ssl_context = ssl._create_unverified_context()
+        return _ssl_context
+
+
+def proxy_for(scheme, host):
+    """
+    (host, port, Proxy-Authorization value or None) of the proxy for a request, or
+    None to connect directly. Proxies are found the way urllib finds them: from the
+    environment, or the Windows Internet Settings in the registry.
+    """
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    if '://' not in proxy:
+        proxy = 'http://' + proxy
+    parts = urllib.parse.urlsplit(proxy)
+    authorization = None
+    if parts.username:
+        credentials = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        authorization = 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+    return parts.hostname, parts.port or 80, authorization
+
+
+class PooledResponse:
+    """HTTP response that hands its connection back to the pool once fully read"""
+    
+    def __init__(self, pool, key, connection, response, url):
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.headers = response.headers
+    
+    def read(self, amt=None):
+        return self._response.read(amt)
+    
+    def close(self):
+        """Release the connection: reuse it if the body was drained, otherwise drop it"""
+        if self._connection is None:
+            return
+        if self._response.isclosed() and not self._response.will_close:
+            self._pool._release(self._key, self._connection)
+        else:
+            self._connection.close()
+        self._connection = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections shared by all updater requests.
+    Reusing a connection skips the TCP and TLS handshakes, which dominate on high-latency links.
+    """
+    
+    def __init__(self, max_per_host=MAX_POOL_CONNECTIONS_PER_HOST):
+        self.max_per_host = max_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+    
+    def _acquire(self, key, timeout):
+        """Return an idle connection for key, or open a new one"""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        return self._connect(key, timeout), False
+    
+    def _connect(self, key, timeout):
+        """Open a new connection for a (scheme, host, port, context, proxy) key"""
+        scheme, host, port, context, proxy = key
+        if proxy is None:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, port, timeout=timeout, context=context)
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        proxy_host, proxy_port, authorization = proxy
+        if scheme == 'https':
+            # HTTPS goes through a CONNECT tunnel, so TLS still runs end to end with the server
+            connection = http.client.HTTPSConnection(proxy_host, proxy_port, timeout=timeout, context=context)
+            connection.set_tunnel(host, port, headers={'Proxy-Authorization': authorization} if authorization else None)
+            return connection
+        return http.client.HTTPConnection(proxy_host, proxy_port, timeout=timeout)
+    
+    def _release(self, key, connection):
+        """Return a connection to the idle list"""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+    
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            for idle in self._idle.values():
+                for connection in idle:
+                    connection.close()
+            self._idle.clear()
+    
+    def request(self, url, headers=None, timeout=60, context=None, method='GET'):
+        """
+        Send a request and return a PooledResponse, following redirects.
+        GitHub release assets redirect to a CDN host, which gets its own pooled connections.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', f'TraverseCalculator/{CURRENT_VERSION}')
+        if context is None:
+            context = get_ssl_context()
+        
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            proxy = proxy_for(parts.scheme, parts.hostname)
+            key = (parts.scheme, parts.hostname, port, context if parts.scheme == 'https' else None, proxy)
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            request_headers = headers
+            if proxy is not None and parts.scheme == 'http':
+                # A plain HTTP proxy is sent the whole URL
+                path = urllib.parse.urlunsplit((parts.scheme, parts.netloc, path, '', ''))
+                if proxy[2]:
+                    request_headers = dict(headers, **{'Proxy-Authorization': proxy[2]})
+            
+            connection, reused = self._acquire(key, timeout)
+            try:
+                connection.request(method, path, headers=request_headers)
+                response = connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if not reused:
+                    raise
+                # Stale keep-alive connection closed by the server - retry on a fresh one
+                connection = self._connect(key, timeout)
+                connection.request(method, path, headers=request_headers)
+                response = connection.getresponse()
+            
+            pooled = PooledResponse(self, key, connection, response, url)
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.headers.get('Location')
+                response.read()
+                pooled.close()
+                if not location:
+                    raise IOError(f"HTTP {response.status} redirect without Location from {url}")
+                url = urllib.parse.urljoin(url, location)
+                continue
+            return pooled
+        
+        raise IOError(f"Too many redirects for {url}")
+
+
+# Shared pool used by every updater request
+connection_pool = ConnectionPool()
 
 
 def fetch_remote_version():
     """Fetch the version info from GitHub."""
     try:
-        context = get_ssl_context()
         try:
-            with urllib.request.urlopen(GITHUB_RAW_URL, timeout=10, context=context) as response:
+            with connection_pool.request(GITHUB_RAW_URL, timeout=10) as response:
+                if response.status != 200:
+                    raise IOError(f"HTTP {response.status}")
                 data = response.read().decode('utf-8')
                 return json.loads(data)
         except ssl.SSLError:
             context = ssl._create_unverified_context()
-            with urllib.request.urlopen(GITHUB_RAW_URL, timeout=10, context=context) as response:
+            with connection_pool.request(GITHUB_RAW_URL, timeout=10, context=context) as response:
+                if response.status != 200:
+                    raise IOError(f"HTTP {response.status}")
                 data = response.read().decode('utf-8')
                 return json.loads(data)
     except Exception as e:
@@ -90,44 +290,297 @@ def get_current_exe_path():
         return os.path.abspath(__file__)
 
 
-def download_update(version, progress_callback=None):
+def file_sha256(path, block_size=MAX_BLOCK_SIZE):
+    """Return the hex SHA-256 digest of a file on disk"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            buffer = f.read(block_size)
+            if not buffer:
+                break
+            digest.update(buffer)
+    return digest.hexdigest()
+
+
+def next_block_size(block_size, elapsed):
+    """Adapt the read size so each block takes roughly TARGET_BLOCK_SECONDS"""
+    if elapsed < TARGET_BLOCK_SECONDS / 2:
+        return min(block_size * 2, MAX_BLOCK_SIZE)
+    if elapsed > TARGET_BLOCK_SECONDS * 2:
+        return max(block_size // 2, MIN_BLOCK_SIZE)
+    return block_size
+
+
+def _hash_partial_file(part_path):
+    """Seed a SHA-256 digest with the bytes already downloaded. Returns (digest, size)."""
+    digest = hashlib.sha256()
+    size = 0
+    if os.path.exists(part_path):
+        with open(part_path, 'rb') as f:
+            while True:
+                buffer = f.read(MAX_BLOCK_SIZE)
+                if not buffer:
+                    break
+                digest.update(buffer)
+                size += len(buffer)
+    return digest, size
+
+
+def _download_attempt(download_url, part_path, progress_callback=None):
     """
-    Download the new version from GitHub.
-    Returns the path to the downloaded file, or None if failed.
+    Download (or resume) a single attempt into part_path.
+    Returns the SHA-256 digest of the complete file once the server has sent everything.
     """
-    download_url = DOWNLOAD_URL_TEMPLATE.format(version=version)
+    digest, offset = _hash_partial_file(part_path)
     
-    try:
-        context = get_ssl_context()
+    headers = {}
+    if offset > 0:
+        headers['Range'] = f'bytes={offset}-'
+    
+    with connection_pool.request(download_url, headers=headers, timeout=60) as response:
+        # 416 means we already have every byte the server can give us
+        if response.status == 416 and offset > 0:
+            response.read()
+            return digest
+        if response.status not in (200, 206):
+            raise IOError(f"HTTP {response.status} from {response.url}")
         
-        # Create temp file for download
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, f"TraverseCalculator_v{version}.exe")
+        if offset > 0 and response.status != 206:
+            # Server ignored the Range header - start over from zero
+            digest = hashlib.sha256()
+            offset = 0
         
-        # Open URL and get content length
-        request = urllib.request.Request(download_url)
-        with urllib.request.urlopen(request, timeout=60, context=context) as response:
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            block_size = 8192
-            
-            with open(temp_path, 'wb') as f:
+        content_length = int(response.headers.get('content-length', 0))
+        total_size = offset + content_length if content_length else 0
+        downloaded = offset
+        block_size = MIN_BLOCK_SIZE
+        
+        with open(part_path, 'ab' if offset > 0 else 'wb') as f:
+            while True:
+                started = time.monotonic()
+                buffer = response.read(block_size)
+                if not buffer:
+                    break
+                f.write(buffer)
+                digest.update(buffer)
+                downloaded += len(buffer)
+                block_size = next_block_size(block_size, time.monotonic() - started)
+                
+                if progress_callback and total_size > 0:
+                    progress = (downloaded / total_size) * 100
+                    progress_callback(progress)
+        
+        if content_length and downloaded < total_size:
+            raise IOError(f"Connection closed after {downloaded} of {total_size} bytes")
+    
+    return digest
+
+
+def probe_download(download_url):
+    """
+    Ask the server for the first byte of the asset.
+    Returns (total_size, accepts_ranges); total_size is 0 when unknown.
+    """
+    response = connection_pool.request(download_url, headers={'Range': 'bytes=0-0'}, timeout=30)
+    if response.status == 206:
+        response.read()
+        response.close()
+        # Content-Range: bytes 0-0/12345
+        total = response.headers.get('Content-Range', '').rsplit('/', 1)[-1]
+        if total.isdigit():
+            return int(total), True
+        return 0, False
+    # Full body (or an error) - don't read it, just drop the connection
+    total_size = int(response.headers.get('content-length', 0)) if response.status == 200 else 0
+    response.close()
+    return total_size, False
+
+
+def segment_ranges(total_size, segments):
+    """Split total_size bytes into inclusive (start, end) byte ranges"""
+    segments = max(1, min(segments, total_size))
+    size = -(-total_size // segments)
+    return [(start, min(start + size, total_size) - 1) for start in range(0, total_size, size)]
+
+
+def _download_segment(download_url, segment_path, start, end, report_progress):
+    """Fetch bytes start..end into segment_path, resuming from whatever it already holds"""
+    length = end - start + 1
+    have = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+    if have > length:
+        # Left over from a different segment layout
+        os.remove(segment_path)
+        have = 0
+    if have == length:
+        return
+    
+    headers = {'Range': f'bytes={start + have}-{end}'}
+    with connection_pool.request(download_url, headers=headers, timeout=60) as response:
+        if response.status != 206:
+            raise IOError(f"HTTP {response.status} for range {start + have}-{end}")
+        block_size = MIN_BLOCK_SIZE
+        with open(segment_path, 'ab') as f:
+            while have < length:
+                started = time.monotonic()
+                buffer = response.read(min(block_size, length - have))
+                if not buffer:
+                    break
+                f.write(buffer)
+                have += len(buffer)
+                report_progress(len(buffer))
+                block_size = next_block_size(block_size, time.monotonic() - started)
+    
+    if have < length:
+        raise IOError(f"Segment {start}-{end} closed after {have} of {length} bytes")
+
+
+def download_segmented(download_url, dest_path, total_size, segments=DOWNLOAD_SEGMENTS, progress_callback=None):
+    """
+    Download total_size bytes as several concurrent byte ranges and reassemble them into dest_path.
+    Each range is kept in its own .segN file so a failed attempt resumes per segment.
+    Returns the SHA-256 digest of the reassembled file.
+    """
+    ranges = segment_ranges(total_size, segments)
+    segment_paths = [f"{dest_path}.seg{i}" for i in range(len(ranges))]
+    
+    progress_lock = threading.Lock()
+    downloaded = [sum(min(os.path.getsize(path), end - start + 1)
+                      for path, (start, end) in zip(segment_paths, ranges) if os.path.exists(path))]
+    
+    def report_progress(count):
+        with progress_lock:
+            downloaded[0] += count
+            if progress_callback:
+                progress_callback((downloaded[0] / total_size) * 100)
+    
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_download_segment, download_url, path, start, end, report_progress)
+                   for path, (start, end) in zip(segment_paths, ranges)]
+        for future in futures:
+            future.result()
+    
+    # Reassemble in order, hashing as we copy
+    digest = hashlib.sha256()
+    with open(dest_path, 'wb') as out:
+        for path in segment_paths:
+            with open(path, 'rb') as f:
                 while True:
-                    buffer = response.read(block_size)
+                    buffer = f.read(MAX_BLOCK_SIZE)
                     if not buffer:
                         break
-                    f.write(buffer)
-                    downloaded += len(buffer)
-                    
-                    if progress_callback and total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        progress_callback(progress)
+                    digest.update(buffer)
+                    out.write(buffer)
+    
+    for path in segment_paths:
+        os.remove(path)
+    
+    return digest
+
+
+def download_update(version, progress_callback=None, expected_sha256=None, download_url=None,
+                    segments=DOWNLOAD_SEGMENTS, filename=None):
+    """
+    Download the new version from GitHub.
+    Large assets are fetched as `segments` concurrent byte ranges when the server supports it.
+    Interrupted downloads are resumed with an HTTP Range request, and the file is
+    verified against expected_sha256 (from version.json) when one is published.
+    Returns the path to the downloaded file, or None if failed.
+    """
+    if download_url is None:
+        download_url = DOWNLOAD_URL_TEMPLATE.format(version=version)
+    if filename is None:
+        filename = f"TraverseCalculator_v{version}.exe"
+    
+    # Create temp file for download; the .part file survives between attempts and app runs
+    temp_dir = tempfile.gettempdir()
+    temp_path = os.path.join(temp_dir, filename)
+    part_path = temp_path + ".part"
+    
+    for attempt in range(1, MAX_DOWNLOAD_ATTEMPTS + 1):
+        try:
+            digest = None
+            # A sequential .part file from an earlier run is resumed as-is
+            if segments > 1 and not os.path.exists(part_path):
+                total_size, accepts_ranges = probe_download(download_url)
+                if accepts_ranges and total_size >= SEGMENTED_MIN_SIZE:
+                    digest = download_segmented(download_url, part_path, total_size,
+                                                segments, progress_callback)
+            if digest is None:
+                digest = _download_attempt(download_url, part_path, progress_callback)
+        except Exception as e:
+            print(f"Download attempt {attempt} failed: {e}")
+            continue
+        
+        if expected_sha256 and digest.hexdigest().lower() != expected_sha256.strip().lower():
+            # Corrupt or mismatched payload - discard it so the next attempt starts clean
+            print(f"Download failed: SHA-256 mismatch (got {digest.hexdigest()})")
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            continue
         
+        try:
+            os.replace(part_path, temp_path)
+        except Exception as e:
+            print(f"Download failed: {e}")
+            return None
         return temp_path
     
+    return None
+
+
+def download_delta_update(remote_info, progress_callback=None, current_exe=None):
+    """
+    Download the patch from CURRENT_VERSION (if version.json advertises one) and apply it
+    to the installed executable. The result must match the full build's sha256.
+    Returns the path to the rebuilt executable, or None so the caller can fall back
+    to a full download.
+    """
+    version = remote_info.get('version')
+    patch_info = remote_info.get('patches', {}).get(CURRENT_VERSION)
+    expected_sha256 = remote_info.get('sha256')
+    # Without a published hash for the full build there is nothing to verify the result against
+    if not version or not patch_info or not expected_sha256:
+        return None
+    
+    if current_exe is None:
+        current_exe = get_current_exe_path()
+    
+    patch_url = patch_info.get('url') or PATCH_URL_TEMPLATE.format(version=version, from_version=CURRENT_VERSION)
+    patch_path = download_update(version, progress_callback,
+                                 expected_sha256=patch_info.get('sha256'),
+                                 download_url=patch_url, segments=1,
+                                 filename=f"TraverseCalculator_v{version}_from_{CURRENT_VERSION}.patch")
+    if patch_path is None:
+        return None
+    
+    new_exe_path = os.path.join(tempfile.gettempdir(), f"TraverseCalculator_v{version}.exe")
+    try:
+        digest = delta_patch.apply_patch(current_exe, patch_path, new_exe_path)
+        if digest != expected_sha256.strip().lower():
+            raise delta_patch.PatchError("Patched file does not match the published sha256")
     except Exception as e:
-        print(f"Download failed: {e}")
+        print(f"Delta update failed, falling back to full download: {e}")
+        if os.path.exists(new_exe_path):
+            os.remove(new_exe_path)
         return None
+    finally:
+        os.remove(patch_path)
+    
+    return new_exe_path
+
+
+def download_best_update(remote_info, progress_callback=None):
+    """Try a delta update first, then fall back to downloading the full executable"""
+    new_exe_path = download_delta_update(remote_info, progress_callback)
+    if new_exe_path:
+        return new_exe_path
+    
+    if progress_callback:
+        progress_callback(0)
+    return download_update(remote_info.get('version'), progress_callback,
+                           expected_sha256=remote_info.get('sha256'))
 
 
 def create_update_batch_script(new_exe_path, current_exe_path):
@@ -288,7 +741,7 @@ class UpdateDialog:
     
     def _download_thread(self):
         """Background thread that downloads the update"""
-        new_exe_path = download_update(self.version, self._update_progress)
+        new_exe_path = download_best_update(self.remote_info, self._update_progress)
         
         if new_exe_path and os.path.exists(new_exe_path):
             # Download successful - perform update